@@ -22,6 +22,7 @@ the classes contained therein.
 
 import collections
 import copy
+import hashlib
 import inspect
 import logging
 import os
@@ -589,6 +590,10 @@ class Site(Registry, HorizonComponent):
     slug = 'horizon'
     urls = 'horizon.site_urls'
 
+    # Identifies the current set of dashboards and panels. Navigation trees
+    # cached for an earlier registry are keyed with an older version.
+    _navigation_version = None
+
     def __repr__(self):
         return u"<Site: %s>" % self.slug
 
@@ -606,10 +611,12 @@ class Site(Registry, HorizonComponent):
 
     def register(self, dashboard):
         """Registers a :class:`~horizon.Dashboard` with Horizon."""
+        self._invalidate_navigation()
         return self._register(dashboard)
 
     def unregister(self, dashboard):
         """Unregisters a :class:`~horizon.Dashboard` from Horizon."""
+        self._invalidate_navigation()
         return self._unregister(dashboard)
 
     def registered(self, dashboard):
@@ -617,6 +624,7 @@ class Site(Registry, HorizonComponent):
 
     def register_panel(self, dashboard, panel):
         dash_instance = self.registered(dashboard)
+        self._invalidate_navigation()
         return dash_instance._register(panel)
 
     def unregister_panel(self, dashboard, panel):
@@ -624,8 +632,36 @@ class Site(Registry, HorizonComponent):
         if not dash_instance:
             raise NotRegistered("The dashboard %s is not registered."
                                 % dashboard)
+        self._invalidate_navigation()
         return dash_instance._unregister(panel)
 
+    def get_navigation_version(self):
+        """Returns a string which changes whenever the registry changes.
+
+        It is a digest of the registered dashboards, panel groups and panels
+        and of what decides their visibility, so every process serving the
+        same registry shares the navigation trees in a shared cache, and
+        they survive restarts.
+        """
+        if self._navigation_version is None:
+            registry = []
+            for dash in self.get_dashboards():
+                groups = []
+                for group in dash.get_panel_groups().values():
+                    panels = [(panel.slug, bool(panel.nav),
+                               sorted(getattr(panel, 'permissions', ())))
+                              for panel in group]
+                    groups.append((group.slug, panels))
+                registry.append((dash.slug, bool(dash.nav),
+                                 sorted(getattr(dash, 'permissions', ())),
+                                 groups))
+            self._navigation_version = hashlib.sha1(
+                repr(registry)).hexdigest()
+        return self._navigation_version
+
+    def _invalidate_navigation(self):
+        self._navigation_version = None
+
     def get_dashboard(self, dashboard):
         """Returns the specified :class:`~horizon.Dashboard` instance."""
         return self._registered(dashboard)
@@ -759,6 +795,9 @@ class Site(Registry, HorizonComponent):
                 if module_has_submodule(mod, mod_name):
                     raise
 
+        # Customizations may have changed panels' permissions.
+        self._invalidate_navigation()
+
         # Compile the dynamic urlconf.
         for dash in self._registry.values():
             urlpatterns += patterns('',
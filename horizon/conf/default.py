@@ -43,5 +43,14 @@ HORIZON_CONFIG = {
     'password_autocomplete': 'on',
 
     # Enable or disable simplified floating IP address management.
-    'simple_ip_management': True
+    'simple_ip_management': True,
+
+    # Number of objects a batch table action may act on concurrently, and
+    # how long to wait for them in seconds (None for no limit).
+    'batch_action_concurrency': 1,
+    'batch_action_timeout': None,
+
+    # Seconds for which the dashboards and panels a user may see are cached
+    # (0 to compute them on every page).
+    'navigation_cache_timeout': 300
 }
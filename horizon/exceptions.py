@@ -175,6 +175,11 @@ class NotAvailable(HorizonException):
     pass
 
 
+class DeadlineExceeded(HorizonException):
+    """Raised when an API call doesn't finish within the time it was given."""
+    pass
+
+
 class WorkflowError(HorizonException):
     """Exception to be raised when something goes wrong in a workflow."""
     pass
@@ -197,7 +202,7 @@ class HandledException(HorizonException):
 
 UNAUTHORIZED = tuple(HORIZON_CONFIG['exceptions']['unauthorized'])
 NOT_FOUND = tuple(HORIZON_CONFIG['exceptions']['not_found'])
-RECOVERABLE = (AlreadyExists, Conflict, NotAvailable)
+RECOVERABLE = (AlreadyExists, Conflict, NotAvailable, DeadlineExceeded)
 RECOVERABLE += tuple(HORIZON_CONFIG['exceptions']['recoverable'])
 
 
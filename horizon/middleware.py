@@ -38,6 +38,7 @@ import six
 
 from horizon import exceptions
 from horizon.utils import functions as utils
+from horizon.utils import memoized
 
 LOG = logging.getLogger(__name__)
 
@@ -155,6 +156,7 @@ class HorizonMiddleware(object):
         """Convert HttpResponseRedirect to HttpResponse if request is via ajax
         to allow ajax request to redirect url
         """
+        memoized.clear_request_cache(request)
         if request.is_ajax() and hasattr(request, 'horizon'):
             queued_msgs = request.horizon['async_messages']
             if type(response) == http.HttpResponseRedirect:
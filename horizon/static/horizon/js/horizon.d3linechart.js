@@ -53,6 +53,22 @@
     "settings": {}
   }
 
+  Or in the columnar format, where the series share one array of dates and
+  have a value for each of them, null when they have no point for a date:
+  {
+    "timestamps": ["2013-08-21T11:22:25", "2013-08-21T12:22:25"],
+    "series": [
+      {
+        "name": "instance-00000005",
+        "values": [171, null]
+      }, {
+        "name": "instance-00000006",
+        "values": [171, 172]
+      }
+    ],
+    "settings": {}
+  }
+
   Example of line-bar chart sparkline:
 
   <div class="overview_chart">
@@ -377,7 +393,11 @@ horizon.d3_line_chart = {
           self.jquery_element.empty();
           $(self.legend_element).empty();
 
-          self.series = data.series;
+          if (data.timestamps) {
+            self.series = self.expand_columnar(data);
+          } else {
+            self.series = data.series;
+          }
           self.stats = data.stats;
           // The highest priority settings are sent with the data.
           self.apply_settings(data.settings);
@@ -407,6 +427,22 @@ horizon.d3_line_chart = {
       });
     };
 
+    /**
+     * Converts series in the columnar format to series with lists of points.
+     * @param data An object with the timestamps and series of the chart.
+     */
+    self.expand_columnar = function(data) {
+      return $.map(data.series, function (serie) {
+        var points = [];
+        $.each(serie.values, function (index, value) {
+          if (value !== null) {
+            points.push({'x': data.timestamps[index], 'y': value});
+          }
+        });
+        return {'name': serie.name, 'unit': serie.unit, 'data': points};
+      });
+    };
+
     /**
      * Renders the chart using Rickshaw library.
      */
@@ -47,11 +47,12 @@ function update(){
   link.exit().remove();
   //Setup click action for all nodes
   node.on("mouseover", function(d) {
-    $("#info_box").html(d.info_box);
     current_info = d.name;
+    show_info_box(d);
   });
   node.on("mouseout", function(d) {
     $("#info_box").html('');
+    current_info = null;
   });
 
   force.start();
@@ -66,12 +67,17 @@ function tick() {
   node.attr("transform", function(d) { return "translate(" + d.x + "," + d.y + ")"; });
 }
 
-function set_in_progress(stack, nodes) {
-  if (stack.in_progress === true) { in_progress = true; }
-  for (var i = 0; i < nodes.length; i++) {
-    var d = nodes[i];
-    if (d.in_progress === true){ in_progress = true; return false; }
+//Info boxes are rendered by the server the first time they are shown,
+//and again after the status of the resource changed
+function show_info_box(d) {
+  if (d.info_box) {
+    $("#info_box").html(d.info_box);
+    return;
   }
+  $.get(info_url + encodeURIComponent(d.name) + '/', function(info_box) {
+    d.info_box = info_box;
+    if (current_info === d.name) { $("#info_box").html(info_box); }
+  });
 }
 
 function findNode(name) {
@@ -177,17 +183,25 @@ function build_reverse_links(node){
 
 function ajax_poll(poll_time){
   setTimeout(function() {
-    $.getJSON(ajax_url, function(json) {
-      //update d3 data element
-      $("#d3_data").attr("data-d3_data", JSON.stringify(json));
+    //Only the nodes which changed since this version are sent back
+    $.getJSON(ajax_url, {since: version}, function(json) {
+      version = json.version;
+      in_progress = json.in_progress;
 
       //update stack
-      $("#stack_box").html(json.stack.info_box);
-      set_in_progress(json.stack, json.nodes);
+      if (json.stack.info_box) {
+        $("#stack_box").html(json.stack.info_box);
+      }
       needs_update = false;
 
       //Check Remove nodes
-      remove_nodes(nodes, json.nodes);
+      if (json.full === true) {
+        remove_nodes(nodes, json.nodes);
+      } else {
+        json.removed.forEach(function(name){
+          if (findNode(name)) { removeNode(name); }
+        });
+      }
 
       //Check for updates and new nodes
       json.nodes.forEach(function(d){
@@ -196,6 +210,7 @@ function ajax_poll(poll_time){
         if (current_node) {
           //Node already exists, just update it
           current_node.status = d.status;
+          current_node.in_progress = d.in_progress;
 
           //Status has changed, image should be updated
           if (current_node.image !== d.image){
@@ -222,8 +237,8 @@ function ajax_poll(poll_time){
               .ease("bounce");
           }
 
-          //Status has changed, update info_box
-          current_node.info_box = d.info_box;
+          //Status has changed, info_box is out of date
+          current_node.info_box = null;
 
         } else {
           addNode(d);
@@ -248,7 +263,10 @@ if ($(container).length){
     height = 500,
     stack_id = $("#stack_id").data("stack_id"),
     ajax_url = '/project/stacks/get_d3_data/' + stack_id + '/',
+    info_url = '/project/stacks/get_d3_info/' + stack_id + '/',
     graph = $("#d3_data").data("d3_data"),
+    version = graph.version,
+    current_info = null,
     force = d3.layout.force()
       .nodes(graph.nodes)
       .links([])
@@ -272,8 +290,7 @@ if ($(container).length){
   //Load initial Stack box
   $("#stack_box").html(graph.stack.info_box);
   //On Page load, set Action In Progress
-  var in_progress = false;
-  set_in_progress(graph.stack, node);
+  var in_progress = (graph.in_progress === true);
 
   //If status is In Progress, start AJAX polling
   var poll_time = 0;
@@ -5,7 +5,9 @@ horizon.datatables = {
     if ($rows_to_update.length) {
       var interval = $rows_to_update.attr('data-update-interval'),
         $table = $rows_to_update.closest('table'),
-        decay_constant = $table.attr('decay_constant');
+        decay_constant = $table.attr('decay_constant'),
+        batches = {},
+        pending = 0;
 
       // Do not update this row if the action column is expanded
       if ($rows_to_update.find('.actions_column .btn-group.open').length) {
@@ -15,92 +17,56 @@ horizon.datatables = {
         $table.removeAttr('decay_constant');
         return;
       }
-      // Trigger the update handlers.
+
+      // Poll all the rows of a table in a single request.
       $rows_to_update.each(function(index, row) {
-        var $row = $(this),
-          $table = $row.closest('table.datatable');
+        var url = $(row).attr('data-batch-update-url');
+        if (!(url in batches)) {
+          batches[url] = [];
+          pending++;
+        }
+        batches[url].push(row);
+      });
+
+      $.each(batches, function (url, rows) {
+        var $rows = $(rows),
+          $table = $rows.closest('table.datatable'),
+          params = $.map(rows, function (row) {
+            return "obj_id=" + encodeURIComponent($(row).attr('data-object-id'));
+          });
         horizon.ajax.queue({
-          url: $row.attr('data-update-url'),
+          url: url + "&" + params.join("&"),
+          dataType: "json",
           error: function (jqXHR, textStatus, errorThrown) {
-            switch (jqXHR.status) {
-              // A 404 indicates the object is gone, and should be removed from the table
-              case 404:
-                // Update the footer count and reset to default empty row if needed
-                var $footer, row_count, footer_text, colspan, template, params, $empty_row;
-
-                // existing count minus one for the row we're removing
-                row_count = horizon.datatables.update_footer_count($table, -1);
-
-                if(row_count === 0) {
-                  colspan = $table.find('th[colspan]').attr('colspan');
-                  template = horizon.templates.compiled_templates["#empty_row_template"];
-                  params = {
-                      "colspan": colspan,
-                      no_items_label: gettext("No items to display.")
-                  };
-                  empty_row = template.render(params);
-                  $row.replaceWith(empty_row);
-                } else {
-                  $row.remove();
-                }
-                // Reset tablesorter's data cache.
-                $table.trigger("update");
-                // Enable launch action if quota is not exceeded
-                horizon.datatables.update_actions();
-                break;
-              default:
+            horizon.utils.log(gettext("An error occurred while updating."));
+            $rows.removeClass("ajax-update");
+            $rows.find("i.ajax-updating").remove();
+          },
+          success: function (data, textStatus, jqXHR) {
+            $rows.each(function (index, row) {
+              var $row = $(row),
+                obj_id = $row.attr('data-object-id');
+              if (!(obj_id in data)) {
                 horizon.utils.log(gettext("An error occurred while updating."));
                 $row.removeClass("ajax-update");
                 $row.find("i.ajax-updating").remove();
-                break;
-            }
-          },
-          success: function (data, textStatus, jqXHR) {
-            var $new_row = $(data);
-
-            if ($new_row.hasClass('status_unknown')) {
-              var spinner_elm = $new_row.find("td.status_unknown:last");
-
-              if ($new_row.find('.btn-action-required').length > 0) {
-                spinner_elm.prepend(
-                  $("<div />")
-                    .addClass("action_required_img")
-                    .append(
-                      $("<img />")
-                        .attr("src", "/static/dashboard/img/action_required.png")));
+              } else if (data[obj_id] === null) {
+                // The object is gone, and should be removed from the table
+                horizon.datatables.remove_row($table, $row);
               } else {
-                // Replacing spin.js here with an animated gif to reduce CPU
-                spinner_elm.prepend(
-                  $("<div />")
-                    .addClass("loading_gif")
-                    .append(
-                      $("<img />")
-                        .attr("src", "/static/dashboard/img/loading.gif")));
-              }
-            }
-
-            // Only replace row if the html content has changed
-            if($new_row.html() !== $row.html()) {
-              if($row.find('.table-row-multi-select:checkbox').is(':checked')) {
-                // Preserve the checkbox if it's already clicked
-                $new_row.find('.table-row-multi-select:checkbox').prop('checked', true);
+                horizon.datatables.replace_row($table, $row, data[obj_id]);
               }
-              $row.replaceWith($new_row);
-              // Reset tablesorter's data cache.
-              $table.trigger("update");
-              // Reset decay constant.
-              $table.removeAttr('decay_constant');
-              // Check that quicksearch is enabled for this table
-              // Reset quicksearch's data cache.
-              if ($table.attr('id') in horizon.datatables.qs) {
-                horizon.datatables.qs[$table.attr('id')].cache();
-              }
-            }
+            });
           },
           complete: function (jqXHR, textStatus) {
             // Revalidate the button check for the updated table
             horizon.datatables.validate_button();
 
+            // Poll again once every table has been updated.
+            pending--;
+            if (pending > 0) {
+              return;
+            }
             // Set interval decay to this table, and increase if it already exist
             if(decay_constant === undefined) {
               decay_constant = 1;
@@ -119,6 +85,74 @@ horizon.datatables = {
     }
   },
 
+  remove_row: function ($table, $row) {
+    // Update the footer count and reset to default empty row if needed
+    var row_count, colspan, template, params, empty_row;
+
+    // existing count minus one for the row we're removing
+    row_count = horizon.datatables.update_footer_count($table, -1);
+
+    if(row_count === 0) {
+      colspan = $table.find('th[colspan]').attr('colspan');
+      template = horizon.templates.compiled_templates["#empty_row_template"];
+      params = {
+          "colspan": colspan,
+          no_items_label: gettext("No items to display.")
+      };
+      empty_row = template.render(params);
+      $row.replaceWith(empty_row);
+    } else {
+      $row.remove();
+    }
+    // Reset tablesorter's data cache.
+    $table.trigger("update");
+    // Enable launch action if quota is not exceeded
+    horizon.datatables.update_actions();
+  },
+
+  replace_row: function ($table, $row, html) {
+    var $new_row = $(html);
+
+    if ($new_row.hasClass('status_unknown')) {
+      var spinner_elm = $new_row.find("td.status_unknown:last");
+
+      if ($new_row.find('.btn-action-required').length > 0) {
+        spinner_elm.prepend(
+          $("<div />")
+            .addClass("action_required_img")
+            .append(
+              $("<img />")
+                .attr("src", "/static/dashboard/img/action_required.png")));
+      } else {
+        // Replacing spin.js here with an animated gif to reduce CPU
+        spinner_elm.prepend(
+          $("<div />")
+            .addClass("loading_gif")
+            .append(
+              $("<img />")
+                .attr("src", "/static/dashboard/img/loading.gif")));
+      }
+    }
+
+    // Only replace row if the html content has changed
+    if($new_row.html() !== $row.html()) {
+      if($row.find('.table-row-multi-select:checkbox').is(':checked')) {
+        // Preserve the checkbox if it's already clicked
+        $new_row.find('.table-row-multi-select:checkbox').prop('checked', true);
+      }
+      $row.replaceWith($new_row);
+      // Reset tablesorter's data cache.
+      $table.trigger("update");
+      // Reset decay constant.
+      $table.removeAttr('decay_constant');
+      // Check that quicksearch is enabled for this table
+      // Reset quicksearch's data cache.
+      if ($table.attr('id') in horizon.datatables.qs) {
+        horizon.datatables.qs[$table.attr('id')].cache();
+      }
+    }
+  },
+
   update_actions: function() {
     var $actions_to_update = $('.btn-launch.ajax-update');
     $actions_to_update.each(function(index, action) {
@@ -27,8 +27,10 @@ from django.utils.translation import pgettext_lazy
 from django.utils.translation import ugettext_lazy as _
 import six
 
+from horizon import conf
 from horizon import exceptions
 from horizon import messages
+from horizon.utils import concurrency
 from horizon.utils import functions
 from horizon.utils import html
 
@@ -38,6 +40,12 @@ LOG = logging.getLogger(__name__)
 # For Bootstrap integration; can be overridden in settings.
 ACTION_CSS_CLASSES = ("btn", "btn-small")
 STRING_SEPARATOR = "__"
+# Request attribute holding the answers of actions' datum-independent
+# allowed() checks.
+ALLOWED_CACHE_ATTR = '_horizon_allowed'
+
+# Stands for datum attributes which are not set, in allowed() cache keys.
+_MISSING = object()
 
 
 class BaseActionMetaClass(type):
@@ -84,7 +92,19 @@ class BaseActionMetaClass(type):
 
 @six.add_metaclass(BaseActionMetaClass)
 class BaseAction(html.HTMLElement):
-    """Common base class for all ``Action`` classes."""
+    """Common base class for all ``Action`` classes.
+
+    .. attribute:: allowed_fields
+
+       Optional tuple of the names of the datum attributes (or keys) which
+       the :meth:`allowed` method depends on. When it is set, ``allowed`` is
+       only called once for each distinct combination of their values in a
+       table, and rows sharing one get the same answer. An empty tuple means
+       ``allowed`` doesn't depend on the datum at all, and the answer is
+       reused for the rest of the request. ``allowed`` must not have side
+       effects, such as changing the action's name, for this to be safe.
+       Defaults to ``None``, which calls ``allowed`` for every row.
+    """
 
     def __init__(self, **kwargs):
         super(BaseAction, self).__init__()
@@ -94,6 +114,7 @@ class BaseAction(html.HTMLElement):
         self.requires_input = kwargs.get('requires_input', False)
         self.preempt = kwargs.get('preempt', False)
         self.policy_rules = kwargs.get('policy_rules', None)
+        self.allowed_fields = kwargs.get('allowed_fields', None)
 
     def data_type_matched(self, datum):
         """Method to see if the action is allowed for a certain type of data.
@@ -131,8 +152,39 @@ class BaseAction(html.HTMLElement):
         if policy_check and self.policy_rules:
             target = self.get_policy_target(request, datum)
             return (policy_check(self.policy_rules, request, target) and
-                    self.allowed(request, datum))
-        return self.allowed(request, datum)
+                    self._cached_allowed(request, datum))
+        return self._cached_allowed(request, datum)
+
+    def _allowed_key(self, datum):
+        values = [datum is None]
+        for field in self.allowed_fields:
+            if isinstance(datum, dict):
+                values.append(datum.get(field, _MISSING))
+            else:
+                values.append(getattr(datum, field, _MISSING))
+        return tuple(values)
+
+    def _cached_allowed(self, request, datum):
+        """Calls :meth:`allowed`, reusing earlier answers where possible.
+
+        See :attr:`allowed_fields`.
+        """
+        if self.allowed_fields is None or self.table is None:
+            return self.allowed(request, datum)
+        key = (self.name, self._allowed_key(datum))
+        try:
+            hash(key)
+        except TypeError:
+            return self.allowed(request, datum)
+        if self.allowed_fields:
+            cache = self.table._allowed_cache
+        else:
+            # Datum-independent answers are kept for the whole request.
+            cache = request.__dict__.setdefault(ALLOWED_CACHE_ATTR, {})
+            key = (self.table.__class__,) + key
+        if key not in cache:
+            cache[key] = self.allowed(request, datum)
+        return cache[key]
 
     def update(self, request, datum):
         """Allows per-action customization based on current conditions.
@@ -421,6 +473,15 @@ class FilterAction(BaseAction):
 
         A string representing the type of this filter. Default: ``"query"``.
 
+    .. attribute: filter_choices
+
+        For ``"server"`` filters, a tuple of ``(field, verbose_name)`` or
+        ``(field, verbose_name, api_filter)`` tuples listing the fields
+        the user can filter on. When ``api_filter`` is ``True`` the search
+        term is handed to the view (see
+        :meth:`~horizon.tables.DataTable.get_api_filters`) to be sent to
+        the API, and :meth:`filter` isn't called for that field.
+
     .. attribute: needs_preloading
 
         If True, the filter function will be called for the initial
@@ -441,6 +502,7 @@ class FilterAction(BaseAction):
         self.name = kwargs.get('name', self.name)
         self.verbose_name = kwargs.get('verbose_name', _("Filter"))
         self.filter_type = kwargs.get('filter_type', "query")
+        self.filter_choices = kwargs.get('filter_choices', ())
         self.needs_preloading = kwargs.get('needs_preloading', False)
         self.param_name = kwargs.get('param_name', 'q')
 
@@ -452,6 +514,15 @@ class FilterAction(BaseAction):
         """
         return "__".join([self.table.name, self.name, self.param_name])
 
+    def is_api_filter(self, filter_field):
+        """Determines whether the given field is filtered by the API."""
+        if self.filter_type != "server":
+            return False
+        for choice in self.filter_choices:
+            if choice[0] == filter_field:
+                return len(choice) > 2 and bool(choice[2])
+        return False
+
     def get_default_classes(self):
         classes = super(FilterAction, self).get_default_classes()
         classes += ("btn-search",)
@@ -581,11 +652,30 @@ class BatchAction(Action):
 
        Optional location to redirect after completion of the delete
        action. Defaults to the current page.
+
+    .. attribute:: max_concurrency
+
+       Optional number of objects the action may be run on at the same
+       time, each in its own thread. Defaults to the
+       ``batch_action_concurrency`` value of ``HORIZON_CONFIG``, which is
+       ``1`` (one object after another).
+
+    .. attribute:: concurrency_timeout
+
+       Optional number of seconds after which objects still being acted on
+       concurrently are reported as failures. Defaults to the
+       ``batch_action_timeout`` value of ``HORIZON_CONFIG`` (no timeout).
     """
+    max_concurrency = None
+    concurrency_timeout = None
 
     def __init__(self, **kwargs):
         super(BatchAction, self).__init__(**kwargs)
         self.success_url = kwargs.get('success_url', None)
+        self.max_concurrency = kwargs.get('max_concurrency',
+                                          self.max_concurrency)
+        self.concurrency_timeout = kwargs.get('concurrency_timeout',
+                                              self.concurrency_timeout)
         self.data_type_singular = kwargs.get('data_type_singular', None)
         self.data_type_plural = kwargs.get('data_type_plural',
             self.data_type_singular + 's')
@@ -656,12 +746,44 @@ class BatchAction(Action):
             return self.success_url
         return request.get_full_path()
 
+    def _run_actions(self, request, obj_ids):
+        """Runs the action on each object, yielding a finished task for each.
+
+        The objects are acted on one after another unless
+        ``max_concurrency`` allows more, in which case they are all acted on
+        before the first task is yielded. Objects which are still being
+        acted on when ``concurrency_timeout`` passes get a
+        :class:`~horizon.exceptions.DeadlineExceeded` error.
+        """
+        max_concurrency = self.max_concurrency
+        if max_concurrency is None:
+            max_concurrency = conf.HORIZON_CONFIG.get(
+                'batch_action_concurrency', 1)
+        timeout = self.concurrency_timeout
+        if timeout is None:
+            timeout = conf.HORIZON_CONFIG.get('batch_action_timeout', None)
+
+        tasks = [concurrency.Task(self.action, args=(request, obj_id))
+                 for obj_id in obj_ids]
+        if max_concurrency > 1:
+            concurrency.run_concurrently(tasks, max_workers=max_concurrency,
+                                         timeout=timeout)
+            for task in tasks:
+                yield task
+        else:
+            # Acting lazily keeps an unexpected error from running the action
+            # on the remaining objects.
+            for task in tasks:
+                concurrency.run_concurrently([task], max_workers=1)
+                yield task
+
     def handle(self, table, request, obj_ids):
         action_success = []
         action_failure = []
         action_not_allowed = []
-        for datum_id in obj_ids:
-            datum = table.get_object_by_id(datum_id)
+        allowed = []
+        data = table.get_objects_by_ids(obj_ids)
+        for datum_id, datum in zip(obj_ids, data):
             datum_display = table.get_object_display(datum) or _("N/A")
             if not table._filter_action(self, request, datum):
                 action_not_allowed.append(datum_display)
@@ -669,8 +791,14 @@ class BatchAction(Action):
                          (self._get_action_name(past=True).lower(),
                           datum_display))
                 continue
+            allowed.append((datum_id, datum, datum_display))
+
+        tasks = self._run_actions(request, [item[0] for item in allowed])
+        for (datum_id, datum, datum_display), task in six.moves.zip(allowed,
+                                                                    tasks):
             try:
-                self.action(request, datum_id)
+                if task.exc_info is not None:
+                    six.reraise(*task.exc_info)
                 #Call update to invoke changes if needed
                 self.update(request, datum)
                 action_success.append(datum_display)
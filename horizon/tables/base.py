@@ -71,6 +71,15 @@ class Column(html.HTMLElement):
         Boolean to determine whether this column should be sortable or not.
         Defaults to ``True``.
 
+    .. attribute:: api_sort_key
+
+        The key the API sorts by when the table is sorted by this column,
+        e.g. ``"created_at"``. Clicking the header of such a column reloads
+        the page with the table's ``sort_param`` set, instead of sorting
+        the rows already displayed, and the view passes the key on to the
+        API (see :meth:`~horizon.tables.DataTable.get_api_sort`).
+        Defaults to ``None``.
+
     .. attribute:: hidden
 
         Boolean to determine whether or not this column should be displayed
@@ -245,7 +254,7 @@ class Column(html.HTMLElement):
                  empty_value=None, filters=None, classes=None, summation=None,
                  auto=None, truncate=None, link_classes=None, wrap_list=False,
                  form_field=None, form_field_attributes=None,
-                 update_action=None, link_attrs=None):
+                 update_action=None, link_attrs=None, api_sort_key=None):
 
         self.classes = list(classes or getattr(self, "classes", []))
         super(Column, self).__init__()
@@ -269,6 +278,7 @@ class Column(html.HTMLElement):
 
         self.auto = auto
         self.sortable = sortable
+        self.api_sort_key = api_sort_key
         self.link = link
         self.allowed_data_types = allowed_data_types
         self.hidden = hidden
@@ -297,7 +307,9 @@ class Column(html.HTMLElement):
         self.creation_counter = Column.creation_counter
         Column.creation_counter += 1
 
-        if self.sortable and not self.auto:
+        if self.api_sort_key:
+            self.classes.append("api_sortable")
+        elif self.sortable and not self.auto:
             self.classes.append("sortable")
         if self.hidden:
             self.classes.append("hide")
@@ -401,6 +413,25 @@ class Column(html.HTMLElement):
         except urlresolvers.NoReverseMatch:
             return self.link
 
+    def get_sort_direction(self):
+        """Returns ``"asc"`` or ``"desc"`` when the table is sorted by this
+        column through the API, otherwise ``None``.
+        """
+        if self.table.get_sort_column() is self:
+            return self.table.get_api_sort()[1]
+        return None
+
+    def get_sort_string(self):
+        """Returns the query parameter string to sort the table by this
+        column through the API. Sorting by the current sort column reverses
+        the direction.
+        """
+        if self.get_sort_direction() == "asc":
+            value = "-" + self.name
+        else:
+            value = self.name
+        return urlencode({self.table._meta.sort_param: value})
+
     def get_summation(self):
         """Returns the summary value for the data in this column if a
         valid summation method is specified for it. Otherwise returns ``None``.
@@ -433,6 +464,11 @@ class Row(html.HTMLElement):
     object appropriate for consumption by the table (effectively the "get"
     lookup versus the table's "list" lookup).
 
+    The rows of a table which are waiting for an update are polled together
+    in a single request. Subclasses can also define ``get_data_batch`` to
+    fetch all of their data objects with one filtered "list" lookup instead
+    of calling ``get_data`` for each of them.
+
     The automatic update interval is configurable by setting the key
     ``ajax_poll_interval`` in the ``HORIZON_CONFIG`` dictionary.
     Default: ``2500`` (measured in milliseconds).
@@ -481,10 +517,17 @@ class Row(html.HTMLElement):
         updates of cell. Generally you won't need to change this value.
         It is also used for inline edit of the cell.
         Default: ``"cell_update"``.
+
+    .. attribute:: ajax_batch_action_name
+
+        String that is used for the query parameter key to request AJAX
+        updates of several rows at once. Generally you won't need to change
+        this value. Default: ``"rows_update"``.
     """
     ajax = False
     ajax_action_name = "row_update"
     ajax_cell_action_name = "cell_update"
+    ajax_batch_action_name = "rows_update"
 
     def __init__(self, table, datum=None):
         super(Row, self).__init__()
@@ -526,6 +569,8 @@ class Row(html.HTMLElement):
             interval = conf.HORIZON_CONFIG['ajax_poll_interval']
             self.attrs['data-update-interval'] = interval
             self.attrs['data-update-url'] = self.get_ajax_update_url()
+            self.attrs['data-batch-update-url'] = \
+                self.get_ajax_batch_update_url()
             self.classes.append("ajax-update")
 
         self.attrs['data-object-id'] = table.get_object_id(datum)
@@ -582,6 +627,19 @@ class Row(html.HTMLElement):
         ]))
         return "%s?%s" % (table_url, params)
 
+    def get_ajax_batch_update_url(self):
+        """Returns the URL polling every row of this table at once.
+
+        The ids of the rows to update are appended to it as ``obj_id``
+        parameters.
+        """
+        table_url = self.table.get_absolute_url()
+        params = urlencode(SortedDict([
+            ("action", self.ajax_batch_action_name),
+            ("table", self.table.name)
+        ]))
+        return "%s?%s" % (table_url, params)
+
     def can_be_selected(self, datum):
         """By default if multiselect enabled return True. You can remove the
         checkbox after an ajax update here if required.
@@ -595,6 +653,26 @@ class Row(html.HTMLElement):
         raise NotImplementedError("You must define a get_data method on %s"
                                   % self.__class__.__name__)
 
+    def get_data_batch(self, request, obj_ids):
+        """Fetches the updated data for several rows at once.
+
+        Returns a dictionary mapping each of the given object ids to its
+        data, or to ``None`` when the object no longer exists. Ids missing
+        from it are rows which couldn't be updated this time.
+
+        By default :meth:`~horizon.tables.Row.get_data` is called for each
+        id; subclasses can override this to use a single "list" lookup.
+        """
+        data = {}
+        for obj_id in obj_ids:
+            try:
+                data[obj_id] = self.get_data(request, obj_id)
+            except Exception:
+                error = exceptions.handle(request, ignore=True)
+                if error.status_code == 404:
+                    data[obj_id] = None
+        return data
+
 
 class Cell(html.HTMLElement):
     """Represents a single cell in the table."""
@@ -845,6 +923,14 @@ class DataTableOptions(object):
         single view this will need to be changed to differentiate between the
         tables. Default: ``"marker"``.
 
+    .. attribute:: sort_param
+
+        The name of the query string parameter which holds the column the
+        API should sort this table by (see
+        :meth:`~horizon.tables.DataTable.get_api_sort`). When using multiple
+        tables in a single view this will need to be changed to
+        differentiate between the tables. Default: ``"sort"``.
+
     .. attribute:: status_columns
 
         A list or tuple of column names which represents the "state"
@@ -915,6 +1001,7 @@ class DataTableOptions(object):
                                              'prev_pagination_param',
                                              'prev_marker')
         self.pagination_param = getattr(options, 'pagination_param', 'marker')
+        self.sort_param = getattr(options, 'sort_param', 'sort')
         self.browser_table = getattr(options, 'browser_table', None)
         self.footer = getattr(options, 'footer', True)
         self.no_data_message = getattr(options,
@@ -1077,6 +1164,7 @@ class DataTable(object):
 
     def __init__(self, request, data=None, needs_form_wrapper=None, **kwargs):
         self.request = request
+        self._data_index = None
         self.data = data
         self.kwargs = kwargs
         self._needs_form_wrapper = needs_form_wrapper
@@ -1084,6 +1172,9 @@ class DataTable(object):
         self.breadcrumb = None
         self.current_item_id = None
         self.permissions = self._meta.permissions
+        # Answers of row actions' allowed() checks, see
+        # BaseAction.allowed_fields.
+        self._allowed_cache = {}
 
         # Create a new set
         columns = []
@@ -1130,12 +1221,18 @@ class DataTable(object):
             if self._meta.filter and self._meta._filter_action:
                 action = self._meta._filter_action
                 filter_string = self.get_filter_string()
+                filter_field = self.get_filter_field()
+                action.filter_string = filter_string
+                action.filter_field = filter_field
                 request_method = self.request.method
                 needs_preloading = (not filter_string
                                     and request_method == 'GET'
                                     and action.needs_preloading)
                 valid_method = (request_method == action.method)
-                if valid_method or needs_preloading:
+                # Terms for fields the API filters on were already applied
+                # when the view loaded the data.
+                api_filtered = action.is_api_filter(filter_field)
+                if (valid_method or needs_preloading) and not api_filtered:
                     if self._meta.mixed_data_type:
                         self._filtered_data = action.data_type_filter(self,
                                                                 self.data,
@@ -1152,6 +1249,69 @@ class DataTable(object):
         filter_string = self.request.POST.get(param_name, '')
         return filter_string
 
+    def get_filter_field(self):
+        """Returns the field chosen in a ``"server"`` filter, or ``None``."""
+        filter_action = self._meta._filter_action
+        if not filter_action or filter_action.filter_type != "server":
+            return None
+        param_name = filter_action.get_param_name() + "_field"
+        filter_field = self.request.POST.get(param_name)
+        if filter_field is None and filter_action.filter_choices:
+            filter_field = filter_action.filter_choices[0][0]
+        return filter_field
+
+    def get_api_filters(self, filters=None):
+        """Returns the filters the API should apply when loading the data.
+
+        ``filters`` is a dictionary of filters the view always applies; the
+        search term of the filter action is added to a copy of it, keyed by
+        the chosen field, when the filter action marks that field as an
+        API filter (see :attr:`~horizon.tables.FilterAction.filter_choices`).
+        The filter action falls back to filtering the loaded data for the
+        other fields.
+        """
+        filters = dict(filters or {})
+        filter_action = self._meta._filter_action
+        if not self._meta.filter or not filter_action:
+            return filters
+        if self.request.method != filter_action.method:
+            return filters
+        filter_field = self.get_filter_field()
+        filter_string = self.get_filter_string().strip()
+        if filter_string and filter_action.is_api_filter(filter_field):
+            filters[filter_field] = filter_string
+        return filters
+
+    def get_sort_column(self):
+        """Returns the column the API is asked to sort by, or ``None``."""
+        value = self.request.GET.get(self._meta.sort_param, '')
+        column = self.columns.get(value.lstrip('-'))
+        if column is None or not column.api_sort_key:
+            return None
+        return column
+
+    def get_api_sort(self, default=None):
+        """Returns the ``(sort_key, sort_dir)`` the API should sort by.
+
+        The column is given by the ``sort_param`` query parameter, with a
+        leading ``-`` for a descending sort; only columns with an
+        ``api_sort_key`` can be used. Returns ``default`` when no valid
+        sort was requested.
+        """
+        column = self.get_sort_column()
+        if column is None:
+            return default
+        value = self.request.GET[self._meta.sort_param]
+        sort_dir = "desc" if value.startswith('-') else "asc"
+        return (column.api_sort_key, sort_dir)
+
+    def _get_sort_string(self):
+        column = self.get_sort_column()
+        if column is None:
+            return ''
+        value = self.request.GET[self._meta.sort_param]
+        return "&" + urlencode({self._meta.sort_param: value})
+
     def _populate_data_cache(self):
         self._data_cache = {}
         # Set up hash tables to store data points for each column
@@ -1208,6 +1368,33 @@ class DataTable(object):
         """Returns the message to be displayed when there is no data."""
         return self._no_data_message
 
+    @property
+    def data(self):
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        self._data = data
+        # The id index is rebuilt on demand for the new data.
+        self._data_index = None
+
+    def _get_data_index(self):
+        """Returns a dictionary mapping unicode object ids to data objects.
+
+        The index is built the first time it's needed and kept until
+        ``data`` is replaced (or its length changes).
+        """
+        data = self.data or []
+        if self._data_index is None or self._data_index[0] != len(data):
+            index = {}
+            for datum in data:
+                obj_id = self.get_object_id(datum)
+                if not isinstance(obj_id, unicode):
+                    obj_id = unicode(str(obj_id), 'utf-8')
+                index.setdefault(obj_id, []).append(datum)
+            self._data_index = (len(data), index)
+        return self._data_index[1]
+
     def get_object_by_id(self, lookup):
         """Returns the data object from the table's dataset which matches
         the ``lookup`` parameter specified. An error will be raised if
@@ -1220,13 +1407,7 @@ class DataTable(object):
         """
         if not isinstance(lookup, unicode):
             lookup = unicode(str(lookup), 'utf-8')
-        matches = []
-        for datum in self.data:
-            obj_id = self.get_object_id(datum)
-            if not isinstance(obj_id, unicode):
-                obj_id = unicode(str(obj_id), 'utf-8')
-            if obj_id == lookup:
-                matches.append(datum)
+        matches = self._get_data_index().get(lookup, [])
         if len(matches) > 1:
             raise ValueError("Multiple matches were returned for that id: %s."
                            % matches)
@@ -1236,6 +1417,14 @@ class DataTable(object):
                                        % lookup)
         return matches[0]
 
+    def get_objects_by_ids(self, lookups):
+        """Returns the data objects matching each of the ids in ``lookups``.
+
+        The objects are returned in the same order as the ids, and errors
+        are raised as for :meth:`~horizon.tables.DataTable.get_object_by_id`.
+        """
+        return [self.get_object_by_id(lookup) for lookup in lookups]
+
     @property
     def has_actions(self):
         """Boolean. Indicates whether there are any available actions on this
@@ -1399,7 +1588,10 @@ class DataTable(object):
             # Handle AJAX row updating.
             new_row = self._meta.row_class(self)
 
-            if new_row.ajax and new_row.ajax_action_name == action_name:
+            if new_row.ajax and new_row.ajax_batch_action_name == action_name:
+                if request.is_ajax():
+                    return self.update_rows(request.GET.getlist("obj_id"))
+            elif new_row.ajax and new_row.ajax_action_name == action_name:
                 try:
                     datum = new_row.get_data(request, obj_id)
                     if self.get_object_id(datum) == self.current_item_id:
@@ -1431,6 +1623,35 @@ class DataTable(object):
                             return handled
         return None
 
+    def update_rows(self, obj_ids):
+        """Renders the rows of the given objects for a batched AJAX update.
+
+        The response maps each object id to the HTML of its row, or to
+        ``null`` if the object no longer exists. Rows which couldn't be
+        updated are left out.
+        """
+        request = self.request
+        try:
+            data = self._meta.row_class(self).get_data_batch(request, obj_ids)
+        except Exception:
+            error = exceptions.handle(request, ignore=True)
+            return HttpResponse(status=error.status_code)
+        rows = {}
+        for obj_id in obj_ids:
+            if obj_id not in data:
+                continue
+            datum = data[obj_id]
+            if datum is None:
+                rows[obj_id] = None
+                continue
+            new_row = self._meta.row_class(self)
+            if self.get_object_id(datum) == self.current_item_id:
+                self.selected = True
+                new_row.classes.append('current_selected')
+            new_row.load_cells(datum)
+            rows[obj_id] = new_row.render()
+        return HttpResponse(json.dumps(rows), content_type="application/json")
+
     def inline_edit_handle(self, request, table_name, action_name, obj_id,
                            new_row):
         """Inline edit handler.
@@ -1595,13 +1816,14 @@ class DataTable(object):
         to the previous page.
         """
         return "=".join([self._meta.prev_pagination_param,
-                         self.get_prev_marker()])
+                         self.get_prev_marker()]) + self._get_sort_string()
 
     def get_pagination_string(self):
         """Returns the query parameter string to paginate this table
         to the next page.
         """
-        return "=".join([self._meta.pagination_param, self.get_marker()])
+        return ("=".join([self._meta.pagination_param, self.get_marker()]) +
+                self._get_sort_string())
 
     def calculate_row_status(self, statuses):
         """Returns a boolean value determining the overall row status
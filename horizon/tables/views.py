@@ -13,15 +13,25 @@
 #    under the License.
 
 from collections import defaultdict
+import time
 
 from django.views import generic
 
 from horizon.templatetags.horizon import has_permissions  # noqa
+from horizon.utils import concurrency
 
 
 class MultiTableMixin(object):
     """A generic mixin which provides methods for handling DataTables."""
     data_method_pattern = "get_%s_data"
+    # Load the data for every table (or data type) concurrently rather than
+    # calling the data methods one after another.
+    concurrent_data = False
+    # The number of data fetches which may run at the same time.
+    max_concurrent_fetches = concurrency.DEFAULT_MAX_WORKERS
+    # Seconds the view may spend waiting on concurrent data fetches in total,
+    # or ``None`` to wait for as long as they take.
+    fetch_timeout = None
 
     def __init__(self, *args, **kwargs):
         super(MultiTableMixin, self).__init__(*args, **kwargs)
@@ -31,18 +41,64 @@ class MultiTableMixin(object):
 
         self._data_methods = defaultdict(list)
         self.get_data_methods(self.table_classes, self._data_methods)
+        self._fetch_deadline = None
 
     def _get_data_dict(self):
         if not self._data:
-            for table in self.table_classes:
-                data = []
-                name = table._meta.name
-                func_list = self._data_methods.get(name, [])
-                for func in func_list:
-                    data.extend(func())
-                self._data[name] = data
+            if self.concurrent_data:
+                methods = dict((table._meta.name,
+                                self._data_methods.get(table._meta.name, []))
+                               for table in self.table_classes)
+                self._data = self.call_data_methods(methods)
+            else:
+                for table in self.table_classes:
+                    data = []
+                    name = table._meta.name
+                    func_list = self._data_methods.get(name, [])
+                    for func in func_list:
+                        data.extend(func())
+                    self._data[name] = data
         return self._data
 
+    def _remaining_fetch_time(self):
+        if self.fetch_timeout is None:
+            return None
+        if self._fetch_deadline is None:
+            self._fetch_deadline = time.time() + self.fetch_timeout
+        return max(self._fetch_deadline - time.time(), 0)
+
+    def fetch_concurrently(self, **tasks):
+        """Runs independent API calls concurrently and returns their results.
+
+        Each keyword argument is a :class:`horizon.utils.concurrency.Task`;
+        the returned dictionary maps the same names to the results. Failed
+        calls are passed through :func:`horizon.exceptions.handle` and give
+        their task's default instead. All the calls made by a view share
+        its ``fetch_timeout``.
+        """
+        return concurrency.fetch(self.request, tasks,
+                                 max_workers=self.max_concurrent_fetches,
+                                 timeout=self._remaining_fetch_time())
+
+    def call_data_methods(self, methods):
+        """Calls data methods concurrently, merging their results.
+
+        ``methods`` maps table names to lists of data methods. Returns a
+        dictionary mapping the same names to the concatenated data.
+        """
+        tasks = {}
+        for name, func_list in methods.items():
+            for index, func in enumerate(func_list):
+                tasks["%s_%d" % (name, index)] = concurrency.Task(func,
+                                                                  default=[])
+        results = self.fetch_concurrently(**tasks)
+        data = {}
+        for name, func_list in methods.items():
+            data[name] = []
+            for index in range(len(func_list)):
+                data[name].extend(results["%s_%d" % (name, index)])
+        return data
+
     def get_data_methods(self, table_classes, methods):
         for table in table_classes:
             name = table._meta.name
@@ -187,6 +243,21 @@ class DataTableView(MultiTableView):
         raise NotImplementedError('You must define a "get_data" method on %s.'
                                   % self.__class__.__name__)
 
+    def get_filters(self, filters=None):
+        """Returns ``filters`` updated with the table's filter term.
+
+        The term is only included when the table's filter action lets the
+        API filter on the chosen field; see
+        :meth:`~horizon.tables.DataTable.get_api_filters`.
+        """
+        return self.get_table().get_api_filters(filters)
+
+    def get_sort(self, default=None):
+        """Returns the ``(sort_key, sort_dir)`` requested for the table, or
+        ``default``; see :meth:`~horizon.tables.DataTable.get_api_sort`.
+        """
+        return self.get_table().get_api_sort(default)
+
     def get_tables(self):
         if not self._tables:
             self._tables = {}
@@ -236,6 +307,7 @@ class MixedDataTableView(DataTableView):
         if not self._data:
             table = self.table_class
             self._data = {table._meta.name: []}
+            data_funcs = []
             for data_type in table.data_types:
                 func_name = "get_%s_data" % data_type
                 data_func = getattr(self, func_name, None)
@@ -244,11 +316,22 @@ class MixedDataTableView(DataTableView):
                     raise NotImplementedError("You must define a %s method "
                                               "for %s data type in %s." %
                                               (func_name, data_type, cls_name))
-                data = data_func()
-                self.assign_type_string(data, data_type)
-                self._data[table._meta.name].extend(data)
+                data_funcs.append(self._typed_data_func(data_func, data_type))
+            if self.concurrent_data:
+                self._data = self.call_data_methods(
+                    {table._meta.name: data_funcs})
+            else:
+                for data_func in data_funcs:
+                    self._data[table._meta.name].extend(data_func())
         return self._data
 
+    def _typed_data_func(self, data_func, data_type):
+        def typed_data():
+            data = data_func()
+            self.assign_type_string(data, data_type)
+            return data
+        return typed_data
+
     def assign_type_string(self, data, type_string):
         for datum in data:
             setattr(datum, self.table_class.data_type_name,
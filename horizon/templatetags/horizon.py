@@ -14,12 +14,15 @@
 
 from __future__ import absolute_import
 
+import hashlib
+
+from django.core.cache import cache
 from django import template
 from django.utils.datastructures import SortedDict
 from django.utils.encoding import force_unicode
 from django.utils.translation import ugettext_lazy as _
 
-from horizon.base import Horizon  # noqa
+from horizon import base
 from horizon import conf
 
 
@@ -40,29 +43,104 @@ def has_permissions_on_list(components, user):
                 in components if has_permissions(user, component)]
 
 
+def _navigation_cache_key(user):
+    """Returns the cache key of the navigation tree shown to ``user``.
+
+    What a user may see only depends on their permissions, which come from
+    their roles and the services in their current region, so every user
+    with the same permissions in a project and region shares one tree.
+    Switching to another project or region changes the key.
+    """
+    key = (base.Horizon.get_navigation_version(),
+           sorted(user.get_all_permissions()),
+           bool(getattr(user, 'is_superuser', False)),
+           bool(user.is_active),
+           getattr(user, 'tenant_id', None),
+           getattr(user, 'services_region', None))
+    return 'horizon:navigation:%s' % hashlib.sha1(repr(key)).hexdigest()
+
+
+def _build_navigation(user):
+    """Lists the dashboards and panels ``user`` may see, by slug.
+
+    Returns a list of ``(dashboard slug, visible, [(panel group slug,
+    [panel slug, ...]), ...])`` tuples for every registered dashboard, where
+    ``visible`` tells whether the dashboard itself belongs in the navigation.
+    Only permissions and static ``nav`` attributes are applied; callable
+    ``nav`` attributes depend on the template context and are left for
+    :func:`get_navigation`.
+    """
+    tree = []
+    for dash in base.Horizon.get_dashboards():
+        groups = []
+        for group in dash.get_panel_groups().values():
+            panels = [panel.slug for panel in group
+                      if panel.nav and has_permissions(user, panel)]
+            if panels:
+                groups.append((group.slug, panels))
+        visible = bool(dash.nav) and has_permissions(user, dash)
+        tree.append((dash.slug, visible, groups))
+    return tree
+
+
+def _get_navigation_tree(user):
+    timeout = conf.HORIZON_CONFIG.get('navigation_cache_timeout', None)
+    if not timeout:
+        return _build_navigation(user)
+    key = _navigation_cache_key(user)
+    tree = cache.get(key)
+    if tree is None:
+        tree = _build_navigation(user)
+        cache.set(key, tree, timeout)
+    return tree
+
+
+def _in_nav(component, context):
+    if callable(component.nav):
+        return component.nav(context)
+    return True
+
+
+def get_navigation(context):
+    """Returns the navigation for the request being rendered.
+
+    The result is a list of ``(dashboard, visible, panel_groups)`` tuples,
+    one per dashboard, where ``panel_groups`` maps the names of the panel
+    groups to the panels the user may see. The permission checks are cached
+    (see ``navigation_cache_timeout`` in ``HORIZON_CONFIG``) and the result
+    is kept on the request, so the navigation tags only compute it once.
+    """
+    request = context['request']
+    if 'navigation' in request.horizon:
+        return request.horizon['navigation']
+    navigation = []
+    for dash_slug, visible, groups in _get_navigation_tree(request.user):
+        try:
+            dash = base.Horizon.get_dashboard(dash_slug)
+        except base.NotRegistered:
+            continue
+        allowed = dict(groups)
+        non_empty_groups = []
+        for group_slug, group in dash.get_panel_groups().items():
+            slugs = allowed.get(group_slug, ())
+            panels = [panel for panel in group
+                      if panel.slug in slugs and _in_nav(panel, context)]
+            if panels:
+                non_empty_groups.append((group.name, panels))
+        navigation.append((dash, visible and bool(_in_nav(dash, context)),
+                           SortedDict(non_empty_groups)))
+    request.horizon['navigation'] = navigation
+    return navigation
+
+
 @register.inclusion_tag('horizon/_accordion_nav.html', takes_context=True)
 def horizon_nav(context):
     if 'request' not in context:
         return {}
     current_dashboard = context['request'].horizon.get('dashboard', None)
     current_panel = context['request'].horizon.get('panel', None)
-    dashboards = []
-    for dash in Horizon.get_dashboards():
-        panel_groups = dash.get_panel_groups()
-        non_empty_groups = []
-        for group in panel_groups.values():
-            allowed_panels = []
-            for panel in group:
-                if callable(panel.nav) and panel.nav(context):
-                    allowed_panels.append(panel)
-                elif not callable(panel.nav) and panel.nav:
-                    allowed_panels.append(panel)
-            if allowed_panels:
-                non_empty_groups.append((group.name, allowed_panels))
-        if callable(dash.nav) and dash.nav(context):
-            dashboards.append((dash, SortedDict(non_empty_groups)))
-        elif not callable(dash.nav) and dash.nav:
-            dashboards.append((dash, SortedDict(non_empty_groups)))
+    dashboards = [(dash, panel_groups) for dash, visible, panel_groups
+                  in get_navigation(context) if visible]
     return {'components': dashboards,
             'user': context['request'].user,
             'current': current_dashboard,
@@ -76,12 +154,8 @@ def horizon_main_nav(context):
     if 'request' not in context:
         return {}
     current_dashboard = context['request'].horizon.get('dashboard', None)
-    dashboards = []
-    for dash in Horizon.get_dashboards():
-        if callable(dash.nav) and dash.nav(context):
-            dashboards.append(dash)
-        elif dash.nav:
-            dashboards.append(dash)
+    dashboards = [dash for dash, visible, panel_groups
+                  in get_navigation(context) if visible]
     return {'components': dashboards,
             'user': context['request'].user,
             'current': current_dashboard,
@@ -94,20 +168,13 @@ def horizon_dashboard_nav(context):
     if 'request' not in context:
         return {}
     dashboard = context['request'].horizon['dashboard']
-    panel_groups = dashboard.get_panel_groups()
-    non_empty_groups = []
-
-    for group in panel_groups.values():
-        allowed_panels = []
-        for panel in group:
-            if callable(panel.nav) and panel.nav(context):
-                allowed_panels.append(panel)
-            elif not callable(panel.nav) and panel.nav:
-                allowed_panels.append(panel)
-        if allowed_panels:
-            non_empty_groups.append((group.name, allowed_panels))
-
-    return {'components': SortedDict(non_empty_groups),
+    panel_groups = SortedDict()
+    for dash, visible, groups in get_navigation(context):
+        if dash.slug == dashboard.slug:
+            panel_groups = groups
+            break
+
+    return {'components': panel_groups,
             'user': context['request'].user,
             'current': context['request'].horizon['panel'].slug,
             'request': context['request']}
@@ -19,6 +19,7 @@
 
 from django.conf import settings
 from django.contrib.auth.models import User  # noqa
+from django.core.cache import cache
 from django.core.exceptions import ImproperlyConfigured  # noqa
 from django.core import urlresolvers
 from django.utils.importlib import import_module  # noqa
@@ -26,6 +27,7 @@ from django.utils.importlib import import_module  # noqa
 import horizon
 from horizon import base
 from horizon import conf
+from horizon.templatetags import horizon as horizon_tags
 from horizon.test import helpers as test
 from horizon.test.test_dashboards.cats.dashboard import Cats  # noqa
 from horizon.test.test_dashboards.cats.kittens.panel import Kittens  # noqa
@@ -283,6 +285,54 @@ class HorizonTests(BaseHorizonTests):
                                HTTP_X_REQUESTED_WITH='XMLHttpRequest')
         self.assertEqual(resp.status_code, 200)
 
+    def test_navigation(self):
+        cats = horizon.get_dashboard("cats")
+
+        def get_navigation(user):
+            request = self.factory.get('/')
+            request.user = user
+            request.horizon = {'dashboard': cats, 'panel': None}
+            navigation = horizon_tags.get_navigation({'request': request})
+            return dict((dash.slug, (visible, groups))
+                        for dash, visible, groups in navigation)
+
+        version = base.Horizon.get_navigation_version()
+        navigation = get_navigation(self.user)
+        visible, groups = navigation['dogs']
+        self.assertTrue(visible)
+        self.assertEqual([[panel.slug for panel in panels]
+                          for panels in groups.values()], [['puppies']])
+        # The cats' panels all require a permission the user doesn't have.
+        self.assertEqual(navigation['cats'][1], {})
+        key = horizon_tags._navigation_cache_key(self.user)
+        self.assertIsNotNone(cache.get(key))
+
+        # The cached tree is used by the next page without checking the
+        # permissions of each panel again.
+        self.mox.StubOutWithMock(horizon_tags, 'has_permissions')
+        self.mox.ReplayAll()
+        self.assertEqual(get_navigation(self.user)['cats'][1], {})
+        self.mox.VerifyAll()
+        self.mox.UnsetStubs()
+
+        # Other permissions get a tree of their own.
+        self.set_permissions(permissions=['test'])
+        user = User.objects.get(pk=self.user.pk)
+        visible, groups = get_navigation(user)['cats']
+        self.assertEqual(groups.keys(), ['Cute Cats', 'Fierce Cats'])
+
+        # As does any change to the registry.
+        Cats.unregister(Tigers)
+        self.assertNotEqual(horizon_tags._navigation_cache_key(user), key)
+        visible, groups = get_navigation(user)['cats']
+        self.assertEqual(groups.keys(), ['Cute Cats'])
+
+        # The version only depends on the registry, so every process gets
+        # the same one, and it is back once the registry is.
+        Cats.register(Tigers)
+        self.assertEqual(base.Horizon.get_navigation_version(),
+                         version)
+
     def test_ssl_redirect_by_proxy(self):
         dogs = horizon.get_dashboard("dogs")
         puppies = dogs.get_panel("puppies")
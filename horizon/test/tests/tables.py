@@ -12,6 +12,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import json
+import threading
+
 from django.core.urlresolvers import reverse
 from django import forms
 from django import http
@@ -20,6 +23,7 @@ from django.template import defaultfilters
 
 from mox import IsA  # noqa
 
+from horizon import exceptions
 from horizon import tables
 from horizon.tables import formset as table_formset
 from horizon.tables import views as table_views
@@ -267,6 +271,61 @@ class NoActionsTable(tables.DataTable):
         row_actions = ()
 
 
+class MyServerFilterAction(tables.FilterAction):
+    filter_type = "server"
+    filter_choices = (('name', "Name", True),
+                      ('value', "Value"))
+
+    def filter(self, table, objs, filter_string):
+        return [obj for obj in objs if filter_string in obj.value]
+
+
+class ApiSortedTable(tables.DataTable):
+    id = tables.Column('id')
+    name = tables.Column('name', api_sort_key='display_name')
+    value = tables.Column('value')
+
+    class Meta:
+        name = "api_sorted_table"
+        table_actions = (MyServerFilterAction,)
+
+
+class CountedAction(tables.Action):
+    name = "counted"
+    allowed_fields = ("status",)
+    calls = []
+
+    def allowed(self, request, obj=None):
+        self.calls.append(obj)
+        return obj.status == 'up'
+
+    def handle(self, data_table, request, object_ids):
+        pass
+
+
+class CountedLinkAction(tables.LinkAction):
+    name = "counted_link"
+    verbose_name = "Counted Link"
+    url = "login"
+    allowed_fields = ()
+    calls = []
+
+    def allowed(self, request, obj=None):
+        self.calls.append(obj)
+        return True
+
+    def get_link_url(self, datum=None):
+        return reverse(self.url)
+
+
+class CachedAllowedTable(tables.DataTable):
+    id = tables.Column('id')
+
+    class Meta:
+        name = "cached_allowed_table"
+        row_actions = (CountedAction, CountedLinkAction)
+
+
 class DisabledActionsTable(tables.DataTable):
     id = tables.Column('id')
 
@@ -334,6 +393,24 @@ class DataTableTests(test.TestCase):
         self.assertEqual(name_column.form_field.__class__, forms.CharField)
         self.assertEqual(name_column.form_field_attributes, {'class': 'test'})
 
+    def test_table_get_object_by_id(self):
+        self.table = MyTable(self.request, TEST_DATA)
+        self.assertEqual(self.table.get_object_by_id('2'), TEST_DATA[1])
+        self.assertEqual(self.table.get_object_by_id(3), TEST_DATA[2])
+        self.assertEqual(self.table.get_objects_by_ids(['3', u'1']),
+                         [TEST_DATA[2], TEST_DATA[0]])
+        self.assertRaises(exceptions.Http302,
+                          self.table.get_object_by_id, '4')
+
+        # The index is rebuilt when the data is replaced.
+        self.table.data = TEST_DATA_4
+        self.assertEqual(self.table.get_object_by_id('1'), TEST_DATA_4[0])
+        self.assertRaises(exceptions.Http302,
+                          self.table.get_object_by_id, '3')
+
+        self.table.data = TEST_DATA + TEST_DATA_2
+        self.assertRaises(ValueError, self.table.get_object_by_id, '1')
+
     def test_table_force_no_multiselect(self):
         class TempTable(MyTable):
             class Meta:
@@ -746,6 +823,74 @@ class DataTableTests(test.TestCase):
                             '</textarea>',
                             count=1, html=True)
 
+    def test_table_batch_action_concurrency(self):
+        release = threading.Event()
+        threads = set()
+
+        class ConcurrentBatchAction(MyBatchAction):
+            max_concurrency = 3
+            concurrency_timeout = 0.5
+
+            def action(self, request, obj_id):
+                threads.add(threading.current_thread().ident)
+                if obj_id == '2':
+                    raise exceptions.Conflict('failed')
+                if obj_id == '3':
+                    release.wait()
+
+        class ConcurrentTable(MyTable):
+            class Meta:
+                name = "my_table"
+                table_actions = (ConcurrentBatchAction,)
+
+        action_string = "my_table__batch"
+        req = self.factory.post('/my_url/', {'action': action_string,
+                                             'object_ids': [1, 2, 3]})
+        self.table = ConcurrentTable(req, TEST_DATA)
+        try:
+            handled = self.table.maybe_handle()
+        finally:
+            release.set()
+        self.assertEqual(handled.status_code, 302)
+        self.assertNotIn(threading.current_thread().ident, threads)
+        action = self.table.base_actions['batch']
+        self.assertEqual(action.success_ids, ['1'])
+        self.assertEqual([m.message for m in req._messages],
+                         [u"Unable to batch items: object_2, object_3",
+                          u"Batched Item: object_1"])
+
+    def test_table_batch_row_update(self):
+        def get_data(self, request, obj_id):
+            if obj_id == "2":
+                raise exceptions.NotFound()
+            if obj_id == "3":
+                raise exceptions.Conflict()
+            return TEST_DATA_2[0]
+        self.mox.stubs.Set(MyRow, 'get_data', get_data)
+        self.mox.stubs.Set(exceptions, 'NOT_FOUND', (exceptions.NotFound,))
+
+        req = self.factory.get('/my_url/', {"table": "my_table"})
+        self.table = MyTable(req, TEST_DATA)
+        update_url = ("/my_url/?action=rows_update&amp;table=my_table")
+        self.assertContains(http.HttpResponse(self.table.render()),
+                            'data-batch-update-url="%s"' % update_url, 3)
+
+        params = {"table": "my_table", "action": "rows_update",
+                  "obj_id": ["1", "2", "3"]}
+        req = self.factory.get('/my_url/',
+                               params,
+                               HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.table = MyTable(req)
+        resp = self.table.maybe_preempt()
+        self.assertEqual(resp.status_code, 200)
+        rows = json.loads(resp.content)
+        # The object which couldn't be updated is left out, and the deleted
+        # one is null.
+        self.assertEqual(sorted(rows), ["1", "2"])
+        self.assertIsNone(rows["2"])
+        self.assertIn("my_table__row__1", rows["1"])
+        self.assertIn("status_down", rows["1"])
+
     def test_table_actions(self):
         # Single object action
         action_string = "my_table__delete__1"
@@ -1172,6 +1317,83 @@ class DataTableTests(test.TestCase):
         resp = http.HttpResponse(table.render())
         self.assertContains(resp, value)
 
+    def test_table_api_filter(self):
+        action_string = "api_sorted_table__filter__q"
+        # The API filters on the name, so the data is left alone.
+        req = self.factory.post('/my_url/', {action_string: 'object_2',
+                                             action_string + '_field': 'name'})
+        self.table = ApiSortedTable(req, TEST_DATA)
+        self.assertEqual(self.table.get_api_filters({'paginate': True}),
+                         {'paginate': True, 'name': 'object_2'})
+        self.assertQuerysetEqual(self.table.filtered_data,
+                                 ['<FakeObject: object_1>',
+                                  '<FakeObject: object_2>',
+                                  '<FakeObject: object_3>'])
+
+        # Other fields fall back to the filter action.
+        req = self.factory.post('/my_url/', {action_string: 'value_3',
+                                             action_string + '_field': 'value'})
+        self.table = ApiSortedTable(req, TEST_DATA)
+        self.assertEqual(self.table.get_api_filters(), {})
+        self.assertQuerysetEqual(self.table.filtered_data,
+                                 ['<FakeObject: object_3>'])
+
+        # The first field is used until one is chosen.
+        req = self.factory.get('/my_url/')
+        self.table = ApiSortedTable(req, TEST_DATA)
+        self.assertEqual(self.table.get_filter_field(), 'name')
+        self.assertEqual(self.table.get_api_filters(), {})
+
+    def test_table_api_sort(self):
+        req = self.factory.get('/my_url/')
+        self.table = ApiSortedTable(req, TEST_DATA)
+        self.assertIsNone(self.table.get_api_sort())
+        self.assertEqual(self.table.get_api_sort(('id', 'asc')), ('id', 'asc'))
+        name = self.table.columns['name']
+        self.assertIn('api_sortable', name.get_final_attrs()['class'])
+        self.assertNotIn('sortable', name.classes)
+        self.assertEqual(name.get_sort_string(), 'sort=name')
+
+        req = self.factory.get('/my_url/', {'sort': 'name'})
+        self.table = ApiSortedTable(req, TEST_DATA)
+        self.assertEqual(self.table.get_api_sort(), ('display_name', 'asc'))
+        name = self.table.columns['name']
+        self.assertEqual(name.get_sort_direction(), 'asc')
+        self.assertEqual(name.get_sort_string(), 'sort=-name')
+        self.assertEqual(self.table.get_pagination_string(),
+                         'marker=3&sort=name')
+
+        req = self.factory.get('/my_url/', {'sort': '-name'})
+        self.table = ApiSortedTable(req, TEST_DATA)
+        self.assertEqual(self.table.get_api_sort(), ('display_name', 'desc'))
+
+        # Columns without an API sort key are ignored.
+        req = self.factory.get('/my_url/', {'sort': 'value'})
+        self.table = ApiSortedTable(req, TEST_DATA)
+        self.assertIsNone(self.table.get_api_sort())
+        self.assertEqual(self.table.get_pagination_string(), 'marker=3')
+
+    def test_row_actions_allowed_cached(self):
+        CountedAction.calls = []
+        CountedLinkAction.calls = []
+        self.table = CachedAllowedTable(self.request, TEST_DATA)
+        actions = [[action.name for action in self.table.get_row_actions(obj)]
+                   for obj in TEST_DATA]
+        self.assertEqual(actions, [['counted', 'counted_link'],
+                                   ['counted_link'],
+                                   ['counted', 'counted_link']])
+        # Once per distinct status, and once per request for the link.
+        self.assertEqual(CountedAction.calls, [TEST_DATA[0], TEST_DATA[1]])
+        self.assertEqual(CountedLinkAction.calls, [TEST_DATA[0]])
+
+        # Another table in the same request only reuses the datum
+        # independent answer.
+        self.table = CachedAllowedTable(self.request, TEST_DATA)
+        self.table.get_row_actions(TEST_DATA[2])
+        self.assertEqual(CountedAction.calls,
+                         [TEST_DATA[0], TEST_DATA[1], TEST_DATA[2]])
+        self.assertEqual(CountedLinkAction.calls, [TEST_DATA[0]])
+
 
 class SingleTableView(table_views.DataTableView):
     table_class = MyTable
@@ -1205,6 +1427,16 @@ class MultiTableView(tables.MultiTableView):
         return TEST_DATA
 
 
+class ConcurrentMultiTableView(MultiTableView):
+    concurrent_data = True
+
+    def get_table_with_permissions_data(self):
+        return list(TEST_DATA_2)
+
+    def get_my_table_data(self):
+        return list(TEST_DATA)
+
+
 class DataTableViewTests(test.TestCase):
     def _prepare_view(self, cls, *args, **kwargs):
         req = self.factory.get('/my_url/')
@@ -1248,6 +1480,12 @@ class DataTableViewTests(test.TestCase):
         self.assertEqual(context['table_with_permissions_table'].__class__,
                          TableWithPermissions)
 
+    def test_multi_table_view_concurrent_data(self):
+        view = self._prepare_view(ConcurrentMultiTableView)
+        data = view._get_data_dict()
+        self.assertEqual(data, {'my_table': list(TEST_DATA),
+                                'table_with_permissions': list(TEST_DATA_2)})
+
 
 class FormsetTableTests(test.TestCase):
 
@@ -14,13 +14,18 @@
 
 import datetime
 import os
+import threading
 
 from django.core.exceptions import ValidationError  # noqa
+from django import http
 import django.template
 from django.template import defaultfilters
 
+from horizon import exceptions
 from horizon import forms
+from horizon import middleware
 from horizon.test import helpers as test
+from horizon.utils import concurrency
 from horizon.utils import filters
 # we have to import the filter in order to register it
 from horizon.utils.filters import parse_isotime  # noqa
@@ -353,6 +358,147 @@ class MemoizedTests(test.TestCase):
             cache_calls(1)
         self.assertEqual(len(values_list), 1)
 
+    def test_memoized_per_request(self):
+        calls = []
+
+        @memoized.memoized_per_request
+        def cache_calls(request, value):
+            calls.append(value)
+            return value
+
+        request = self.factory.get('/')
+        other_request = self.factory.get('/')
+        for x in range(0, 3):
+            cache_calls(request, 1)
+            cache_calls(request, [2])
+        cache_calls(other_request, 1)
+        # Unhashable arguments are not cached, other requests aren't shared.
+        self.assertEqual(calls, [1, [2], [2], [2], 1])
+        stats = cache_calls.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['size']),
+                         (2, 2, 2))
+
+        memoized.clear_request_cache(request)
+        cache_calls(request, 1)
+        self.assertEqual(calls[-1], 1)
+        stats = memoized.stats()['%s.cache_calls' % __name__]
+        self.assertEqual((stats['evictions'], stats['size']), (1, 2))
+
+    def test_memoized_per_request_cleared_by_middleware(self):
+        @memoized.memoized_per_request
+        def cache_calls(request):
+            return object()
+
+        request = self.factory.get('/')
+        value = cache_calls(request)
+        self.assertIs(cache_calls(request), value)
+        middleware.HorizonMiddleware().process_response(
+            request, http.HttpResponse())
+        self.assertIsNot(cache_calls(request), value)
+
+    def test_memoized_lru_evicts_least_recently_used(self):
+        calls = []
+
+        @memoized.memoized_lru(max_size=2)
+        def cache_calls(value):
+            calls.append(value)
+            return value
+
+        cache_calls(1)
+        cache_calls(2)
+        cache_calls(1)
+        cache_calls(3)
+        cache_calls(1)
+        cache_calls(2)
+        self.assertEqual(calls, [1, 2, 3, 2])
+        self.assertEqual(cache_calls.stats(),
+                         {'scope': 'lru', 'hits': 2, 'misses': 4,
+                          'evictions': 2, 'size': 2})
+
+        cache_calls.clear()
+        self.assertEqual(cache_calls.stats()['size'], 0)
+
+    def test_memoized_lru_ttl(self):
+        calls = []
+        now = [1000.0]
+
+        @memoized.memoized_lru(ttl=10)
+        def cache_calls(value):
+            calls.append(value)
+            return value
+
+        self.mox.stubs.Set(memoized.time, 'time', lambda: now[0])
+        cache_calls(1)
+        now[0] += 5
+        cache_calls(1)
+        now[0] += 10
+        cache_calls(1)
+        self.assertEqual(calls, [1, 1])
+
+
+class ConcurrencyTests(test.TestCase):
+    def test_run_concurrently(self):
+        threads = set()
+
+        def double(value):
+            threads.add(threading.current_thread().ident)
+            return value * 2
+
+        tasks = [concurrency.Task(double, args=(i,)) for i in range(5)]
+        concurrency.run_concurrently(tasks, max_workers=3)
+        self.assertEqual([task.result for task in tasks], [0, 2, 4, 6, 8])
+        self.assertTrue(all(task.exc_info is None for task in tasks))
+        self.assertNotIn(threading.current_thread().ident, threads)
+
+    def test_run_concurrently_single_worker_runs_inline(self):
+        task = concurrency.Task(lambda: threading.current_thread().ident)
+        concurrency.run_concurrently([task], max_workers=1)
+        self.assertEqual(task.result, threading.current_thread().ident)
+
+    def test_run_concurrently_captures_errors(self):
+        def fail():
+            raise ValueError("boom")
+
+        tasks = [concurrency.Task(fail, default='default'),
+                 concurrency.Task(lambda: 'ok')]
+        concurrency.run_concurrently(tasks)
+        self.assertEqual(tasks[0].result, 'default')
+        self.assertEqual(tasks[0].exc_info[0], ValueError)
+        self.assertEqual(tasks[1].result, 'ok')
+
+    def test_run_concurrently_deadline(self):
+        release = threading.Event()
+        tasks = [concurrency.Task(release.wait, default='late'),
+                 concurrency.Task(lambda: 'fast')]
+        concurrency.run_concurrently(tasks, timeout=0.1)
+        release.set()
+        self.assertEqual(tasks[0].result, 'late')
+        self.assertEqual(tasks[0].exc_info[0], exceptions.DeadlineExceeded)
+        self.assertEqual(tasks[1].result, 'fast')
+
+    def test_fetch_handles_errors(self):
+        request = self.factory.get('/')
+
+        def unavailable():
+            raise exceptions.NotAvailable("Not available")
+
+        results = concurrency.fetch(request, {
+            'ok': concurrency.Task(lambda: [1, 2]),
+            'failed': concurrency.Task(unavailable, default=[],
+                                       message="Unable to fetch."),
+        })
+        self.assertEqual(results, {'ok': [1, 2], 'failed': []})
+        self.assertEqual(len(request._messages), 1)
+
+    def test_fetch_reraises_unrecognized_errors(self):
+        def fail():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            concurrency.fetch(self.factory.get('/'), {
+                'ok': concurrency.Task(lambda: 1),
+                'failed': concurrency.Task(fail)})
+
 
 class GetPageSizeTests(test.TestCase):
     def test_bad_session_value(self):
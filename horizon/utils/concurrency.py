@@ -0,0 +1,167 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Helpers for running independent API calls concurrently.
+
+Most pages make several API calls which don't depend on each other, and
+making them one after another means the page takes as long as the sum of
+all of them. The helpers here run such calls on a bounded number of worker
+threads so that the page only takes as long as the slowest call.
+"""
+
+import sys
+import threading
+import time
+
+from django.utils import translation
+from django.utils.translation import ugettext_lazy as _
+import six
+from six.moves import queue
+
+from horizon import exceptions
+
+
+DEFAULT_MAX_WORKERS = 10
+
+
+class Task(object):
+    """A single call to be run by :func:`run_concurrently`.
+
+    ``default`` is the result used when the call fails or doesn't finish in
+    time. ``message`` and ``ignore`` are passed on to
+    :func:`horizon.exceptions.handle` by :func:`fetch` when the call fails.
+    """
+    def __init__(self, func, args=(), kwargs=None, default=None,
+                 message=None, ignore=False):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.default = default
+        self.message = message
+        self.ignore = ignore
+        # Outcome of the call, only valid once it is finished.
+        self.result = default
+        self.exc_info = None
+        self._result = None
+        self._exc_info = None
+        self._done = threading.Event()
+
+    @property
+    def finished(self):
+        return self._done.is_set()
+
+    def run(self):
+        try:
+            self._result = self.func(*self.args, **self.kwargs)
+        except Exception:
+            self._exc_info = sys.exc_info()
+        self._done.set()
+
+    def _collect(self):
+        """Publishes the outcome of the call, or a timeout if it isn't done.
+
+        This is only ever called from the thread which started the tasks, so
+        a worker finishing late can't change a result that was already used.
+        """
+        if self.finished:
+            self.exc_info = self._exc_info
+            if self.exc_info is None:
+                self.result = self._result
+        else:
+            self.result = self.default
+            try:
+                raise exceptions.DeadlineExceeded(
+                    _("Timed out waiting for %s.") %
+                    getattr(self.func, '__name__', self.func))
+            except exceptions.DeadlineExceeded:
+                self.exc_info = sys.exc_info()
+
+
+def _worker(tasks, cancelled, language):
+    if language:
+        translation.activate(language)
+    try:
+        while not cancelled.is_set():
+            try:
+                task = tasks.get_nowait()
+            except queue.Empty:
+                return
+            task.run()
+    finally:
+        translation.deactivate()
+
+
+def run_concurrently(tasks, max_workers=None, timeout=None):
+    """Runs the given :class:`Task` objects on up to ``max_workers`` threads.
+
+    Returns once every task has finished or ``timeout`` seconds have passed.
+    Afterwards each task has either a ``result`` or, when it raised or did
+    not finish in time, an ``exc_info`` tuple. Tasks which are still running
+    when the deadline passes are abandoned and get a
+    :class:`~horizon.exceptions.DeadlineExceeded` error.
+
+    A single task, or ``max_workers=1``, runs in the calling thread.
+    """
+    tasks = list(tasks)
+    max_workers = min(max_workers or DEFAULT_MAX_WORKERS, len(tasks))
+    if max_workers <= 1:
+        for task in tasks:
+            task.run()
+            task._collect()
+        return tasks
+
+    pending = queue.Queue()
+    for task in tasks:
+        pending.put(task)
+    cancelled = threading.Event()
+    language = translation.get_language()
+    for i in range(max_workers):
+        worker = threading.Thread(target=_worker,
+                                  args=(pending, cancelled, language))
+        worker.daemon = True
+        worker.start()
+
+    deadline = time.time() + timeout if timeout is not None else None
+    for task in tasks:
+        if deadline is None:
+            task._done.wait()
+        else:
+            task._done.wait(max(deadline - time.time(), 0))
+    cancelled.set()
+    for task in tasks:
+        task._collect()
+    return tasks
+
+
+def fetch(request, tasks, max_workers=None, timeout=None):
+    """Runs a dictionary of named tasks concurrently and returns their results.
+
+    Errors are handled in the calling thread, once every task is done: each
+    failed task is passed through :func:`horizon.exceptions.handle` with its
+    ``message`` and ``ignore`` options and its ``default`` is returned in
+    place of a result. Unrecognized errors are re-raised, just as they would
+    be if the calls had been made one after another.
+    """
+    run_concurrently(tasks.values(), max_workers=max_workers,
+                     timeout=timeout)
+    results = {}
+    for name, task in tasks.items():
+        if task.exc_info is not None:
+            try:
+                six.reraise(*task.exc_info)
+            except Exception:
+                exceptions.handle(request, task.message, ignore=task.ignore)
+            results[name] = task.default
+        else:
+            results[name] = task.result
+    return results
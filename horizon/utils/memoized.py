@@ -13,9 +13,12 @@
 #    under the License.
 
 import functools
+import threading
+import time
 import warnings
 import weakref
 
+from django.http import HttpRequest  # noqa
 import six
 
 
@@ -104,3 +107,200 @@ def memoized(func):
 # it doesn't keep the instances in memory forever. We might want to separate
 # them in the future, however.
 memoized_method = memoized
+
+
+# Name of the request attribute holding the per-request memoization cache.
+REQUEST_CACHE_ATTR = '_horizon_memoized'
+
+_lock = threading.RLock()
+_registry = {}
+
+
+class CacheStats(object):
+    """Counters kept for each function decorated by the bounded memoizers."""
+    def __init__(self, name, scope):
+        self.name = name
+        self.scope = scope
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.size = 0
+
+    def as_dict(self):
+        return {'scope': self.scope,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': self.size}
+
+
+def _register(func, scope):
+    name = '%s.%s' % (func.__module__, func.__name__)
+    stats = CacheStats(name, scope)
+    with _lock:
+        _registry[name] = stats
+    return stats
+
+
+def stats():
+    """Returns the cache counters of every bounded memoized function.
+
+    The result maps the dotted name of each function to a dictionary with
+    its ``scope``, ``hits``, ``misses``, ``evictions`` and current ``size``.
+    """
+    with _lock:
+        return dict((name, cache_stats.as_dict())
+                    for name, cache_stats in six.iteritems(_registry))
+
+
+class _RequestPlaceholder(object):
+    """Stands in for the request in per-request cache keys."""
+    def __repr__(self):
+        return '<request>'
+
+
+_REQUEST = _RequestPlaceholder()
+
+
+def _find_request(args, kwargs):
+    for arg in args:
+        if isinstance(arg, HttpRequest):
+            return arg
+    for value in six.itervalues(kwargs):
+        if isinstance(value, HttpRequest):
+            return value
+    return None
+
+
+def _get_strong_key(args, kwargs, request=None):
+    """Calculate a cache key holding strong references to the arguments."""
+    args = tuple(_REQUEST if arg is request else arg for arg in args)
+    kwargs = tuple(sorted(
+        (key, _REQUEST if value is request else value)
+        for (key, value) in six.iteritems(kwargs)))
+    key = args, kwargs
+    try:
+        hash(key)
+    except TypeError:
+        warnings.warn(
+            "The key %r is not hashable and cannot be memoized." % (key,),
+            UnhashableKeyWarning, 3)
+        return None
+    return key
+
+
+def memoized_per_request(func):
+    """Decorator that caches function calls for the duration of a request.
+
+    The cache lives on the request passed to the decorated function (found
+    among its arguments by type) and is emptied by
+    :class:`~horizon.middleware.HorizonMiddleware` once the response is
+    ready, so any argument type can be used without the cache outliving the
+    request. Calls made without a request are not cached.
+    """
+    stats = _register(func, 'request')
+
+    @functools.wraps(func)
+    def wrapped(*args, **kwargs):
+        request = _find_request(args, kwargs)
+        if request is None:
+            return func(*args, **kwargs)
+        key = _get_strong_key(args, kwargs, request)
+        if key is None:
+            return func(*args, **kwargs)
+        key = (stats.name, key)
+        with _lock:
+            cache = request.__dict__.setdefault(REQUEST_CACHE_ATTR, {})
+            if key in cache:
+                stats.hits += 1
+                return cache[key]
+            stats.misses += 1
+        value = func(*args, **kwargs)
+        with _lock:
+            # The cache may have been cleared while the call was running.
+            if request.__dict__.get(REQUEST_CACHE_ATTR) is cache:
+                if key not in cache:
+                    stats.size += 1
+                cache[key] = value
+        return value
+
+    wrapped.stats = stats.as_dict
+    return wrapped
+
+
+def clear_request_cache(request):
+    """Empties the cache used by :func:`memoized_per_request` for a request."""
+    with _lock:
+        cache = request.__dict__.pop(REQUEST_CACHE_ATTR, {})
+        for name, key in cache:
+            stats = _registry.get(name)
+            if stats is not None:
+                stats.size -= 1
+                stats.evictions += 1
+
+
+def memoized_lru(max_size=128, ttl=None):
+    """Decorator that caches function calls in a bounded, shared cache.
+
+    At most ``max_size`` results are kept; when the cache is full the least
+    recently used result is evicted. If ``ttl`` is given, results older than
+    that many seconds are discarded. The cache is shared by all threads and
+    requests, and holds strong references to the arguments, so it should
+    not be used for functions taking a request or other large objects.
+
+    The decorated function gets a ``clear()`` attribute which empties its
+    cache and a ``stats()`` attribute which returns its counters.
+    """
+    def decorator(func):
+        stats = _register(func, 'lru')
+        # Maps keys to [value, expiry time, last use].
+        cache = {}
+        counter = [0]
+
+        def evict(key):
+            del cache[key]
+            stats.evictions += 1
+            stats.size -= 1
+
+        @functools.wraps(func)
+        def wrapped(*args, **kwargs):
+            key = _get_strong_key(args, kwargs)
+            if key is None:
+                return func(*args, **kwargs)
+            now = time.time()
+            with _lock:
+                counter[0] += 1
+                entry = cache.get(key)
+                if entry is not None:
+                    if entry[1] is None or entry[1] > now:
+                        entry[2] = counter[0]
+                        stats.hits += 1
+                        return entry[0]
+                    evict(key)
+                stats.misses += 1
+            value = func(*args, **kwargs)
+            with _lock:
+                if key not in cache and len(cache) >= max_size:
+                    expired = [k for k, e in six.iteritems(cache)
+                               if e[1] is not None and e[1] <= now]
+                    for k in expired:
+                        evict(k)
+                    if len(cache) >= max_size:
+                        evict(min(cache, key=lambda k: cache[k][2]))
+                if key not in cache:
+                    stats.size += 1
+                counter[0] += 1
+                cache[key] = [value,
+                              now + ttl if ttl is not None else None,
+                              counter[0]]
+            return value
+
+        def clear():
+            with _lock:
+                for key in list(cache):
+                    evict(key)
+
+        wrapped.clear = clear
+        wrapped.stats = stats.as_dict
+        return wrapped
+    return decorator
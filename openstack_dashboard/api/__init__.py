@@ -32,6 +32,7 @@ shouldn't need to understand the finer details of APIs for
 Keystone/Nova/Glance/Swift et. al.
 """
 from openstack_dashboard.api import base
+from openstack_dashboard.api import bulk
 from openstack_dashboard.api import ceilometer
 from openstack_dashboard.api import cinder
 from openstack_dashboard.api import fwaas
@@ -50,6 +51,7 @@ from openstack_dashboard.api import vpn
 
 __all__ = [
     "base",
+    "bulk",
     "cinder",
     "fwaas",
     "glance",
@@ -17,15 +17,25 @@
 #    under the License.
 
 from collections import Sequence  # noqa
+import functools
+import hashlib
 import logging
+import threading
+import time
 
 from django.conf import settings
+from django.contrib.auth import signals as auth_signals
+from django.core import cache as django_cache
+
+from openstack_auth import utils as auth_utils
 
 from horizon import exceptions
 
 
 __all__ = ('APIResourceWrapper', 'APIDictWrapper',
-           'get_service_from_catalog', 'url_for',)
+           'get_service_from_catalog', 'get_service_catalog', 'url_for',
+           'cached_client', 'cached_api', 'invalidate_cached_api',
+           'invalidate_quota_usages',)
 
 
 LOG = logging.getLogger(__name__)
@@ -251,40 +261,358 @@ def get_url_for_service(service, region, endpoint_type):
     return None
 
 
+class ServiceCatalog(object):
+    """Index of a user's service catalog.
+
+    Looking a service or an endpoint up in the catalog itself means walking
+    the list of services and their endpoints, which happens whenever a
+    client is built or a panel checks whether a service is enabled. The
+    index maps service types to their service and regions, and remembers
+    the URL found for each ``(service type, region, endpoint type)``.
+    """
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self._services = {}
+        self._regions = {}
+        self._urls = {}
+        for service in catalog or []:
+            service_type = service['type']
+            # As with get_service_from_catalog, the first service wins.
+            if service_type in self._services:
+                continue
+            self._services[service_type] = service
+            self._regions[service_type] = set(
+                endpoint.get('region') for endpoint in service['endpoints'])
+
+    def get_service(self, service_type):
+        return self._services.get(service_type)
+
+    def url(self, service_type, region, endpoint_type):
+        """Returns the URL of an endpoint, or ``None`` if there is none."""
+        service = self._services.get(service_type)
+        if service is None:
+            return None
+        if service_type == 'identity':
+            # The identity endpoints are used whatever the region.
+            region = None
+        key = (service_type, region, endpoint_type)
+        if key not in self._urls:
+            self._urls[key] = get_url_for_service(service, region,
+                                                  endpoint_type)
+        return self._urls[key]
+
+    def is_enabled(self, service_type, region, service_name=None):
+        service = self._services.get(service_type)
+        if service is None:
+            return False
+        regions = self._regions[service_type]
+        if service_type == 'identity':
+            in_region = bool(regions)
+        else:
+            in_region = region in regions
+        if in_region and service_name:
+            return service['name'] == service_name
+        return in_region
+
+
+def get_service_catalog(request):
+    """Returns the :class:`ServiceCatalog` index of the user's catalog.
+
+    The index is kept on the user object and rebuilt when its catalog is
+    replaced.
+    """
+    user = request.user
+    catalog = getattr(user, 'service_catalog', None)
+    index = getattr(user, '_service_catalog_index', None)
+    if index is None or index.catalog is not catalog:
+        index = ServiceCatalog(catalog)
+        user._service_catalog_index = index
+    return index
+
+
 def url_for(request, service_type, endpoint_type=None, region=None):
     endpoint_type = endpoint_type or getattr(settings,
                                              'OPENSTACK_ENDPOINT_TYPE',
                                              'publicURL')
     fallback_endpoint_type = getattr(settings, 'SECONDARY_ENDPOINT_TYPE', None)
 
-    catalog = request.user.service_catalog
-    service = get_service_from_catalog(catalog, service_type)
-    if service:
-        if not region:
-            region = request.user.services_region
-        url = get_url_for_service(service,
-                                  region,
-                                  endpoint_type)
-        if not url and fallback_endpoint_type:
-            url = get_url_for_service(service,
-                                      region,
-                                      fallback_endpoint_type)
-        if url:
-            return url
+    catalog = get_service_catalog(request)
+    if not region:
+        region = request.user.services_region
+    url = catalog.url(service_type, region, endpoint_type)
+    if not url and fallback_endpoint_type:
+        url = catalog.url(service_type, region, fallback_endpoint_type)
+    if url:
+        return url
     raise exceptions.ServiceCatalogException(service_type)
 
 
 def is_service_enabled(request, service_type, service_name=None):
-    service = get_service_from_catalog(request.user.service_catalog,
-                                       service_type)
-    if service:
-        region = request.user.services_region
-        for endpoint in service['endpoints']:
-            # ignore region for identity
-            if service['type'] == 'identity' or \
-               endpoint['region'] == region:
-                if service_name:
-                    return service['name'] == service_name
-                else:
-                    return True
-    return False
+    return get_service_catalog(request).is_enabled(
+        service_type, request.user.services_region, service_name)
+
+
+class ClientCache(object):
+    """Process-wide registry of service clients shared between requests.
+
+    Building a client means a new HTTP session (and often a TLS handshake)
+    for every API call, so clients are kept around and handed back for as
+    long as the token they were created with is valid.
+
+    Entries are keyed by ``(service_type, endpoint, token id, region)``.
+    Clients which are not safe to share between threads are additionally
+    keyed by the calling thread. Entries are dropped when their token
+    expires, when the user logs out, or (least recently used first) when
+    the registry grows beyond ``OPENSTACK_CLIENT_CACHE['max_size']``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def config(self):
+        return getattr(settings, 'OPENSTACK_CLIENT_CACHE', {})
+
+    @property
+    def enabled(self):
+        return self.config.get('enabled', True)
+
+    def get(self, request, service_type, endpoint, factory,
+            thread_safe=True):
+        """Returns a cached client, building it with ``factory`` on a miss."""
+        if not self.enabled:
+            return factory()
+        token = request.user.token
+        key = (service_type, endpoint, token.id,
+               getattr(request.user, 'services_region', None))
+        if not thread_safe:
+            key += (threading.current_thread().ident,)
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry is not None:
+                if auth_utils.check_token_expiration(entry['token']):
+                    entry['last_used'] = time.time()
+                    self.hits += 1
+                    return entry['client']
+                del self._clients[key]
+                self.evictions += 1
+            self.misses += 1
+        client = factory()
+        with self._lock:
+            self._clients[key] = {'client': client,
+                                  'token': token,
+                                  'last_used': time.time()}
+            self._prune()
+        return client
+
+    def _prune(self):
+        max_size = self.config.get('max_size', 500)
+        if len(self._clients) <= max_size:
+            return
+        for key, entry in list(self._clients.items()):
+            if not auth_utils.check_token_expiration(entry['token']):
+                del self._clients[key]
+                self.evictions += 1
+        overflow = len(self._clients) - max_size
+        if overflow > 0:
+            lru = sorted(self._clients,
+                         key=lambda k: self._clients[k]['last_used'])
+            for key in lru[:overflow]:
+                del self._clients[key]
+                self.evictions += 1
+
+    def evict_token(self, token_id):
+        """Drops every client created with the given token."""
+        with self._lock:
+            for key in [k for k in self._clients if k[2] == token_id]:
+                del self._clients[key]
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._clients.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits,
+                    'misses': self.misses,
+                    'evictions': self.evictions,
+                    'size': len(self._clients)}
+
+
+CLIENT_CACHE = ClientCache()
+
+
+def cached_client(request, service_type, endpoint, factory,
+                  thread_safe=True):
+    """Returns a client for ``endpoint`` from the shared client registry.
+
+    ``factory`` is a callable taking no arguments which builds a new client
+    when there is no reusable one for the current token and region.
+    """
+    return CLIENT_CACHE.get(request, service_type, endpoint, factory,
+                            thread_safe=thread_safe)
+
+
+def _evict_clients_on_logout(sender, request, user, **kwargs):
+    token = getattr(user, 'token', None)
+    if token is not None:
+        CLIENT_CACHE.evict_token(token.id)
+
+
+auth_signals.user_logged_out.connect(_evict_clients_on_logout,
+                                     dispatch_uid='api_client_cache_logout')
+
+
+# How long a worker which finds no cached value waits for another worker
+# that is already fetching it, before making the API call itself.
+API_CACHE_FILL_WAIT = 2.0
+API_CACHE_FILL_POLL = 0.1
+# Upper bound on how long a worker may hold the right to refresh an entry.
+API_CACHE_LOCK_TIMEOUT = 30
+# Invalidation markers have to outlive every entry they invalidate.
+API_CACHE_GENERATION_TIMEOUT = 60 * 60 * 24
+# Name under which openstack_dashboard.usage.quotas caches the quota usages
+# of a project. The API calls which create or delete resources counted
+# against a quota drop them with invalidate_quota_usages().
+QUOTA_USAGES_CACHE = 'quotas.tenant_quota_usages'
+
+
+def _api_cache_config():
+    return getattr(settings, 'OPENSTACK_API_CACHE', {})
+
+
+def _api_cache():
+    return django_cache.get_cache(_api_cache_config().get('cache', 'default'))
+
+
+def _api_cache_digest(*parts):
+    return hashlib.md5(repr(parts).encode('utf-8')).hexdigest()
+
+
+def _api_cache_generation_key(request, name, service_type):
+    endpoint = url_for(request, service_type)
+    return 'horizon:api:%s:%s:generation' % (name, _api_cache_digest(endpoint))
+
+
+def invalidate_cached_api(request, name, service_type):
+    """Drops every result cached by the :func:`cached_api` function ``name``
+    for the endpoint of ``service_type``.
+    """
+    if not _api_cache_config().get('enabled', True):
+        return
+    _api_cache().set(_api_cache_generation_key(request, name, service_type),
+                     time.time(), API_CACHE_GENERATION_TIMEOUT)
+
+
+def invalidate_quota_usages(request):
+    """Drops the cached quota usages, after a resource was created, deleted
+    or resized or after a quota was changed.
+    """
+    try:
+        invalidate_cached_api(request, QUOTA_USAGES_CACHE, 'compute')
+    except exceptions.ServiceCatalogException:
+        pass
+
+
+def cached_api(service_type, project_scoped=False, manager=None, name=None,
+               ttl=None):
+    """Decorator which caches the result of a read-mostly API call between
+    requests, using Django's cache framework.
+
+    Cache keys are scoped by the endpoint of ``service_type`` and, if
+    ``project_scoped`` is ``True``, by the current project. The time to live
+    comes from ``OPENSTACK_API_CACHE``, where it can be set per function
+    (e.g. ``'nova.flavor_list'``); ``ttl`` replaces the global default for
+    this function. ``name`` replaces the ``'<module>.<function>'`` name the
+    function is known by, in settings and to :func:`invalidate_cached_api`.
+
+    Client resource objects hold a reference to their client, so they can't
+    be cached as they are. When the call returns a list of resources pass a
+    ``manager`` callable, taking the request and returning the client manager
+    the resources belong to; only the resources' data is then cached, and the
+    resources are rebuilt around a current manager on every hit.
+
+    Entries are kept for twice their time to live, and once an entry is out
+    of date a single worker refreshes it while the others keep using the old
+    value, so an expiring entry doesn't cause a burst of identical calls.
+
+    The decorated function gets an ``invalidate(request)`` attribute which
+    drops every cached result for the endpoint, for every project and set
+    of arguments. It should be called by the API calls which change the
+    cached data.
+    """
+    def decorator(func):
+        cache_name = name or '%s.%s' % (func.__module__.rsplit('.', 1)[-1],
+                                        func.__name__)
+
+        def entry_key(request, args, kwargs):
+            cache = _api_cache()
+            generation = cache.get(_api_cache_generation_key(
+                request, cache_name, service_type), 0)
+            project = request.user.tenant_id if project_scoped else None
+            digest = _api_cache_digest(url_for(request, service_type),
+                                       generation, project, args,
+                                       sorted(kwargs.items()))
+            return 'horizon:api:%s:%s' % (cache_name, digest)
+
+        def load(request, data):
+            if manager is None:
+                return data
+            resource_manager = manager(request)
+            return [resource_manager.resource_class(resource_manager, info,
+                                                    loaded=True)
+                    for info in data]
+
+        def dump(value):
+            if manager is None:
+                return value
+            return [resource._info for resource in value]
+
+        @functools.wraps(func)
+        def wrapped(request, *args, **kwargs):
+            config = _api_cache_config()
+            if not config.get('enabled', True):
+                return func(request, *args, **kwargs)
+            default_ttl = config.get('ttl', 300) if ttl is None else ttl
+            entry_ttl = config.get('ttls', {}).get(cache_name, default_ttl)
+            entry_ttl = min(entry_ttl, API_CACHE_GENERATION_TIMEOUT / 2)
+            cache = _api_cache()
+            key = entry_key(request, args, kwargs)
+            entry = cache.get(key)
+            if entry is not None and entry['expires'] > time.time():
+                return load(request, entry['data'])
+
+            lock_key = key + ':lock'
+            if not cache.add(lock_key, True, API_CACHE_LOCK_TIMEOUT):
+                # Somebody else is fetching the value already.
+                if entry is not None:
+                    return load(request, entry['data'])
+                waited = 0
+                while waited < API_CACHE_FILL_WAIT:
+                    time.sleep(API_CACHE_FILL_POLL)
+                    waited += API_CACHE_FILL_POLL
+                    entry = cache.get(key)
+                    if entry is not None:
+                        return load(request, entry['data'])
+                return func(request, *args, **kwargs)
+            try:
+                value = func(request, *args, **kwargs)
+                cache.set(key, {'data': dump(value),
+                                'expires': time.time() + entry_ttl},
+                          entry_ttl * 2)
+            finally:
+                cache.delete(lock_key)
+            return value
+
+        def invalidate(request):
+            invalidate_cached_api(request, cache_name, service_type)
+
+        wrapped.invalidate = invalidate
+        return wrapped
+    return decorator
@@ -0,0 +1,179 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Operations on many resources at once, such as tearing down a project.
+
+The other API modules only act on one object per call. The functions here
+take a resource type and a list of ids, run the calls for each service on a
+bounded number of threads (see ``OPENSTACK_BULK_CONCURRENCY``) and use a
+service's own bulk requests where it has them: the Swift bulk delete
+middleware and Keystone role assignment listings.
+
+Every function returns a dictionary mapping each id to ``None`` when the
+operation succeeded, or to the exception it raised, so that callers can
+report partial failures.
+"""
+
+from django.conf import settings
+from django.utils.datastructures import SortedDict
+
+from horizon.utils import concurrency
+
+from openstack_dashboard.api import cinder
+from openstack_dashboard.api import glance
+from openstack_dashboard.api import keystone
+from openstack_dashboard.api import network
+from openstack_dashboard.api import neutron
+from openstack_dashboard.api import nova
+from openstack_dashboard.api import swift
+
+
+DEFAULT_MAX_CONCURRENCY = 10
+
+# Resource type: (service type, API module, function deleting a single id).
+# The functions are looked up by name when called so they can be replaced.
+DELETE_FUNCTIONS = {
+    'instance': ('compute', nova, 'server_delete'),
+    'keypair': ('compute', nova, 'keypair_delete'),
+    'volume': ('volume', cinder, 'volume_delete'),
+    'volume_snapshot': ('volume', cinder, 'volume_snapshot_delete'),
+    'image': ('image', glance, 'image_delete'),
+    'network': ('network', neutron, 'network_delete'),
+    'subnet': ('network', neutron, 'subnet_delete'),
+    'port': ('network', neutron, 'port_delete'),
+    'router': ('network', neutron, 'router_delete'),
+    'floating_ip': ('network', network, 'tenant_floating_ip_release'),
+    'security_group': ('network', network, 'security_group_delete'),
+    'project': ('identity', keystone, 'tenant_delete'),
+    'user': ('identity', keystone, 'user_delete'),
+}
+
+DISASSOCIATE_FUNCTIONS = {
+    'floating_ip': ('network', network, 'floating_ip_disassociate'),
+}
+
+
+def max_concurrency(service_type):
+    """Returns how many calls to a service may be made at the same time."""
+    config = getattr(settings, 'OPENSTACK_BULK_CONCURRENCY', {})
+    return config.get(service_type,
+                      config.get('default', DEFAULT_MAX_CONCURRENCY))
+
+
+def _run_each(request, service_type, func, ids, args=(), timeout=None):
+    """Calls ``func(request, id, *args)`` for each id on a bounded pool."""
+    tasks = [concurrency.Task(func, args=(request, obj_id) + tuple(args))
+             for obj_id in ids]
+    concurrency.run_concurrently(tasks,
+                                 max_workers=max_concurrency(service_type),
+                                 timeout=timeout)
+    return dict((obj_id, task.exc_info[1] if task.exc_info else None)
+                for obj_id, task in zip(ids, tasks))
+
+
+def _delete_objects(request, ids, timeout=None):
+    # Object ids are "<container>/<object>"; each container is bulk deleted
+    # separately and the containers are handled concurrently.
+    containers = SortedDict()
+    for obj_id in ids:
+        container_name, object_name = obj_id.split(swift.FOLDER_DELIMITER, 1)
+        containers.setdefault(container_name, []).append(object_name)
+
+    tasks = [concurrency.Task(swift.swift_delete_objects,
+                              args=(request, container_name, object_names))
+             for container_name, object_names in containers.items()]
+    concurrency.run_concurrently(
+        tasks, max_workers=max_concurrency('object-store'), timeout=timeout)
+
+    results = {}
+    for (container_name, object_names), task in zip(containers.items(),
+                                                    tasks):
+        for object_name in object_names:
+            obj_id = swift.FOLDER_DELIMITER.join((container_name,
+                                                  object_name))
+            if task.exc_info:
+                results[obj_id] = task.exc_info[1]
+            else:
+                results[obj_id] = task.result[object_name]
+    return results
+
+
+def _delete(request, resource_type, ids, timeout=None, **kwargs):
+    if resource_type == 'object':
+        return _delete_objects(request, ids, timeout=timeout)
+    if resource_type == 'project_member':
+        return keystone.remove_tenant_users(
+            request, users=ids, max_workers=max_concurrency('identity'),
+            **kwargs)
+    if resource_type not in DELETE_FUNCTIONS:
+        raise ValueError('Unable to delete resources of type "%s".'
+                         % resource_type)
+    service_type, module, name = DELETE_FUNCTIONS[resource_type]
+    return _run_each(request, service_type, getattr(module, name), ids,
+                     timeout=timeout)
+
+
+def delete_many(request, resources, timeout=None, **kwargs):
+    """Deletes resources of several types at once.
+
+    ``resources`` maps resource types to lists of ids. The resource types
+    are all handled at the same time, each with the concurrency limit of
+    its service. Returns a dictionary mapping each resource type to the
+    results for its ids, as returned by :func:`delete`.
+    """
+    resources = dict((resource_type, list(ids))
+                     for resource_type, ids in resources.items())
+    resource_types = list(resources)
+    tasks = [concurrency.Task(_delete,
+                              args=(request, resource_type,
+                                    resources[resource_type]),
+                              kwargs=dict(kwargs, timeout=timeout))
+             for resource_type in resource_types]
+    concurrency.run_concurrently(tasks, max_workers=len(tasks) or 1)
+
+    results = {}
+    for resource_type, task in zip(resource_types, tasks):
+        if task.exc_info:
+            error = task.exc_info[1]
+            results[resource_type] = dict((obj_id, error) for obj_id
+                                          in resources[resource_type])
+        else:
+            results[resource_type] = task.result
+    return results
+
+
+def delete(request, resource_type, ids, timeout=None, **kwargs):
+    """Deletes the resources of one type with the given ids.
+
+    ``resource_type`` is one of the keys of ``DELETE_FUNCTIONS``,
+    ``'object'`` for Swift objects (with ``"<container>/<object>"`` ids) or
+    ``'project_member'`` to remove users from the project given as the
+    ``project`` keyword argument. Ids which are not done after ``timeout``
+    seconds get a :class:`~horizon.exceptions.DeadlineExceeded` error.
+    """
+    return _delete(request, resource_type, list(ids), timeout=timeout,
+                   **kwargs)
+
+
+def disassociate(request, resource_type, ids, timeout=None):
+    """Disassociates the resources of one type with the given ids.
+
+    Only floating IPs (``'floating_ip'``) can be disassociated for now.
+    """
+    if resource_type not in DISASSOCIATE_FUNCTIONS:
+        raise ValueError('Unable to disassociate resources of type "%s".'
+                         % resource_type)
+    service_type, module, name = DISASSOCIATE_FUNCTIONS[resource_type]
+    # The port is looked up by the floating IP managers themselves.
+    return _run_each(request, service_type, getattr(module, name), list(ids),
+                     args=(None,), timeout=timeout)
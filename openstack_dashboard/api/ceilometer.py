@@ -12,6 +12,7 @@
 
 import logging
 import threading
+import time
 
 from ceilometerclient import client as ceilometer_client
 from django.conf import settings
@@ -19,8 +20,11 @@ from django.utils import datastructures
 from django.utils.translation import ugettext_lazy as _
 
 from horizon import exceptions
+from horizon.utils import concurrency
+from horizon.utils.memoized import memoized_per_request  # noqa
 
 from openstack_dashboard.api import base
+from openstack_dashboard.api import bulk
 from openstack_dashboard.api import keystone
 from openstack_dashboard.api import nova
 
@@ -130,8 +134,8 @@ class Resource(base.APIResourceWrapper):
         # Meters with statistics data
         self._meters = {}
 
-        # TODO(lsmola) make parallel obtaining of tenant and user
-        # make the threading here, thread join into resource_list
+        # The users and tenants of a whole listing are resolved at once by
+        # CeilometerUsage.resolve_users_and_tenants, so these are lookups.
         if ceilometer_usage and self.project_id:
             self._tenant = ceilometer_usage.get_tenant(self.project_id)
         else:
@@ -214,8 +218,6 @@ class ResourceAggregate(Resource):
         if query:
             self._query = query
         else:
-            # TODO(lsmola) make parallel obtaining of tenant and user
-            # make the threading here, thread join into resource_list
             if (ceilometer_usage and tenant_id):
                 self.tenant_id = tenant_id
                 self._tenant = ceilometer_usage.get_tenant(tenant_id)
@@ -272,6 +274,12 @@ def ceilometerclient(request):
     """Initialization of Ceilometer client."""
 
     endpoint = base.url_for(request, 'metering')
+    return base.cached_client(request, 'metering', endpoint,
+                              lambda: _create_ceilometerclient(request,
+                                                               endpoint))
+
+
+def _create_ceilometerclient(request, endpoint):
     insecure = getattr(settings, 'OPENSTACK_SSL_NO_VERIFY', False)
     cacert = getattr(settings, 'OPENSTACK_SSL_CACERT', None)
     LOG.debug('ceilometerclient connection created using token "%s" '
@@ -302,6 +310,33 @@ def meter_list(request, query=None):
     return [Meter(m) for m in meters]
 
 
+@base.cached_api('metering', project_scoped=True,
+                 name='ceilometer.meter_catalog')
+def _meter_catalog_data(request):
+    """Returns the name, type and unit of each distinct meter.
+
+    Ceilometer lists a meter once for every resource it has samples of, so
+    only the first meter of each name is kept.
+    """
+    meters = datastructures.SortedDict()
+    for meter in meter_list(request):
+        if meter.name not in meters:
+            meters[meter.name] = {'name': meter.name,
+                                  'type': getattr(meter, 'type', None),
+                                  'unit': getattr(meter, 'unit', "")}
+    return meters.values()
+
+
+@memoized_per_request
+def meter_catalog(request):
+    """Returns the :class:`Meters` of the request, which are built once.
+
+    The meters themselves are cached between requests, see
+    ``OPENSTACK_API_CACHE``.
+    """
+    return Meters(request)
+
+
 def statistic_list(request, meter_name, query=None, period=None):
     """List of statistics."""
     statistics = ceilometerclient(request).\
@@ -309,71 +344,196 @@ def statistic_list(request, meter_name, query=None, period=None):
     return [Statistic(s) for s in statistics]
 
 
-class ThreadedUpdateResourceWithStatistics(threading.Thread):
-    """Multithread wrapper for update_with_statistics method of
-    resource_usage.
+def statistics_key(meter_name, query=None, period=None):
+    """Returns a hashable key identifying a call to :func:`statistic_list`."""
+    conditions = tuple(tuple(sorted(condition.items()))
+                       if isinstance(condition, dict) else condition
+                       for condition in query or [])
+    return (meter_name, conditions, period)
 
-    A join logic is placed in process_list class method. All resources
-    will have its statistics attribute filled in separate threads.
 
-    The resource_usage object is shared between threads. Each thread is
-    updating one Resource.
+class StatisticsExecutor(object):
+    """Makes the statistics calls of the metering pages on a bounded pool.
 
-    :Parameters:
-      - `resource`: Resource or ResourceAggregate object, that will
-                    be filled by statistic data.
-      - `resources`: List of Resource or ResourceAggregate object,
-                     that will be filled by statistic data.
-      - `resource_usage`: Wrapping resource usage object, that holds
-                          all statistics data.
-      - `meter_names`: List of meter names of the statistics we want.
-      - `period`: In seconds. If no period is given, only one aggregate
-                  statistic is returned. If given, a faceted result will be
-                  returned, divided into given periods. Periods with no
-                  data are ignored.
-      - `stats_attr`: String representing the attribute name of the stats.
-                      E.g. (avg, max, min...) If None is given, whole
-                      statistic object is returned,
-      - `additional_query`: Additional query for the statistics.
-                            E.g. timespan, etc.
+    Identical calls (same meter, query and period) asked for at once are
+    only made once. The calls in flight to the metering endpoint of a
+    region, counting those of every request served by the process, are
+    limited to ``OPENSTACK_BULK_CONCURRENCY['metering']``; the others wait
+    in a queue. :meth:`stats` returns the queue depth, the number of calls
+    in flight and their latency.
     """
-    # TODO(lsmola) Can be removed once Ceilometer supports sample-api
-    # and group-by, so all of this optimization will not be necessary.
-    # It is planned somewhere to I.
-
-    def __init__(self, resource_usage, resource, meter_names=None,
-                 period=None, filter_func=None, stats_attr=None,
-                 additional_query=None):
-        super(ThreadedUpdateResourceWithStatistics, self).__init__()
-        self.resource_usage = resource_usage
-        self.resource = resource
-        self.meter_names = meter_names
-        self.period = period
-        self.stats_attr = stats_attr
-        self.additional_query = additional_query
-
-    def run(self):
-        # Run the job
-        self.resource_usage.update_with_statistics(self.resource,
-            meter_names=self.meter_names, period=self.period,
-            stats_attr=self.stats_attr, additional_query=self.additional_query)
-
-    @classmethod
-    def process_list(cls, resource_usage, resources, meter_names=None,
-                 period=None, filter_func=None, stats_attr=None,
-                 additional_query=None):
-        threads = []
+    # States of a call.
+    QUEUED, STARTED, DROPPED = range(3)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._semaphores = {}
+        self.queued = 0
+        self.in_flight = 0
+        self.calls = 0
+        self.deduplicated = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def _semaphore(self, request, max_calls):
+        user = getattr(request, 'user', None)
+        key = (getattr(user, 'services_region', None), max_calls)
+        with self._lock:
+            if key not in self._semaphores:
+                self._semaphores[key] = threading.BoundedSemaphore(max_calls)
+            return self._semaphores[key]
+
+    def _call(self, states, key, semaphore, request, meter_name, query,
+              period):
+        with self._lock:
+            if states[key] == self.DROPPED:
+                # The deadline passed before the call could start.
+                return None
+            states[key] = self.STARTED
+        with semaphore:
+            with self._lock:
+                self.queued -= 1
+                self.in_flight += 1
+            start = time.time()
+            try:
+                return statistic_list(request, meter_name, query=query,
+                                      period=period)
+            finally:
+                latency = time.time() - start
+                with self._lock:
+                    self.in_flight -= 1
+                    self.calls += 1
+                    self.latency_total += latency
+                    self.latency_max = max(self.latency_max, latency)
+
+    def run(self, request, calls, timeout=None):
+        """Makes the given statistics calls and returns their outcome.
+
+        ``calls`` is a list of ``(meter_name, query, period)`` tuples. The
+        result maps the :func:`statistics_key` of each call to a finished
+        :class:`~horizon.utils.concurrency.Task`, with either a ``result``
+        or an ``exc_info``. Calls which aren't done after ``timeout``
+        seconds get a :class:`~horizon.exceptions.DeadlineExceeded` error,
+        while the others keep their results.
+        """
+        unique = datastructures.SortedDict()
+        for meter_name, query, period in calls:
+            key = statistics_key(meter_name, query, period)
+            if key in unique:
+                with self._lock:
+                    self.deduplicated += 1
+                continue
+            unique[key] = (meter_name, query, period)
+        if not unique:
+            return {}
+
+        max_calls = bulk.max_concurrency('metering')
+        semaphore = self._semaphore(request, max_calls)
+        states = dict((key, self.QUEUED) for key in unique)
+        tasks = datastructures.SortedDict(
+            (key, concurrency.Task(self._call,
+                                   args=(states, key, semaphore, request) +
+                                   call))
+            for key, call in unique.items())
+        with self._lock:
+            self.queued += len(tasks)
+        concurrency.run_concurrently(tasks.values(), max_workers=max_calls,
+                                     timeout=timeout)
+
+        with self._lock:
+            for key, state in states.items():
+                if state == self.QUEUED:
+                    states[key] = self.DROPPED
+                    self.queued -= 1
+            for task in tasks.values():
+                if task.exc_info is None:
+                    continue
+                if isinstance(task.exc_info[1], exceptions.DeadlineExceeded):
+                    self.timeouts += 1
+                else:
+                    self.errors += 1
+        return tasks
 
-        for resource in resources:
-            # add statistics data into resource
-            thread = cls(resource_usage, resource, meter_names=meter_names,
-                period=period, stats_attr=stats_attr,
-                additional_query=additional_query)
-            thread.start()
-            threads.append(thread)
+    def stats(self):
+        with self._lock:
+            return {'queued': self.queued,
+                    'in_flight': self.in_flight,
+                    'calls': self.calls,
+                    'deduplicated': self.deduplicated,
+                    'errors': self.errors,
+                    'timeouts': self.timeouts,
+                    'latency_avg': (self.latency_total / self.calls
+                                    if self.calls else 0.0),
+                    'latency_max': self.latency_max}
 
-        for thread in threads:
-            thread.join()
+
+STATISTICS_EXECUTOR = StatisticsExecutor()
+
+
+class NameCache(object):
+    """Keeps the Keystone users and tenants of the resources for a while.
+
+    The cache is shared by every request served by the process, so that
+    loading the metering pages again doesn't look up the same users and
+    tenants in Keystone. Entries are kept for ``ttl`` seconds and at most
+    ``max_size`` of them are kept, the oldest ones being dropped first.
+    Both are read from ``OPENSTACK_CEILOMETER_NAME_CACHE``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Maps keys to (object, expiry time).
+        self._entries = {}
+
+    def _config(self):
+        config = {'enabled': True, 'ttl': 300, 'max_size': 10000}
+        config.update(getattr(settings, 'OPENSTACK_CEILOMETER_NAME_CACHE',
+                              {}))
+        return config
+
+    def _key(self, request, kind, obj_id):
+        # The objects are shared by the users of the same Keystone.
+        user = getattr(request, 'user', None)
+        return (getattr(user, 'endpoint', None), kind, obj_id)
+
+    def get_many(self, request, kind, ids):
+        """Returns a dictionary of the cached objects with the given ids."""
+        if not self._config()['enabled']:
+            return {}
+        now = time.time()
+        found = {}
+        with self._lock:
+            for obj_id in ids:
+                entry = self._entries.get(self._key(request, kind, obj_id))
+                if entry is not None and entry[1] > now:
+                    found[obj_id] = entry[0]
+        return found
+
+    def set_many(self, request, kind, objects):
+        """Caches a dictionary mapping ids to objects."""
+        config = self._config()
+        if not config['enabled']:
+            return
+        now = time.time()
+        with self._lock:
+            for obj_id, obj in objects.items():
+                self._entries[self._key(request, kind, obj_id)] = (
+                    obj, now + config['ttl'])
+            excess = len(self._entries) - config['max_size']
+            if excess > 0:
+                oldest = sorted(self._entries,
+                                key=lambda key: self._entries[key][1])
+                for key in oldest[:excess]:
+                    del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+NAME_CACHE = NameCache()
 
 
 class CeilometerUsage(object):
@@ -389,15 +549,27 @@ class CeilometerUsage(object):
     This class should also serve as reasonable abstraction, that will
     cover huge amount of optimization due to optimization of Ceilometer
     service, without changing of the interface.
+
+    The users and tenants are also kept in ``name_cache``, shared by the
+    requests, which defaults to :data:`NAME_CACHE`.
     """
 
-    def __init__(self, request):
+    # Resolving more ids than this lists all the users or tenants instead
+    # of getting them one by one.
+    preload_threshold = 50
+
+    def __init__(self, request, name_cache=None):
         self._request = request
+        self._name_cache = name_cache or NAME_CACHE
 
         # Cached users and tenants.
         self._users = {}
         self._tenants = {}
 
+        # (resource id, meter name, exception) of each statistic which
+        # couldn't be obtained.
+        self.statistics_errors = []
+
     def get_user(self, user_id):
         """Returns user fetched form API
 
@@ -419,10 +591,9 @@ class CeilometerUsage(object):
         users by separate API get calls.
         """
 
-        users = keystone.user_list(self._request)
         # Cache all users on right indexes, this is more effective than to
         # obtain large number of users one by one by keystone.user_get
-        for u in users:
+        for u in keystone.iter_users(self._request):
             self._users[u.id] = u
 
     def get_tenant(self, tenant_id):
@@ -446,12 +617,56 @@ class CeilometerUsage(object):
         tenants by separate API get calls.
         """
 
-        tenants, more = keystone.tenant_list(self._request)
         # Cache all tenants on right indexes, this is more effective than to
         # obtain large number of tenants one by one by keystone.tenant_get
-        for t in tenants:
+        for t in keystone.iter_projects(self._request):
             self._tenants[t.id] = t
 
+    def _resolve(self, kind, ids, cached, get_func, preload_func):
+        missing = set(ids) - set(cached)
+        if not missing:
+            return
+        cached.update(self._name_cache.get_many(self._request, kind,
+                                                missing))
+        missing -= set(cached)
+        if not missing:
+            return
+        if len(missing) > self.preload_threshold:
+            preload_func()
+        else:
+            missing = list(missing)
+            tasks = [concurrency.Task(get_func, args=(self._request, obj_id))
+                     for obj_id in missing]
+            concurrency.run_concurrently(
+                tasks, max_workers=bulk.max_concurrency('identity'))
+            # The ones which failed are left for get_user or get_tenant to
+            # report.
+            cached.update((obj_id, task.result)
+                          for obj_id, task in zip(missing, tasks)
+                          if task.exc_info is None)
+        self._name_cache.set_many(self._request, kind,
+                                  dict((obj_id, cached[obj_id])
+                                       for obj_id in missing
+                                       if obj_id in cached))
+
+    def resolve_users_and_tenants(self, resources):
+        """Fetches the users and tenants of many resources in one pass.
+
+        The distinct ids are looked up in the shared name cache first. The
+        remaining ones are fetched concurrently, on at most
+        ``OPENSTACK_BULK_CONCURRENCY['identity']`` threads, or by listing
+        all the users or tenants when there are more than
+        ``preload_threshold`` of them.
+        """
+        self._resolve('user',
+                      set(r.user_id for r in resources if r.user_id),
+                      self._users, keystone.user_get,
+                      self.preload_all_users)
+        self._resolve('tenant',
+                      set(r.project_id for r in resources if r.project_id),
+                      self._tenants, keystone.tenant_get,
+                      self.preload_all_tenants)
+
     def global_data_get(self, used_cls=None, query=None,
                         with_statistics=False, additional_query=None,
                         with_users_and_tenants=True):
@@ -554,27 +769,56 @@ class CeilometerUsage(object):
           - `additional_query`: Additional query for the statistics.
                                 E.g. timespan, etc.
         """
+        self.update_list_with_statistics(
+            [resource], meter_names=meter_names, period=period,
+            stats_attr=stats_attr, additional_query=additional_query)
+        return resource
+
+    def update_list_with_statistics(self, resources, meter_names=None,
+                                    period=None, stats_attr=None,
+                                    additional_query=None):
+        """Adding statistical data into many resources at once.
+
+        The statistics calls of all the resources are made together by
+        :data:`STATISTICS_EXECUTOR`, so identical calls are made only once
+        and at most ``OPENSTACK_CEILOMETER_STATISTICS_TIMEOUT`` seconds are
+        spent waiting for them. The meters whose statistics couldn't be
+        obtained are set to ``None`` and listed in ``statistics_errors``.
+        See :meth:`update_with_statistics` for the parameters.
+        """
 
         if not meter_names:
             raise ValueError("meter_names and resource must be defined to be"
                              "able to obtain the statistics.")
+        if additional_query and not is_iterable(additional_query):
+            raise ValueError("Additional query must be list of"
+                             " conditions. See the docs for format.")
 
-        # query for identifying one resource in meters
-        query = resource.query
-        if additional_query:
-            if not is_iterable(additional_query):
-                raise ValueError("Additional query must be list of"
-                                 " conditions. See the docs for format.")
-            query = query + additional_query
-
-        # TODO(lsmola) thread for each meter will be probably overkill
-        # but I should test lets say thread pool with 100 of threads
-        # and apply it only to this code.
-        # Though I do expect Ceilometer will support bulk requests,
-        # so all of this optimization will not be necessary.
-        for meter in meter_names:
-            statistics = statistic_list(self._request, meter,
-                                        query=query, period=period)
+        calls = []
+        for resource in resources:
+            # query for identifying one resource in meters
+            query = resource.query
+            if additional_query:
+                query = query + additional_query
+            for meter in meter_names:
+                calls.append((resource, meter, (meter, query, period)))
+
+        timeout = getattr(settings, 'OPENSTACK_CEILOMETER_STATISTICS_TIMEOUT',
+                          None)
+        tasks = STATISTICS_EXECUTOR.run(self._request,
+                                        [call for r, m, call in calls],
+                                        timeout=timeout)
+
+        failed = 0
+        for resource, meter, call in calls:
+            task = tasks[statistics_key(*call)]
+            if task.exc_info:
+                failed += 1
+                self.statistics_errors.append((resource.id, meter,
+                                               task.exc_info[1]))
+                statistics = None
+            else:
+                statistics = task.result
             meter = meter.replace(".", "_")
             if statistics:
                 if stats_attr:
@@ -588,7 +832,10 @@ class CeilometerUsage(object):
             else:
                 resource.set_meter(meter, None)
 
-        return resource
+        if failed:
+            LOG.warning("Unable to retrieve %d of %d statistics.",
+                        failed, len(calls))
+        return resources
 
     def resources(self, query=None, filter_func=None,
                   with_users_and_tenants=False):
@@ -604,15 +851,14 @@ class CeilometerUsage(object):
           - `with_users_and_tenants`: If true a user and a tenant object will
                                       be added to each resource object.
         """
-        if with_users_and_tenants:
-            ceilometer_usage_object = self
-        else:
-            ceilometer_usage_object = None
-        resources = resource_list(self._request,
-            query=query, ceilometer_usage_object=ceilometer_usage_object)
+        resources = resource_list(self._request, query=query)
         if filter_func:
             resources = [resource for resource in resources if
                          filter_func(resource)]
+        if with_users_and_tenants:
+            self.resolve_users_and_tenants(resources)
+            resources = [Resource(resource._apiresource, self)
+                         for resource in resources]
 
         return resources
 
@@ -646,7 +892,7 @@ class CeilometerUsage(object):
         resources = self.resources(query, filter_func=filter_func,
             with_users_and_tenants=with_users_and_tenants)
 
-        ThreadedUpdateResourceWithStatistics.process_list(self, resources,
+        self.update_list_with_statistics(resources,
             meter_names=meter_names, period=period, stats_attr=stats_attr,
             additional_query=additional_query)
 
@@ -693,7 +939,7 @@ class CeilometerUsage(object):
         """
         resource_aggregates = self.resource_aggregates(queries)
 
-        ThreadedUpdateResourceWithStatistics.process_list(self,
+        self.update_list_with_statistics(
             resource_aggregates, meter_names=meter_names, period=period,
             stats_attr=stats_attr, additional_query=additional_query)
 
@@ -718,8 +964,13 @@ class Meters(object):
     It is storing information that is not available in Ceilometer, i.e.
     label, description.
 
+    The meters are indexed by name and by service. Use
+    :func:`meter_catalog` rather than building them again for each use.
     """
 
+    # The services with meters info, in the order they are listed.
+    SERVICES = ('nova', 'neutron', 'glance', 'cinder', 'swift', 'kwapi')
+
     def __init__(self, request=None, ceilometer_meter_list=None):
         # Storing the request.
         self._request = request
@@ -729,7 +980,9 @@ class Meters(object):
             self._ceilometer_meter_list = ceilometer_meter_list
         else:
             try:
-                self._ceilometer_meter_list = meter_list(request)
+                self._ceilometer_meter_list = [
+                    Meter(base.APIDictWrapper(data))
+                    for data in _meter_catalog_data(request)]
             except Exception:
                 self._ceilometer_meter_list = []
                 exceptions.handle(self._request,
@@ -750,14 +1003,40 @@ class Meters(object):
             self._cinder_meters_info, self._swift_meters_info,
             self._kwapi_meters_info)
         self._all_meters_info = {}
-        for service_meters in all_services_meters:
+        # The service of each meter with meters info.
+        self._services = {}
+        for service, service_meters in zip(self.SERVICES,
+                                           all_services_meters):
             self._all_meters_info.update(dict([(meter_name, meter_info)
                 for meter_name,
                     meter_info in service_meters.items()]))
+            for meter_name in service_meters:
+                self._services.setdefault(meter_name, service)
 
-        # Here will be the cached Meter objects, that will be reused for
-        # repeated listing.
-        self._cached_meters = {}
+        # The Meter objects by name, joined with their label and
+        # description.
+        self._meters = {}
+        for meter in self._ceilometer_meter_list:
+            if meter.name in self._meters:
+                continue
+            meter_info = self._all_meters_info.get(meter.name, None)
+            if meter_info:
+                meter.augment(label=meter_info["label"],
+                              description=meter_info["description"])
+            self._meters[meter.name] = meter
+
+    def get(self, meter_name):
+        """Returns the meter with the given name, or ``None``."""
+        return self._meters.get(meter_name, None)
+
+    def unit(self, meter_name):
+        """Returns the unit of a meter, or an empty string."""
+        meter = self.get(meter_name)
+        return meter.unit if meter else ""
+
+    def service(self, meter_name):
+        """Returns the service of a meter (e.g. ``'nova'``), or ``None``."""
+        return self._services.get(meter_name, None)
 
     def list_all(self, only_meters=None, except_meters=None):
         """Returns a list of meters based on the meters names
@@ -868,31 +1147,13 @@ class Meters(object):
     def _get_meter(self, meter_name):
         """Obtains a meter
 
-        Obtains meter either from cache or from Ceilometer meter list
-        joined with statically defined meter info like label and description.
+        Obtains meter from the Ceilometer meter list joined with statically
+        defined meter info like label and description.
 
         :Parameters:
           - `meter_name`: A meter name we want to fetch.
         """
-        meter = self._cached_meters.get(meter_name, None)
-        if not meter:
-            meter_candidates = [m for m in self._ceilometer_meter_list
-                                if m.name == meter_name]
-
-            if meter_candidates:
-                meter_info = self._all_meters_info.get(meter_name, None)
-                if meter_info:
-                    label = meter_info["label"]
-                    description = meter_info["description"]
-                else:
-                    label = ""
-                    description = ""
-                meter = meter_candidates[0]
-                meter.augment(label=label, description=description)
-
-                self._cached_meters[meter_name] = meter
-
-        return meter
+        return self.get(meter_name)
 
     def _get_nova_meters_info(self):
         """Returns additional info for each meter
@@ -28,7 +28,7 @@ from django.utils.translation import ugettext_lazy as _
 from cinderclient.v1.contrib import list_extensions as cinder_list_extensions
 
 from horizon import exceptions
-from horizon.utils.memoized import memoized  # noqa
+from horizon.utils.memoized import memoized_per_request  # noqa
 
 from openstack_dashboard.api import base
 from openstack_dashboard.api import nova
@@ -111,8 +111,6 @@ class VolumeBackup(BaseCinderAPIResourceWrapper):
 def cinderclient(request):
     api_version = VERSIONS.get_active_version()
 
-    insecure = getattr(settings, 'OPENSTACK_SSL_NO_VERIFY', False)
-    cacert = getattr(settings, 'OPENSTACK_SSL_CACERT', None)
     cinder_url = ""
     try:
         # The cinder client assumes that the v2 endpoint type will be
@@ -131,6 +129,15 @@ def cinderclient(request):
     except exceptions.ServiceCatalogException:
         LOG.debug('no volume service configured.')
         return None
+    service_type = 'volumev2' if api_version['version'] == 2 else 'volume'
+    return base.cached_client(
+        request, service_type, cinder_url,
+        lambda: _create_cinderclient(request, api_version, cinder_url))
+
+
+def _create_cinderclient(request, api_version, cinder_url):
+    insecure = getattr(settings, 'OPENSTACK_SSL_NO_VERIFY', False)
+    cacert = getattr(settings, 'OPENSTACK_SSL_CACERT', None)
     LOG.debug('cinderclient connection created using token "%s" and url "%s"' %
               (request.user.token.id, cinder_url))
     c = api_version['client'].Client(request.user.username,
@@ -193,15 +200,20 @@ def volume_create(request, size, name, description, volume_type,
     data = _replace_v2_parameters(data)
 
     volume = cinderclient(request).volumes.create(size, **data)
+    base.invalidate_quota_usages(request)
     return Volume(volume)
 
 
 def volume_extend(request, volume_id, new_size):
-    return cinderclient(request).volumes.extend(volume_id, new_size)
+    result = cinderclient(request).volumes.extend(volume_id, new_size)
+    base.invalidate_quota_usages(request)
+    return result
 
 
 def volume_delete(request, volume_id):
-    return cinderclient(request).volumes.delete(volume_id)
+    result = cinderclient(request).volumes.delete(volume_id)
+    base.invalidate_quota_usages(request)
+    return result
 
 
 def volume_update(request, volume_id, name, description):
@@ -231,12 +243,16 @@ def volume_snapshot_create(request, volume_id, name,
             'force': force}
     data = _replace_v2_parameters(data)
 
-    return VolumeSnapshot(cinderclient(request).volume_snapshots.create(
+    snapshot = VolumeSnapshot(cinderclient(request).volume_snapshots.create(
         volume_id, **data))
+    base.invalidate_quota_usages(request)
+    return snapshot
 
 
 def volume_snapshot_delete(request, snapshot_id):
-    return cinderclient(request).volume_snapshots.delete(snapshot_id)
+    result = cinderclient(request).volume_snapshots.delete(snapshot_id)
+    base.invalidate_quota_usages(request)
+    return result
 
 
 def volume_snapshot_update(request, snapshot_id, name, description):
@@ -247,7 +263,7 @@ def volume_snapshot_update(request, snapshot_id, name, description):
                                                          **snapshot_data)
 
 
-@memoized
+@memoized_per_request
 def volume_backup_supported(request):
     """This method will determine if cinder supports backup.
     """
@@ -289,8 +305,11 @@ def volume_backup_delete(request, backup_id):
 
 
 def volume_backup_restore(request, backup_id, volume_id):
-    return cinderclient(request).restores.restore(backup_id=backup_id,
-                                                  volume_id=volume_id)
+    # Restoring without a volume creates a new one.
+    restore = cinderclient(request).restores.restore(backup_id=backup_id,
+                                                     volume_id=volume_id)
+    base.invalidate_quota_usages(request)
+    return restore
 
 
 def tenant_quota_get(request, tenant_id):
@@ -301,7 +320,9 @@ def tenant_quota_get(request, tenant_id):
 
 
 def tenant_quota_update(request, tenant_id, **kwargs):
-    return cinderclient(request).quotas.update(tenant_id, **kwargs)
+    result = cinderclient(request).quotas.update(tenant_id, **kwargs)
+    base.invalidate_quota_usages(request)
+    return result
 
 
 def default_quota_get(request, tenant_id):
@@ -340,13 +361,13 @@ def availability_zone_list(request, detailed=False):
     return cinderclient(request).availability_zones.list(detailed=detailed)
 
 
-@memoized
+@memoized_per_request
 def list_extensions(request):
     return cinder_list_extensions.ListExtManager(cinderclient(request))\
         .show_all()
 
 
-@memoized
+@memoized_per_request
 def extension_supported(request, extension_name):
     """This method will determine if Cinder supports a given extension name.
     """
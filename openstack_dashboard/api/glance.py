@@ -20,11 +20,14 @@ from __future__ import absolute_import
 
 import itertools
 import logging
-import thread
+import threading
+import time
 
 from django.conf import settings
+from django.core import cache as django_cache
 
 import glanceclient as glance_client
+from six.moves import queue
 
 from horizon.utils import functions as utils
 
@@ -33,9 +36,25 @@ from openstack_dashboard.api import base
 
 LOG = logging.getLogger(__name__)
 
+# Image data is sent to Glance after the request which created the image
+# has returned, by a bounded pool of worker threads shared by the process.
+DEFAULT_UPLOAD_WORKERS = 4
+# How often, in seconds, an upload records how much it has sent, and how
+# long the record is kept.
+UPLOAD_PROGRESS_INTERVAL = 1
+UPLOAD_PROGRESS_TIMEOUT = 60 * 60 * 24
+_upload_queue = queue.Queue()
+_upload_workers = []
+_upload_workers_lock = threading.Lock()
+
 
 def glanceclient(request):
     url = base.url_for(request, 'image')
+    return base.cached_client(request, 'image', url,
+                              lambda: _create_glanceclient(request, url))
+
+
+def _create_glanceclient(request, url):
     insecure = getattr(settings, 'OPENSTACK_SSL_NO_VERIFY', False)
     cacert = getattr(settings, 'OPENSTACK_SSL_CACERT', None)
     LOG.debug('glanceclient connection created using token "%s" and url "%s"'
@@ -59,9 +78,15 @@ def image_get(request, image_id):
 
 
 def image_list_detailed(request, marker=None, sort_dir='desc',
-                        sort_key='created_at', filters=None, paginate=False):
+                        sort_key='created_at', filters=None, paginate=False,
+                        reversed_order=None):
     limit = getattr(settings, 'API_RESULT_LIMIT', 1000)
     page_size = utils.get_page_size(request)
+    # Whether the listing pages backwards from the marker. Listings are
+    # newest first unless the caller sorts them, so by default ascending
+    # ones are taken to be going back.
+    if reversed_order is None:
+        reversed_order = sort_dir == 'asc'
 
     if paginate:
         request_size = page_size + 1
@@ -89,7 +114,7 @@ def image_list_detailed(request, marker=None, sort_dir='desc',
             if marker is not None:
                 has_prev_data = True
         # first page condition when reached via prev back
-        elif sort_dir == 'asc' and marker is not None:
+        elif reversed_order and marker is not None:
             has_more_data = True
         # last page condition
         elif marker is not None:
@@ -110,14 +135,91 @@ def image_create(request, **kwargs):
     image = glanceclient(request).images.create(**kwargs)
 
     if data:
-        thread.start_new_thread(image_update,
-                                (request, image.id),
-                                {'data': data,
-                                 'purge_props': False})
+        _queue_upload(request, image.id, data=data)
     elif copy_from:
-        thread.start_new_thread(image_update,
-                                (request, image.id),
-                                {'copy_from': copy_from,
-                                 'purge_props': False})
+        _queue_upload(request, image.id, copy_from=copy_from)
 
     return image
+
+
+def image_upload_progress(request, image_id):
+    """Returns the progress of sending an image's data to Glance.
+
+    Returns ``None`` when no data is being sent for the image by this
+    dashboard, otherwise a dictionary with the ``status`` of the upload
+    (``"queued"``, ``"uploading"``, ``"finished"`` or ``"failed"``), the
+    number of ``bytes`` sent so far and the ``total`` number of bytes, when
+    it is known. The progress is kept in Django's default cache, so every
+    process can see it when the cache is shared.
+    """
+    return django_cache.cache.get(_upload_key(image_id))
+
+
+def _upload_key(image_id):
+    return 'horizon:image_upload:%s' % image_id
+
+
+def _set_upload_progress(image_id, status, sent=0, total=None):
+    django_cache.cache.set(_upload_key(image_id),
+                           {'status': status, 'bytes': sent, 'total': total},
+                           UPLOAD_PROGRESS_TIMEOUT)
+
+
+class _ProgressFile(object):
+    """Wraps the image data, recording how much of it has been read."""
+    def __init__(self, image_id, data, total):
+        self._image_id = image_id
+        self._data = data
+        self._total = total
+        self._sent = 0
+        self._reported = 0
+
+    def __getattr__(self, name):
+        return getattr(self._data, name)
+
+    def read(self, *args):
+        chunk = self._data.read(*args)
+        self._sent += len(chunk)
+        now = time.time()
+        if now - self._reported >= UPLOAD_PROGRESS_INTERVAL:
+            self._reported = now
+            _set_upload_progress(self._image_id, 'uploading', self._sent,
+                                 self._total)
+        return chunk
+
+
+def _upload(request, image_id, kwargs):
+    data = kwargs.get('data')
+    total = getattr(data, 'size', None)
+    if data is not None:
+        kwargs = dict(kwargs, data=_ProgressFile(image_id, data, total))
+    _set_upload_progress(image_id, 'uploading', total=total)
+    try:
+        image_update(request, image_id, purge_props=False, **kwargs)
+    except Exception:
+        LOG.exception('Unable to upload the data of image %s.' % image_id)
+        _set_upload_progress(image_id, 'failed', total=total)
+    else:
+        _set_upload_progress(image_id, 'finished', total or 0, total)
+
+
+def _upload_worker():
+    while True:
+        request, image_id, kwargs = _upload_queue.get()
+        try:
+            _upload(request, image_id, kwargs)
+        finally:
+            _upload_queue.task_done()
+
+
+def _queue_upload(request, image_id, **kwargs):
+    _set_upload_progress(image_id, 'queued')
+    _upload_queue.put((request, image_id, kwargs))
+    max_workers = getattr(settings, 'HORIZON_IMAGES_UPLOAD_WORKERS',
+                          DEFAULT_UPLOAD_WORKERS)
+    with _upload_workers_lock:
+        if len(_upload_workers) < max_workers:
+            worker = threading.Thread(target=_upload_worker)
+            worker.daemon = True
+            worker.start()
+            _upload_workers.append(worker)
@@ -21,6 +21,7 @@ import logging
 
 from django.conf import settings
 from django.utils.translation import ugettext_lazy as _
+import six
 import six.moves.urllib.parse as urlparse
 
 from keystoneclient import exceptions as keystone_exceptions
@@ -30,7 +31,9 @@ from openstack_auth import utils as auth_utils
 
 from horizon import exceptions
 from horizon import messages
+from horizon.utils import concurrency
 from horizon.utils import functions as utils
+from horizon.utils.memoized import memoized_per_request  # noqa
 
 from openstack_dashboard.api import base
 
@@ -250,7 +253,62 @@ def tenant_delete(request, project):
     return manager.delete(project)
 
 
-def tenant_list(request, paginate=False, marker=None, domain=None, user=None):
+def _matches_filters(resource, filters):
+    return all(getattr(resource, key, None) == value
+               for key, value in six.iteritems(filters))
+
+
+def _filter_resources(resources, filters):
+    """Applies exact-match filters which the API couldn't apply itself."""
+    if not filters:
+        return resources
+    return [r for r in resources if _matches_filters(r, filters)]
+
+
+def _page_resources(resources, marker, page_size):
+    """Returns the page following ``marker`` from a full list of resources.
+
+    The v3 Identity API has no pagination, so this is done on our side to
+    keep the tables small. An unknown marker starts from the beginning.
+    """
+    start = 0
+    if marker:
+        for index, resource in enumerate(resources):
+            if resource.id == marker:
+                start = index + 1
+                break
+    page = resources[start:start + page_size]
+    return (page, len(resources) > start + page_size)
+
+
+def _iter_v2_pages(list_method, **kwargs):
+    """Yields every resource of a v2 listing, one bounded page at a time.
+
+    Only meant for the tenants; the v2 ``/users`` call ignores ``limit``
+    and ``marker``. The listing stops if the marker doesn't advance.
+    """
+    limit = getattr(settings, 'API_RESULT_LIMIT', 1000)
+    marker = None
+    while True:
+        resources = list_method(limit=limit, marker=marker, **kwargs)
+        if marker is not None and resources and resources[-1].id == marker:
+            # The API ignored the marker and sent the same page again.
+            return
+        for resource in resources:
+            yield resource
+        if len(resources) < limit:
+            return
+        marker = resources[-1].id
+
+
+def tenant_list(request, paginate=False, marker=None, domain=None, user=None,
+                filters=None):
+    """Returns a page of projects and whether there are more.
+
+    ``filters`` is a dictionary of exact-match attribute filters, such as
+    ``{'name': 'demo'}`` or ``{'enabled': True}``. They are passed on to
+    the v3 Identity API and applied on our side for v2.
+    """
     manager = VERSIONS.get_project_manager(request, admin=True)
     page_size = utils.get_page_size(request)
 
@@ -260,15 +318,37 @@ def tenant_list(request, paginate=False, marker=None, domain=None, user=None):
 
     has_more_data = False
     if VERSIONS.active < 3:
+        if filters:
+            tenants = _filter_resources(manager.list(), filters)
+            if paginate:
+                return _page_resources(tenants, marker, page_size)
+            return (tenants, has_more_data)
         tenants = manager.list(limit, marker)
         if paginate and len(tenants) > page_size:
             tenants.pop(-1)
             has_more_data = True
     else:
-        tenants = manager.list(domain=domain, user=user)
+        tenants = manager.list(domain=domain, user=user, **(filters or {}))
+        if paginate:
+            return _page_resources(tenants, marker, page_size)
     return (tenants, has_more_data)
 
 
+def iter_projects(request, domain=None, filters=None):
+    """Iterates over all projects.
+
+    Meant for internal callers, e.g. to look up project names. With the v2
+    Identity API the projects are fetched a bounded page at a time, while
+    the v3 API doesn't page them, so they are listed in a single call.
+    """
+    if VERSIONS.active < 3:
+        manager = VERSIONS.get_project_manager(request, admin=True)
+        return (tenant for tenant in _iter_v2_pages(manager.list)
+                if _matches_filters(tenant, filters or {}))
+    tenants, has_more = tenant_list(request, domain=domain, filters=filters)
+    return iter(tenants)
+
+
 def tenant_update(request, project, name=None, description=None,
                   enabled=None, domain=None, **kwargs):
     manager = VERSIONS.get_project_manager(request, admin=True)
@@ -279,7 +359,7 @@ def tenant_update(request, project, name=None, description=None,
                               enabled=enabled, domain=domain, **kwargs)
 
 
-def user_list(request, project=None, domain=None, group=None):
+def user_list(request, project=None, domain=None, group=None, filters=None):
     if VERSIONS.active < 3:
         kwargs = {"tenant_id": project}
     else:
@@ -288,10 +368,33 @@ def user_list(request, project=None, domain=None, group=None):
             "domain": domain,
             "group": group
         }
+        kwargs.update(filters or {})
     users = keystoneclient(request, admin=True).users.list(**kwargs)
+    if VERSIONS.active < 3:
+        users = _filter_resources(users, filters)
     return [VERSIONS.upgrade_v2_user(user) for user in users]
 
 
+def user_list_paged(request, marker=None, domain=None, filters=None):
+    """Returns a page of users after ``marker`` and whether there are more.
+
+    Neither Identity API pages the users, so every page still lists all of
+    them and slices the page on our side; only the rendering is bounded.
+    """
+    page_size = utils.get_page_size(request)
+    users = user_list(request, domain=domain, filters=filters)
+    return _page_resources(users, marker, page_size)
+
+
+def iter_users(request, domain=None, filters=None):
+    """Iterates over all users.
+
+    Meant for internal callers, e.g. to look up user names. Neither Identity
+    API pages the users, so they are listed in a single call.
+    """
+    return iter(user_list(request, domain=domain, filters=filters))
+
+
 def user_create(request, name=None, email=None, password=None, project=None,
                 enabled=None, domain=None):
     manager = keystoneclient(request, admin=True).users
@@ -425,9 +528,9 @@ def group_delete(request, group_id):
     return manager.delete(group_id)
 
 
-def group_list(request, domain=None, project=None, user=None):
+def group_list(request, domain=None, project=None, user=None, filters=None):
     manager = keystoneclient(request, admin=True).groups
-    groups = manager.list(user=user, domain=domain)
+    groups = manager.list(user=user, domain=domain, **(filters or {}))
 
     if project:
         project_groups = []
@@ -440,6 +543,12 @@ def group_list(request, domain=None, project=None, user=None):
     return groups
 
 
+def group_list_paged(request, marker=None, domain=None, filters=None):
+    """Returns a page of groups after ``marker`` and whether there are more."""
+    groups = group_list(request, domain=domain, filters=filters)
+    return _page_resources(groups, marker, utils.get_page_size(request))
+
+
 def group_update(request, group_id, name=None, description=None):
     manager = keystoneclient(request, admin=True).groups
     return manager.update(group=group_id,
@@ -459,7 +568,9 @@ def remove_group_user(request, group_id, user_id):
 
 def role_create(request, name):
     manager = keystoneclient(request, admin=True).roles
-    return manager.create(name)
+    role = manager.create(name)
+    role_list.invalidate(request)
+    return role
 
 
 def role_get(request, role_id):
@@ -469,14 +580,21 @@ def role_get(request, role_id):
 
 def role_update(request, role_id, name=None):
     manager = keystoneclient(request, admin=True).roles
-    return manager.update(role_id, name)
+    role = manager.update(role_id, name)
+    role_list.invalidate(request)
+    return role
 
 
 def role_delete(request, role_id):
     manager = keystoneclient(request, admin=True).roles
-    return manager.delete(role_id)
+    result = manager.delete(role_id)
+    role_list.invalidate(request)
+    return result
 
 
+@base.cached_api('identity',
+                 manager=lambda request: keystoneclient(request,
+                                                        admin=True).roles)
 def role_list(request):
     """Returns a global list of available roles."""
     return keystoneclient(request, admin=True).roles.list()
@@ -521,6 +639,98 @@ def remove_tenant_user(request, project=None, user=None, domain=None):
                                 project=project, domain=domain)
 
 
+def role_assignments_list(request, project=None, user=None, role=None,
+                          group=None, domain=None, effective=False):
+    """Lists role assignments, which the v3 Identity API returns in one call.
+    """
+    if VERSIONS.active < 3:
+        raise exceptions.NotAvailable(
+            _("Role assignments are only available in the Identity API v3."))
+    manager = keystoneclient(request, admin=True).role_assignments
+    return manager.list(project=project, user=user, role=role, group=group,
+                        domain=domain, effective=effective)
+
+
+@memoized_per_request
+def _project_role_assignments(request, project):
+    return list(role_assignments_list(request, project=project))
+
+
+def _roles_by_actor(assignments, actor_type):
+    roles = {}
+    for assignment in assignments:
+        actor = getattr(assignment, actor_type, {}).get('id')
+        if actor is not None:
+            roles.setdefault(actor, []).append(assignment.role['id'])
+    return roles
+
+
+def get_project_users_roles(request, project, max_workers=None):
+    """Returns a dictionary mapping the ids of the users of a project to the
+    ids of the roles they have on it.
+
+    With the v3 Identity API all of the project's role assignments come from
+    a single listing, which :func:`get_project_groups_roles` reuses for the
+    rest of the request. With v2 the project's users are listed and their
+    roles fetched on up to ``max_workers`` threads.
+    """
+    if VERSIONS.active >= 3:
+        return _roles_by_actor(_project_role_assignments(request, project),
+                               'user')
+    users = user_list(request, project=project)
+    tasks = [concurrency.Task(roles_for_user, args=(request, user.id, project))
+             for user in users]
+    concurrency.run_concurrently(tasks, max_workers=max_workers)
+    users_roles = {}
+    for user, task in zip(users, tasks):
+        if task.exc_info:
+            six.reraise(*task.exc_info)
+        users_roles[user.id] = [role.id for role in task.result]
+    return users_roles
+
+
+def get_project_groups_roles(request, project):
+    """Returns a dictionary mapping the ids of the groups with roles on a
+    project to the ids of those roles. Requires the v3 Identity API.
+    """
+    return _roles_by_actor(_project_role_assignments(request, project),
+                           'group')
+
+
+def remove_tenant_users(request, project=None, users=(), domain=None,
+                        max_workers=None):
+    """Removes several users from a tenant by removing all their roles.
+
+    With the v3 Identity API the roles of every user are found with a single
+    role assignment listing instead of one request per user. The users are
+    then removed on up to ``max_workers`` threads. Returns a dictionary
+    mapping each user id to ``None`` on success or to the error.
+    """
+    users = [getattr(user, 'id', user) for user in users]
+    if VERSIONS.active < 3:
+        roles = None
+    else:
+        roles = dict((user, []) for user in users)
+        for assignment in role_assignments_list(request, project=project):
+            user = getattr(assignment, 'user', {}).get('id')
+            if user in roles:
+                roles[user].append(assignment.role['id'])
+
+    def remove(user):
+        if roles is None:
+            remove_tenant_user(request, project=project, user=user,
+                               domain=domain)
+            return
+        for role in roles[user]:
+            remove_tenant_user_role(request, user=user, role=role,
+                                    project=project, domain=domain)
+
+    tasks = [concurrency.Task(remove, args=(user,)) for user in users]
+    concurrency.run_concurrently(tasks, max_workers=max_workers)
+    return dict((user, task.exc_info[1] if task.exc_info else None)
+                for user, task in zip(users, tasks))
+
+
 def roles_for_group(request, group, domain=None, project=None):
     manager = keystoneclient(request, admin=True).roles
     return manager.list(group=group, domain=domain, project=project)
@@ -53,11 +53,15 @@ def tenant_floating_ip_get(request, floating_ip_id):
 
 
 def tenant_floating_ip_allocate(request, pool=None):
-    return NetworkClient(request).floating_ips.allocate(pool)
+    floating_ip = NetworkClient(request).floating_ips.allocate(pool)
+    base.invalidate_quota_usages(request)
+    return floating_ip
 
 
 def tenant_floating_ip_release(request, floating_ip_id):
-    return NetworkClient(request).floating_ips.release(floating_ip_id)
+    result = NetworkClient(request).floating_ips.release(floating_ip_id)
+    base.invalidate_quota_usages(request)
+    return result
 
 
 def floating_ip_associate(request, floating_ip_id, port_id):
@@ -28,18 +28,24 @@ from django.utils.datastructures import SortedDict
 from django.utils.translation import ugettext_lazy as _
 
 from horizon import messages
-from horizon.utils.memoized import memoized  # noqa
+from horizon.utils import concurrency
+from horizon.utils.memoized import memoized_per_request  # noqa
 
 from openstack_dashboard.api import base
 from openstack_dashboard.api import network_base
 from openstack_dashboard.api import nova
 
 from neutronclient.v2_0 import client as neutron_client
+import six
 
 LOG = logging.getLogger(__name__)
 
 IP_VERSION_DICT = {4: 'IPv4', 6: 'IPv6'}
 
+# Upper bound on the length of the id filters sent in a single list request,
+# well below the request line limit of the Neutron API server.
+FILTER_QUERY_MAX_LENGTH = 4000
+
 
 class NeutronAPIDictWrapper(base.APIDictWrapper):
 
@@ -427,22 +433,32 @@ def get_ipver_str(ip_version):
 
 
 def neutronclient(request):
+    url = base.url_for(request, 'network')
+    # The underlying httplib2 connections must not be shared between threads.
+    return base.cached_client(request, 'network', url,
+                              lambda: _create_neutronclient(request, url),
+                              thread_safe=False)
+
+
+def _create_neutronclient(request, url):
     insecure = getattr(settings, 'OPENSTACK_SSL_NO_VERIFY', False)
     cacert = getattr(settings, 'OPENSTACK_SSL_CACERT', None)
     LOG.debug('neutronclient connection created using token "%s" and url "%s"'
-              % (request.user.token.id, base.url_for(request, 'network')))
+              % (request.user.token.id, url))
     LOG.debug('user_id=%(user)s, tenant_id=%(tenant)s' %
               {'user': request.user.id, 'tenant': request.user.tenant_id})
     c = neutron_client.Client(token=request.user.token.id,
                               auth_url=base.url_for(request, 'identity'),
-                              endpoint_url=base.url_for(request, 'network'),
+                              endpoint_url=url,
                               insecure=insecure, ca_cert=cacert)
     return c
 
 
-def network_list(request, **params):
+def network_list(request, expand_subnets=True, **params):
     LOG.debug("network_list(): params=%s", params)
     networks = neutronclient(request).list_networks(**params).get('networks')
+    if not expand_subnets:
+        return [Network(n) for n in networks]
     # Get subnet list to expand subnet info in network list.
     subnets = subnet_list(request)
     subnet_dict = dict([(s['id'], s) for s in subnets])
@@ -733,7 +749,9 @@ def tenant_quota_get(request, tenant_id):
 
 def tenant_quota_update(request, tenant_id, **kwargs):
     quotas = {'quota': kwargs}
-    return neutronclient(request).update_quota(tenant_id, quotas)
+    result = neutronclient(request).update_quota(tenant_id, quotas)
+    base.invalidate_quota_usages(request)
+    return result
 
 
 def agent_list(request):
@@ -746,6 +764,56 @@ def provider_list(request):
     return providers['service_providers']
 
 
+def _chunk_filter_values(filter_attr, filter_values):
+    """Splits filter values into lists that keep each query short enough."""
+    chunk = []
+    length = 0
+    for value in filter_values:
+        # Each value is sent as "&<filter_attr>=<value>".
+        size = len(filter_attr) + len(value) + 2
+        if chunk and length + size > FILTER_QUERY_MAX_LENGTH:
+            yield chunk
+            chunk = []
+            length = 0
+        chunk.append(value)
+        length += size
+    if chunk:
+        yield chunk
+
+
+def list_resources_with_long_filters(request, list_method, filter_attr,
+                                     filter_values, **params):
+    """Calls a list method with a filter which may have many values.
+
+    The (deduplicated) values are split into chunks so that no query gets
+    too long for the Neutron API server, the chunks are listed concurrently
+    and the results are joined together. Nothing is listed if there are no
+    values to filter on.
+    """
+    filter_values = sorted(set(filter_values))
+    tasks = []
+    for chunk in _chunk_filter_values(filter_attr, filter_values):
+        kwargs = dict(params)
+        kwargs[filter_attr] = chunk
+        tasks.append(concurrency.Task(list_method, args=(request,),
+                                      kwargs=kwargs))
+    resources = []
+    for task in concurrency.run_concurrently(tasks):
+        if task.exc_info is not None:
+            six.reraise(*task.exc_info)
+        resources.extend(task.result)
+    return resources
+
+
+def _floating_ip_list(request, **params):
+    # Unlike FloatingIpManager.list() this doesn't look up the instance
+    # of every floating IP, which would mean listing all ports.
+    tenant_id = request.user.tenant_id
+    fips = neutronclient(request).list_floatingips(tenant_id=tenant_id,
+                                                   **params)
+    return [FloatingIp(fip) for fip in fips.get('floatingips')]
+
+
 def servers_update_addresses(request, servers):
     """Retrieve servers networking information from Neutron if enabled.
 
@@ -753,14 +821,18 @@ def servers_update_addresses(request, servers):
        and Nova's networking info caching mechanism is not fast enough.
     """
 
-    # Get all (filtered for relevant servers) information from Neutron
+    # Get all (filtered for relevant servers) information from Neutron.
+    # Only network names are needed, so subnets aren't listed.
     try:
-        ports = port_list(request,
-                          device_id=[instance.id for instance in servers])
-        floating_ips = FloatingIpManager(request).list(
-            port_id=[port.id for port in ports])
-        networks = network_list(request,
-                                id=[port.network_id for port in ports])
+        ports = list_resources_with_long_filters(
+            request, port_list, 'device_id',
+            [instance.id for instance in servers])
+        floating_ips = list_resources_with_long_filters(
+            request, _floating_ip_list, 'port_id',
+            [port.id for port in ports])
+        networks = list_resources_with_long_filters(
+            request, network_list, 'id',
+            [port.network_id for port in ports], expand_subnets=False)
     except Exception:
         error_message = _('Unable to connect to Neutron.')
         LOG.error(error_message)
@@ -828,7 +900,8 @@ def _server_get_addresses(request, server, ports, floating_ips, network_names):
     return dict(addresses)
 
 
-@memoized
+@memoized_per_request
+@base.cached_api('network')
 def list_extensions(request):
     extensions_list = neutronclient(request).list_extensions()
     if 'extensions' in extensions_list:
@@ -837,7 +910,7 @@ def list_extensions(request):
         return {}
 
 
-@memoized
+@memoized_per_request
 def is_extension_supported(request, extension_alias):
     extensions = list_extensions(request)
 
@@ -848,7 +921,7 @@ def is_extension_supported(request, extension_alias):
         return False
 
 
-@memoized
+@memoized_per_request
 def is_quotas_extension_supported(request):
     network_config = getattr(settings, 'OPENSTACK_NEUTRON_NETWORK', {})
     if (network_config.get('enable_quotas', False) and
@@ -35,7 +35,7 @@ from novaclient.v1_1 import servers as nova_servers
 
 from horizon import conf
 from horizon.utils import functions as utils
-from horizon.utils.memoized import memoized  # noqa
+from horizon.utils.memoized import memoized_per_request  # noqa
 
 from openstack_dashboard.api import base
 from openstack_dashboard.api import network_base
@@ -384,19 +384,26 @@ class FloatingIpManager(network_base.FloatingIpManager):
 
 
 def novaclient(request):
+    url = base.url_for(request, 'compute')
+    return base.cached_client(request, 'compute', url,
+                              lambda: _create_novaclient(request, url))
+
+
+def _create_novaclient(request, url):
     insecure = getattr(settings, 'OPENSTACK_SSL_NO_VERIFY', False)
     cacert = getattr(settings, 'OPENSTACK_SSL_CACERT', None)
     LOG.debug('novaclient connection created using token "%s" and url "%s"' %
-              (request.user.token.id, base.url_for(request, 'compute')))
+              (request.user.token.id, url))
     c = nova_client.Client(request.user.username,
                            request.user.token.id,
                            project_id=request.user.tenant_id,
-                           auth_url=base.url_for(request, 'compute'),
+                           auth_url=url,
                            insecure=insecure,
                            cacert=cacert,
-                           http_log_debug=settings.DEBUG)
+                           http_log_debug=settings.DEBUG,
+                           connection_pool=base.CLIENT_CACHE.enabled)
     c.client.auth_token = request.user.token.id
-    c.client.management_url = base.url_for(request, 'compute')
+    c.client.management_url = url
     return c
 
 
@@ -423,24 +430,28 @@ def flavor_create(request, name, memory, vcpu, disk, flavorid='auto',
                                                 swap=swap, is_public=is_public)
     if (metadata):
         flavor_extra_set(request, flavor.id, metadata)
+    flavor_list.invalidate(request)
     return flavor
 
 
 def flavor_delete(request, flavor_id):
     novaclient(request).flavors.delete(flavor_id)
+    flavor_list.invalidate(request)
 
 
 def flavor_get(request, flavor_id):
     return novaclient(request).flavors.get(flavor_id)
 
 
-@memoized
+@memoized_per_request
+@base.cached_api('compute', project_scoped=True,
+                 manager=lambda request: novaclient(request).flavors)
 def flavor_list(request, is_public=True):
     """Get the list of available instance sizes (flavors)."""
     return novaclient(request).flavors.list(is_public=is_public)
 
 
-@memoized
+@memoized_per_request
 def flavor_access_list(request, flavor=None):
     """Get the list of access instance sizes (flavors)."""
     return novaclient(request).flavor_access.list(flavor=flavor)
@@ -448,14 +459,18 @@ def flavor_access_list(request, flavor=None):
 
 def add_tenant_to_flavor(request, flavor, tenant):
     """Add a tenant to the given flavor access list."""
-    return novaclient(request).flavor_access.add_tenant_access(
+    access = novaclient(request).flavor_access.add_tenant_access(
         flavor=flavor, tenant=tenant)
+    flavor_list.invalidate(request)
+    return access
 
 
 def remove_tenant_from_flavor(request, flavor, tenant):
     """Remove a tenant from the given flavor access list."""
-    return novaclient(request).flavor_access.remove_tenant_access(
+    access = novaclient(request).flavor_access.remove_tenant_access(
         flavor=flavor, tenant=tenant)
+    flavor_list.invalidate(request)
+    return access
 
 
 def flavor_get_extras(request, flavor_id, raw=False):
@@ -507,7 +522,7 @@ def server_create(request, name, image, flavor, key_name, user_data,
                   block_device_mapping_v2=None, nics=None,
                   availability_zone=None, instance_count=1, admin_pass=None,
                   disk_config=None):
-    return Server(novaclient(request).servers.create(
+    server = Server(novaclient(request).servers.create(
         name, image, flavor, userdata=user_data,
         security_groups=security_groups,
         key_name=key_name, block_device_mapping=block_device_mapping,
@@ -515,10 +530,13 @@ def server_create(request, name, image, flavor, key_name, user_data,
         nics=nics, availability_zone=availability_zone,
         min_count=instance_count, admin_pass=admin_pass,
         disk_config=disk_config), request)
+    base.invalidate_quota_usages(request)
+    return server
 
 
 def server_delete(request, instance):
     novaclient(request).servers.delete(instance)
+    base.invalidate_quota_usages(request)
 
 
 def server_get(request, instance_id):
@@ -606,14 +624,17 @@ def server_live_migrate(request, instance_id, host, block_migration=False,
 def server_resize(request, instance_id, flavor, disk_config=None, **kwargs):
     novaclient(request).servers.resize(instance_id, flavor,
                                        disk_config, **kwargs)
+    base.invalidate_quota_usages(request)
 
 
 def server_confirm_resize(request, instance_id):
     novaclient(request).servers.confirm_resize(instance_id)
+    base.invalidate_quota_usages(request)
 
 
 def server_revert_resize(request, instance_id):
     novaclient(request).servers.revert_resize(instance_id)
+    base.invalidate_quota_usages(request)
 
 
 def server_start(request, instance_id):
@@ -630,6 +651,7 @@ def tenant_quota_get(request, tenant_id):
 
 def tenant_quota_update(request, tenant_id, **kwargs):
     novaclient(request).quotas.update(tenant_id, **kwargs)
+    base.invalidate_quota_usages(request)
 
 
 def default_quota_get(request, tenant_id):
@@ -752,12 +774,17 @@ def remove_host_from_aggregate(request, aggregate_id, host):
     return novaclient(request).aggregates.remove_host(aggregate_id, host)
 
 
-@memoized
+def _extension_manager(request):
+    return nova_list_extensions.ListExtManager(novaclient(request))
+
+
+@memoized_per_request
+@base.cached_api('compute', manager=_extension_manager)
 def list_extensions(request):
-    return nova_list_extensions.ListExtManager(novaclient(request)).show_all()
+    return _extension_manager(request).show_all()
 
 
-@memoized
+@memoized_per_request
 def extension_supported(extension_name, request):
     """this method will determine if nova supports a given extension name.
     example values for the extension_name include AdminActions, ConsoleOutput,
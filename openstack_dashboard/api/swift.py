@@ -16,15 +16,21 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import json
 import logging
+import threading
 
+import six
 import six.moves.urllib.parse as urlparse
 import swiftclient
 
 from django.conf import settings
+from django.utils.datastructures import SortedDict
 from django.utils.translation import ugettext_lazy as _
 
 from horizon import exceptions
+from horizon.utils import concurrency
+from horizon.utils.memoized import memoized_lru  # noqa
 
 from openstack_dashboard.api import base
 from openstack_dashboard.openstack.common import timeutils
@@ -35,6 +41,15 @@ FOLDER_DELIMITER = "/"
 # Swift ACL
 GLOBAL_READ_ACL = ".r:*"
 LIST_CONTENTS_ACL = ".rlistings"
+# Size of the pieces object data is streamed in.
+CHUNK_SIZE = getattr(settings, 'SWIFT_FILE_TRANSFER_CHUNK_SIZE', 512 * 1024)
+# Uploads of files larger than "threshold" bytes are split into segments of
+# "segment_size" bytes, up to "max_workers" of which are sent at once, and
+# joined by a manifest.
+SEGMENTED_UPLOAD_DEFAULTS = {'threshold': 1024 ** 3,
+                             'segment_size': 256 * 1024 ** 2,
+                             'max_workers': 4}
+SEGMENTS_CONTAINER_SUFFIX = '_segments'
 
 
 class Container(base.APIDictWrapper):
@@ -106,6 +121,14 @@ def _metadata_to_header(metadata):
 
 def swift_api(request):
     endpoint = base.url_for(request, 'object-store')
+    # A swiftclient Connection holds a single HTTP connection, so it is
+    # only ever reused by the thread which created it.
+    return base.cached_client(request, 'object-store', endpoint,
+                              lambda: _create_swift_api(request, endpoint),
+                              thread_safe=False)
+
+
+def _create_swift_api(request, endpoint):
     cacert = getattr(settings, 'OPENSTACK_SSL_CACERT', None)
     LOG.debug('Swift connection created using token "%s" and url "%s"'
               % (request.user.token.id, endpoint))
@@ -274,21 +297,112 @@ def swift_copy_object(request, orig_container_name, orig_object_name,
 
 def swift_upload_object(request, container_name, object_name,
                         object_file=None):
+    """Uploads an object, reading ``object_file`` in fixed-size pieces.
+
+    Files larger than the ``SWIFT_SEGMENTED_UPLOADS`` threshold are uploaded
+    as a large object, see :func:`_upload_segmented_object`.
+    """
     headers = {}
     size = 0
+    kwargs = {}
     if object_file:
         headers['X-Object-Meta-Orig-Filename'] = object_file.name
         size = object_file.size
+        kwargs = {'content_length': size, 'chunk_size': CHUNK_SIZE}
+        config = dict(SEGMENTED_UPLOAD_DEFAULTS,
+                      **getattr(settings, 'SWIFT_SEGMENTED_UPLOADS', {}))
+        if size > config['threshold']:
+            etag = _upload_segmented_object(request, container_name,
+                                            object_name, object_file,
+                                            headers, config)
+            obj_info = {'name': object_name, 'bytes': size, 'etag': etag}
+            return StorageObject(obj_info, container_name)
 
     etag = swift_api(request).put_object(container_name,
                                          object_name,
                                          object_file,
-                                         headers=headers)
+                                         headers=headers,
+                                         **kwargs)
 
     obj_info = {'name': object_name, 'bytes': size, 'etag': etag}
     return StorageObject(obj_info, container_name)
 
 
+def _upload_segment(request, object_file, container_name, segment_name,
+                    offset, length, lock):
+    """Uploads ``length`` bytes of ``object_file`` from ``offset`` onwards.
+
+    Files spooled to disk are opened again so that segments can be read in
+    parallel; other files are shared, one segment at a time.
+    """
+    endpoint = base.url_for(request, 'object-store')
+    # Each segment is sent from a worker thread, on a connection of its own.
+    client = _create_swift_api(request, endpoint)
+    if hasattr(object_file, 'temporary_file_path'):
+        with open(object_file.temporary_file_path(), 'rb') as segment_file:
+            segment_file.seek(offset)
+            return client.put_object(container_name, segment_name,
+                                     segment_file, content_length=length,
+                                     chunk_size=CHUNK_SIZE)
+    with lock:
+        object_file.seek(offset)
+        return client.put_object(container_name, segment_name, object_file,
+                                 content_length=length, chunk_size=CHUNK_SIZE)
+
+
+def _upload_segmented_object(request, container_name, object_name,
+                             object_file, headers, config):
+    """Uploads a file as segments in parallel and joins them by a manifest.
+
+    The segments are stored in the ``<container>_segments`` container. A
+    static large object manifest is used when the cluster supports them, and
+    a dynamic one otherwise. Segments which were uploaded are deleted again
+    when any of them fails. Returns the etag of the manifest.
+    """
+    segment_size = config['segment_size']
+    segments_container = container_name + SEGMENTS_CONTAINER_SUFFIX
+    prefix = '%s/%s/%s/%s/' % (object_name, timeutils.utcnow_ts(),
+                               object_file.size, segment_size)
+    segments = []
+    for index, offset in enumerate(range(0, object_file.size, segment_size)):
+        length = min(segment_size, object_file.size - offset)
+        segments.append(('%s%08d' % (prefix, index), offset, length))
+
+    swift_api(request).put_container(segments_container)
+    lock = threading.Lock()
+    tasks = [concurrency.Task(_upload_segment,
+                              args=(request, object_file, segments_container,
+                                    name, offset, length, lock))
+             for name, offset, length in segments]
+    concurrency.run_concurrently(tasks, max_workers=config['max_workers'])
+    failed = [task for task in tasks if task.exc_info]
+    if failed:
+        uploaded = [name for (name, offset, length), task
+                    in zip(segments, tasks) if not task.exc_info]
+        swift_delete_objects(request, segments_container, uploaded)
+        six.reraise(*failed[0].exc_info)
+
+    try:
+        endpoint = base.url_for(request, 'object-store')
+        slo = _swift_capabilities(endpoint).get('slo')
+    except Exception:
+        LOG.debug('Unable to retrieve the Swift capabilities.', exc_info=True)
+        slo = None
+    if slo and len(segments) <= slo.get('max_manifest_segments', 1000):
+        manifest = [{'path': '/%s/%s' % (segments_container, name),
+                     'etag': task.result,
+                     'size_bytes': length}
+                    for (name, offset, length), task in zip(segments, tasks)]
+        return swift_api(request).put_object(
+            container_name, object_name, json.dumps(manifest),
+            headers=headers, query_string='multipart-manifest=put')
+    manifest = '%s/%s' % (segments_container, prefix)
+    headers = dict(headers, **{
+        'X-Object-Manifest': urlparse.quote(manifest.encode('utf-8'))})
+    return swift_api(request).put_object(container_name, object_name, '',
+                                         headers=headers)
+
+
 def swift_create_pseudo_folder(request, container_name, pseudo_folder_name):
     headers = {}
     etag = swift_api(request).put_object(container_name,
@@ -308,10 +422,103 @@ def swift_delete_object(request, container_name, object_name):
     return True
 
 
-def swift_get_object(request, container_name, object_name, with_data=True):
+@memoized_lru(max_size=16, ttl=3600)
+def _swift_capabilities(endpoint):
+    """Returns the capabilities advertised by a Swift cluster's /info."""
+    insecure = getattr(settings, 'OPENSTACK_SSL_NO_VERIFY', False)
+    cacert = getattr(settings, 'OPENSTACK_SSL_CACERT', None)
+    conn = swiftclient.client.Connection(insecure=insecure, cacert=cacert)
+    return conn.get_capabilities(url=endpoint)
+
+
+def _bulk_delete(url, token, paths, http_conn=None):
+    """Deletes the given objects with one request to the bulk middleware."""
+    parsed, conn = http_conn
+    headers = {'X-Auth-Token': token,
+               'Accept': 'application/json',
+               'Content-Type': 'text/plain'}
+    path = '%s?bulk-delete' % parsed.path
+    conn.request('DELETE', path, '\n'.join(paths), headers)
+    resp = conn.getresponse()
+    body = resp.read()
+    if resp.status < 200 or resp.status >= 300:
+        raise swiftclient.client.ClientException(
+            'Bulk delete failed', http_scheme=parsed.scheme,
+            http_host=conn.host, http_path=path, http_status=resp.status,
+            http_reason=resp.reason, http_response_content=body)
+    return json.loads(body)
+
+
+def swift_delete_objects(request, container_name, object_names):
+    """Deletes several objects from a container.
+
+    Uses the bulk delete middleware when the cluster has it enabled, with
+    as many objects per request as it allows, and otherwise deletes the
+    objects one by one. Returns a dictionary mapping each object name to
+    ``None`` when it was deleted (or didn't exist) or to the error.
+    """
+    try:
+        endpoint = base.url_for(request, 'object-store')
+        bulk_delete = _swift_capabilities(endpoint).get('bulk_delete')
+    except Exception:
+        LOG.debug('Unable to retrieve the Swift capabilities.', exc_info=True)
+        bulk_delete = None
+
+    results = {}
+    if not bulk_delete:
+        for object_name in object_names:
+            try:
+                swift_delete_object(request, container_name, object_name)
+                results[object_name] = None
+            except Exception as e:
+                results[object_name] = e
+        return results
+
+    paths = SortedDict()
+    for object_name in object_names:
+        path = '/%s/%s' % (container_name, object_name)
+        path = urlparse.quote(path.encode('utf-8'))
+        paths[path] = object_name
+    per_request = bulk_delete.get('max_deletes_per_request', 10000)
+    path_list = paths.keys()
+    for start in range(0, len(path_list), per_request):
+        chunk = path_list[start:start + per_request]
+        try:
+            response = swift_api(request)._retry(None, _bulk_delete, chunk)
+        except Exception as e:
+            results.update((paths[path], e) for path in chunk)
+            continue
+        results.update((paths[path], None) for path in chunk)
+        for path, status in response.get('Errors', []):
+            if path in paths:
+                results[paths[path]] = swiftclient.client.ClientException(
+                    'Bulk delete failed: %s' % status)
+    return results
+
+
+def swift_get_object(request, container_name, object_name, with_data=True,
+                     resp_chunk_size=None, byte_range=None):
+    """Returns an object, with its data unless ``with_data`` is ``False``.
+
+    When ``resp_chunk_size`` is given, ``data`` is an iterator over pieces
+    of the object of that size rather than the whole object. ``byte_range``
+    is the value of an HTTP ``Range`` header asking for only part of the
+    object; the returned object then has a ``content_range``.
+    """
     if with_data:
-        headers, data = swift_api(request).get_object(container_name,
-                                                      object_name)
+        kwargs = {}
+        if byte_range:
+            kwargs['headers'] = {'Range': byte_range}
+        if resp_chunk_size:
+            kwargs['resp_chunk_size'] = resp_chunk_size
+            # The data is read after the caller returns, so it must not hold
+            # up the connection which is reused for other requests.
+            endpoint = base.url_for(request, 'object-store')
+            client = _create_swift_api(request, endpoint)
+        else:
+            client = swift_api(request)
+        headers, data = client.get_object(container_name, object_name,
+                                          **kwargs)
     else:
         data = None
         headers = swift_api(request).head_object(container_name,
@@ -329,6 +536,7 @@ def swift_get_object(request, container_name, object_name, with_data=True):
         'content_type': headers.get('content-type'),
         'etag': headers.get('etag'),
         'timestamp': timestamp,
+        'content_range': headers.get('content-range'),
     }
     return StorageObject(obj_info,
                          container_name,
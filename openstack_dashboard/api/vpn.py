@@ -18,7 +18,7 @@ from __future__ import absolute_import
 
 from django.utils.datastructures import SortedDict
 
-from horizon.utils.memoized import memoized  # noqa
+from horizon.utils.memoized import memoized_per_request  # noqa
 
 from openstack_dashboard.api import neutron
 
@@ -310,14 +310,14 @@ def ipsecsiteconnection_create(request, **kwargs):
     return IPSecSiteConnection(ipsecsiteconnection)
 
 
-@memoized
+@memoized_per_request
 def ipsecsiteconnection_list(request, **kwargs):
     return _ipsecsiteconnection_list(request, expand_ikepolicies=True,
                                      expand_ipsecpolicies=True,
                                      expand_vpnservices=True, **kwargs)
 
 
-@memoized
+@memoized_per_request
 def _ipsecsiteconnection_list(request, expand_ikepolicies=False,
                               expand_ipsecpolicies=False,
                               expand_vpnservices=False, **kwargs):
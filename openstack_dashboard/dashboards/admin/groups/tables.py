@@ -82,16 +82,13 @@ class ManageUsersLink(tables.LinkAction):
 
 
 class GroupFilterAction(tables.FilterAction):
-    def filter(self, table, groups, filter_string):
-        """Naive case-insensitive search."""
-        q = filter_string.lower()
+    filter_type = "server"
+    # Keystone filters on the name itself, across every page of groups, see
+    # IndexView.get_data.
+    filter_choices = (('name', _("Name"), True),)
 
-        def comp(group):
-            if q in group.name.lower():
-                return True
-            return False
-
-        return filter(comp, groups)
+    def filter(self, table, groups, filter_string):
+        return groups
 
 
 class GroupsTable(tables.DataTable):
@@ -106,6 +103,7 @@ class GroupsTable(tables.DataTable):
         row_actions = (ManageUsersLink, EditGroupLink, DeleteGroupsAction)
         table_actions = (GroupFilterAction, CreateGroupLink,
                          DeleteGroupsAction)
+        pagination_param = "group_marker"
 
 
 class UserFilterAction(tables.FilterAction):
@@ -43,13 +43,16 @@ class GroupsViewTests(test.BaseAdminViewTests):
                       if group.domain_id == domain_id]
         return groups
 
-    @test.create_stubs({api.keystone: ('group_list',)})
+    @test.create_stubs({api.keystone: ('group_list_paged',)})
     def test_index(self):
         domain_id = self._get_domain_id()
         groups = self._get_groups(domain_id)
 
-        api.keystone.group_list(IgnoreArg(), domain=domain_id) \
-            .AndReturn(groups)
+        api.keystone.group_list_paged(IgnoreArg(),
+                                      domain=domain_id,
+                                      marker=None,
+                                      filters={}) \
+            .AndReturn([groups, False])
 
         self.mox.ReplayAll()
 
@@ -71,14 +74,32 @@ class GroupsViewTests(test.BaseAdminViewTests):
                               domain_context_name=domain.name)
         self.test_index()
 
-    @test.create_stubs({api.keystone: ('group_list',
+    @test.create_stubs({api.keystone: ('group_list_paged',)})
+    def test_index_filter(self):
+        group = self.groups.first()
+        api.keystone.group_list_paged(IgnoreArg(),
+                                      domain=None,
+                                      marker=None,
+                                      filters={'name': group.name}) \
+            .AndReturn([[group], False])
+        self.mox.ReplayAll()
+
+        res = self.client.post(GROUPS_INDEX_URL,
+                               {'groups__filter__q': group.name,
+                                'groups__filter__q_field': 'name'})
+        self.assertEqual(res.context['table'].data, [group])
+
+    @test.create_stubs({api.keystone: ('group_list_paged',
                                        'keystone_can_edit_group')})
     def test_index_with_keystone_can_edit_group_false(self):
         domain_id = self._get_domain_id()
         groups = self._get_groups(domain_id)
 
-        api.keystone.group_list(IgnoreArg(), domain=domain_id) \
-            .AndReturn(groups)
+        api.keystone.group_list_paged(IgnoreArg(),
+                                      domain=domain_id,
+                                      marker=None,
+                                      filters={}) \
+            .AndReturn([groups, False])
         api.keystone.keystone_can_edit_group() \
             .MultipleTimes().AndReturn(False)
 
@@ -142,14 +163,17 @@ class GroupsViewTests(test.BaseAdminViewTests):
 
         self.assertNoFormErrors(res)
 
-    @test.create_stubs({api.keystone: ('group_list',
+    @test.create_stubs({api.keystone: ('group_list_paged',
                                        'group_delete')})
     def test_delete_group(self):
         domain_id = self._get_domain_id()
         group = self.groups.get(id="2")
 
-        api.keystone.group_list(IgnoreArg(), domain=domain_id) \
-            .AndReturn(self.groups.list())
+        api.keystone.group_list_paged(IgnoreArg(),
+                                      domain=domain_id,
+                                      marker=None,
+                                      filters={}) \
+            .AndReturn([self.groups.list(), False])
         api.keystone.group_delete(IgnoreArg(), group.id)
 
         self.mox.ReplayAll()
@@ -34,13 +34,23 @@ class IndexView(tables.DataTableView):
     table_class = project_tables.GroupsTable
     template_name = constants.GROUPS_INDEX_VIEW_TEMPLATE
 
+    def has_more_data(self, table):
+        return self._more
+
     def get_data(self):
         groups = []
+        marker = self.request.GET.get(
+            project_tables.GroupsTable._meta.pagination_param, None)
         domain_context = self.request.session.get('domain_context', None)
+        filters = self.get_filters()
         try:
-            groups = api.keystone.group_list(self.request,
-                                             domain=domain_context)
+            groups, self._more = api.keystone.group_list_paged(
+                self.request,
+                domain=domain_context,
+                marker=marker,
+                filters=filters)
         except Exception:
+            self._more = False
             exceptions.handle(self.request,
                               _('Unable to retrieve group list.'))
         return groups
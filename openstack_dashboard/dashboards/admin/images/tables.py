@@ -12,6 +12,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from django.template import defaultfilters as filters
 from django.utils.translation import ugettext_lazy as _
 
 from horizon import tables
@@ -48,15 +49,32 @@ class UpdateRow(tables.Row):
         return image
 
 
+class AdminImageFilterAction(tables.FilterAction):
+    filter_type = "server"
+    # Glance filters on all of these itself, see IndexView.get_data.
+    filter_choices = (('name', _("Name"), True),
+                      ('status', _("Status"), True),
+                      ('disk_format', _("Format"), True))
+
+    def filter(self, table, images, filter_string):
+        return images
+
+
 class AdminImagesTable(project_tables.ImagesTable):
     name = tables.Column("name",
                          link="horizon:admin:images:detail",
-                         verbose_name=_("Image Name"))
+                         verbose_name=_("Image Name"),
+                         api_sort_key="name")
+    size = tables.Column("size",
+                         filters=(filters.filesizeformat,),
+                         verbose_name=_("Size"),
+                         api_sort_key="size")
 
     class Meta:
         name = "images"
         row_class = UpdateRow
         status_columns = ["status"]
         verbose_name = _("Images")
-        table_actions = (AdminCreateImage, AdminDeleteImage)
+        table_actions = (AdminImageFilterAction, AdminCreateImage,
+                         AdminDeleteImage)
         row_actions = (AdminEditImage, AdminDeleteImage)
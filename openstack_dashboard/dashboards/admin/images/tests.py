@@ -40,7 +40,9 @@ class ImagesViewTest(test.BaseAdminViewTests):
                                        marker=None,
                                        paginate=True,
                                        filters=filters,
-                                       sort_dir='desc') \
+                                       sort_key='created_at',
+                                       sort_dir='desc',
+                                       reversed_order=False) \
             .AndReturn([self.images.list(),
                         False, False])
         self.mox.ReplayAll()
@@ -51,6 +53,28 @@ class ImagesViewTest(test.BaseAdminViewTests):
         self.assertEqual(len(res.context['images_table'].data),
                          len(self.images.list()))
 
+    @test.create_stubs({api.glance: ('image_list_detailed',)})
+    def test_images_list_api_sort_and_filter(self):
+        filters = {'is_public': None, 'disk_format': 'qcow2'}
+        api.glance.image_list_detailed(IsA(http.HttpRequest),
+                                       marker=None,
+                                       paginate=True,
+                                       filters=filters,
+                                       sort_key='name',
+                                       sort_dir='desc',
+                                       reversed_order=False) \
+            .AndReturn([self.images.list(), False, False])
+        self.mox.ReplayAll()
+
+        res = self.client.post(
+            reverse('horizon:admin:images:index') + '?sort=-name',
+            {'images__filter__q': 'qcow2',
+             'images__filter__q_field': 'disk_format'})
+        self.assertTemplateUsed(res, 'admin/images/index.html')
+        self.assertEqual(len(res.context['images_table'].filtered_data),
+                         len(self.images.list()))
+        self.assertContains(res, 'href="?sort=name"')
+
     @override_settings(API_RESULT_PAGE_SIZE=2)
     @test.create_stubs({api.glance: ('image_list_detailed',)})
     def test_images_list_get_pagination(self):
@@ -60,28 +84,36 @@ class ImagesViewTest(test.BaseAdminViewTests):
                                        marker=None,
                                        paginate=True,
                                        filters=filters,
-                                       sort_dir='desc') \
+                                       sort_key='created_at',
+                                       sort_dir='desc',
+                                       reversed_order=False) \
                                 .AndReturn([images,
                                             True, True])
         api.glance.image_list_detailed(IsA(http.HttpRequest),
                                        marker=None,
                                        paginate=True,
                                        filters=filters,
-                                       sort_dir='desc') \
+                                       sort_key='created_at',
+                                       sort_dir='desc',
+                                       reversed_order=False) \
                                 .AndReturn([images[:2],
                                             True, True])
         api.glance.image_list_detailed(IsA(http.HttpRequest),
                                        marker=images[2].id,
                                        paginate=True,
                                        filters=filters,
-                                       sort_dir='desc') \
+                                       sort_key='created_at',
+                                       sort_dir='desc',
+                                       reversed_order=False) \
                                 .AndReturn([images[2:4],
                                             True, True])
         api.glance.image_list_detailed(IsA(http.HttpRequest),
                                        marker=images[4].id,
                                        paginate=True,
                                        filters=filters,
-                                       sort_dir='desc') \
+                                       sort_key='created_at',
+                                       sort_dir='desc',
+                                       reversed_order=False) \
                                 .AndReturn([images[4:],
                                             True, True])
         self.mox.ReplayAll()
@@ -123,28 +155,36 @@ class ImagesViewTest(test.BaseAdminViewTests):
                                        marker=None,
                                        paginate=True,
                                        filters=filters,
-                                       sort_dir='desc') \
+                                       sort_key='created_at',
+                                       sort_dir='desc',
+                                       reversed_order=False) \
                                 .AndReturn([images,
                                             True, False])
         api.glance.image_list_detailed(IsA(http.HttpRequest),
                                        marker=None,
                                        paginate=True,
                                        filters=filters,
-                                       sort_dir='desc') \
+                                       sort_key='created_at',
+                                       sort_dir='desc',
+                                       reversed_order=False) \
                                 .AndReturn([images[:2],
                                             True, True])
         api.glance.image_list_detailed(IsA(http.HttpRequest),
                                        marker=images[2].id,
                                        paginate=True,
                                        filters=filters,
-                                       sort_dir='desc') \
+                                       sort_key='created_at',
+                                       sort_dir='desc',
+                                       reversed_order=False) \
                                 .AndReturn([images[2:],
                                             True, True])
         api.glance.image_list_detailed(IsA(http.HttpRequest),
                                        marker=images[2].id,
                                        paginate=True,
                                        filters=filters,
-                                       sort_dir='asc') \
+                                       sort_key='created_at',
+                                       sort_dir='asc',
+                                       reversed_order=True) \
                                 .AndReturn([images[:2],
                                             True, True])
         self.mox.ReplayAll()
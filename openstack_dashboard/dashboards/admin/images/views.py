@@ -42,16 +42,18 @@ class IndexView(tables.DataTableView):
 
     def get_data(self):
         images = []
-        filters = {'is_public': None}
+        filters = self.get_filters({'is_public': None})
+        sort_key, sort_dir = self.get_sort(('created_at', 'desc'))
 
         prev_marker = self.request.GET.get(
             project_tables.AdminImagesTable._meta.prev_pagination_param, None)
 
         if prev_marker is not None:
-            sort_dir = 'asc'
+            # Page backwards by listing in the opposite order.
+            list_sort_dir = 'asc' if sort_dir == 'desc' else 'desc'
             marker = prev_marker
         else:
-            sort_dir = 'desc'
+            list_sort_dir = sort_dir
             marker = self.request.GET.get(
                 project_tables.AdminImagesTable._meta.pagination_param, None)
         try:
@@ -60,11 +62,14 @@ class IndexView(tables.DataTableView):
                 marker=marker,
                 paginate=True,
                 filters=filters,
-                sort_dir=sort_dir)
+                sort_key=sort_key,
+                sort_dir=list_sort_dir,
+                reversed_order=prev_marker is not None)
 
             if prev_marker is not None:
                 images = sorted(images, key=lambda image:
-                                getattr(image, 'created_at'), reverse=True)
+                                getattr(image, sort_key),
+                                reverse=(sort_dir == 'desc'))
 
         except Exception:
             self._prev = False
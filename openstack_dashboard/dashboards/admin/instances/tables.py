@@ -15,8 +15,11 @@
 
 from django.template.defaultfilters import title  # noqa
 from django.utils.translation import ugettext_lazy as _
+import six
 
+from horizon import exceptions
 from horizon import tables
+from horizon.utils import concurrency
 from horizon.utils import filters
 
 from openstack_dashboard import api
@@ -36,6 +39,7 @@ class MigrateInstance(tables.BatchAction):
     data_type_plural = _("Instances")
     classes = ("btn-migrate", "btn-danger")
     policy_rules = (("compute", "compute_extension:admin_actions:migrate"),)
+    allowed_fields = ("status", "OS-EXT-STS:task_state")
 
     def get_policy_target(self, request, datum=None):
         project_id = None
@@ -59,6 +63,7 @@ class LiveMigrateInstance(tables.LinkAction):
     classes = ("ajax-modal", "btn-migrate", "btn-danger")
     policy_rules = (
         ("compute", "compute_extension:admin_actions:migrateLive"),)
+    allowed_fields = ("status", "OS-EXT-STS:task_state")
 
     def get_policy_target(self, request, datum=None):
         project_id = None
@@ -80,28 +85,55 @@ class AdminUpdateRow(project_tables.UpdateRow):
         instance.tenant_name = getattr(tenant, "name", None)
         return instance
 
+    def get_data_batch(self, request, instance_ids):
+        # Listing the instances would list those of every project, so they
+        # are looked up concurrently instead, at one call per row.
+        tasks = [concurrency.Task(api.nova.server_get,
+                                  args=(request, instance_id))
+                 for instance_id in instance_ids]
+        concurrency.run_concurrently(
+            tasks, max_workers=api.bulk.max_concurrency('compute'))
+        instances = {}
+        for instance_id, task in zip(instance_ids, tasks):
+            if task.exc_info:
+                try:
+                    six.reraise(*task.exc_info)
+                except Exception:
+                    error = exceptions.handle(request, ignore=True)
+                    if error.status_code == 404:
+                        instances[instance_id] = None
+            else:
+                instances[instance_id] = task.result
+        self.prepare_instances(request, [instance for instance
+                                         in instances.values()
+                                         if instance is not None])
+        tenant_names = {}
+        for instance in instances.values():
+            if instance is None:
+                continue
+            if instance.tenant_id not in tenant_names:
+                tenant = api.keystone.tenant_get(request,
+                                                 instance.tenant_id,
+                                                 admin=True)
+                tenant_names[instance.tenant_id] = getattr(tenant, "name",
+                                                           None)
+            instance.tenant_name = tenant_names[instance.tenant_id]
+        return instances
+
 
 class AdminInstanceFilterAction(tables.FilterAction):
     filter_type = "server"
+    # Nova filters on the name and status itself, see IndexView.get_data.
     filter_choices = (('project', _("Project")),
-                      ('name', _("Name"))
-                      )
+                      ('name', _("Name"), True),
+                      ('status', _("Status"), True))
     needs_preloading = True
 
     def filter(self, table, instances, filter_string):
-        """Server side search.
-        When filtering is supported in the api, then we will handle in view
-        """
-        filter_field = table.request.POST.get('instances__filter__q_field')
-        self.filter_field = filter_field
-        self.filter_string = filter_string
-        if filter_field == 'project' and filter_string:
+        """Filters on the fields which the API can't filter on."""
+        if table.get_filter_field() == 'project' and filter_string:
             return [inst for inst in instances
                     if inst.tenant_name == filter_string]
-        if filter_field == 'name' and filter_string:
-            q = filter_string.lower()
-            return [instance for instance in instances
-                    if q in instance.name.lower()]
         return instances
 
 
@@ -12,11 +12,14 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import json
 import uuid
 
 from django.core.urlresolvers import reverse
 from django import http
+from django.test.utils import override_settings  # noqa
 from django.utils.datastructures import SortedDict
+from django.utils.http import urlencode
 
 from mox import IgnoreArg  # noqa
 from mox import IsA  # noqa
@@ -54,6 +57,32 @@ class InstanceViewTest(test.BaseAdminViewTests):
         instances = res.context['table'].data
         self.assertItemsEqual(instances, servers)
 
+    @test.create_stubs({api.nova: ('flavor_list', 'server_list',
+                                   'extension_supported',),
+                        api.keystone: ('tenant_list',),
+                        api.network: ('servers_update_addresses',)})
+    def test_index_api_filter(self):
+        servers = self.servers.list()[:1]
+        api.nova.extension_supported('AdminActions', IsA(http.HttpRequest)) \
+            .MultipleTimes().AndReturn(True)
+        api.keystone.tenant_list(IsA(http.HttpRequest)) \
+            .AndReturn([self.tenants.list(), False])
+        # Nova filters on the status, the instances aren't filtered again.
+        search_opts = {'marker': None, 'paginate': True, 'status': 'ACTIVE'}
+        api.nova.server_list(IsA(http.HttpRequest),
+                             all_tenants=True, search_opts=search_opts) \
+            .AndReturn([servers, False])
+        api.network.servers_update_addresses(IsA(http.HttpRequest), servers)
+        api.nova.flavor_list(IsA(http.HttpRequest)) \
+            .AndReturn(self.flavors.list())
+        self.mox.ReplayAll()
+
+        res = self.client.post(INDEX_URL,
+                               {'instances__filter__q': 'active',
+                                'instances__filter__q_field': 'status'})
+        self.assertTemplateUsed(res, 'admin/instances/index.html')
+        self.assertItemsEqual(res.context['table'].filtered_data, servers)
+
     @test.create_stubs({api.nova: ('flavor_list', 'flavor_get',
                                     'server_list', 'extension_supported',),
                         api.keystone: ('tenant_list',),
@@ -167,6 +196,39 @@ class InstanceViewTest(test.BaseAdminViewTests):
         self.assertContains(res, "Active", 1, 200)
         self.assertContains(res, "Running", 1, 200)
 
+    @override_settings(OPENSTACK_BULK_CONCURRENCY={'compute': 1})
+    @test.create_stubs({api.nova: ('server_get', 'flavor_list',
+                                   'extension_supported', ),
+                        api.keystone: ('tenant_get',)})
+    def test_rows_update(self):
+        servers = self.servers.list()[:2]
+        tenant = self.tenants.first()
+        api.nova.extension_supported('AdminActions', IsA(http.HttpRequest)) \
+            .MultipleTimes().AndReturn(True)
+        # Listing would cover every project, so each row is looked up.
+        for server in servers:
+            api.nova.server_get(IsA(http.HttpRequest), server.id) \
+                .AndReturn(server)
+        api.nova.server_get(IsA(http.HttpRequest), 'gone') \
+            .AndRaise(self.exceptions.nova)
+        api.nova.flavor_list(IsA(http.HttpRequest)) \
+            .AndReturn(self.flavors.list())
+        # Both servers belong to the same project.
+        api.keystone.tenant_get(IsA(http.HttpRequest), servers[0].tenant_id,
+                                admin=True).AndReturn(tenant)
+        self.mox.ReplayAll()
+
+        params = [('action', 'rows_update'),
+                  ('table', 'instances'),
+                  ('obj_id', servers[0].id),
+                  ('obj_id', servers[1].id),
+                  ('obj_id', 'gone')]
+        res = self.client.get('?'.join((INDEX_URL, urlencode(params))),
+                              HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        rows = json.loads(res.content)
+        self.assertEqual(sorted(rows), sorted([servers[0].id, servers[1].id]))
+        self.assertIn(tenant.name, rows[servers[0].id])
+
     @test.create_stubs({api.nova: ('flavor_list', 'server_list',
                                    'extension_supported', ),
                         api.keystone: ('tenant_list',),
@@ -72,11 +72,13 @@ class AdminIndexView(tables.DataTableView):
         instances = []
         marker = self.request.GET.get(
             project_tables.AdminInstancesTable._meta.pagination_param, None)
+        search_opts = self.get_filters({'marker': marker, 'paginate': True})
+        if 'status' in search_opts:
+            search_opts['status'] = search_opts['status'].upper()
         try:
             instances, self._more = api.nova.server_list(
                 self.request,
-                search_opts={'marker': marker,
-                             'paginate': True},
+                search_opts=search_opts,
                 all_tenants=True)
         except Exception:
             self._more = False
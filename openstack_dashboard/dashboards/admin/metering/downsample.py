@@ -0,0 +1,181 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Shrinking the chart series of the metering panel.
+
+A series is a dictionary with a ``name``, a ``unit`` and a list of
+``{'x': date, 'y': value}`` points in ``data``, sorted by date. The dates
+are strings, so they sort chronologically as long as they share a format.
+"""
+
+import calendar
+import time
+
+METHODS = ('lttb', 'minmax')
+
+# The fewest points a series is reduced to.
+MIN_POINTS = 3
+
+
+def _timestamp(date):
+    return calendar.timegm(time.strptime(date[:19], "%Y-%m-%dT%H:%M:%S"))
+
+
+def _date(timestamp):
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(timestamp))
+
+
+def lttb(points, threshold):
+    """Reduces points with the Largest-Triangle-Three-Buckets algorithm.
+
+    The first and last points are kept. The others are split into
+    ``threshold - 2`` buckets and the point of each bucket which makes the
+    largest triangle with the point kept before it and the average of the
+    next bucket is kept, which preserves the shape of the series.
+    """
+    if threshold >= len(points) or threshold < MIN_POINTS:
+        return points
+    xs = [_timestamp(point['x']) for point in points]
+    ys = [point['y'] for point in points]
+    every = float(len(points) - 2) / (threshold - 2)
+    sampled = [points[0]]
+    a = 0
+    for i in range(threshold - 2):
+        avg_start = int(i * every + every) + 1
+        avg_end = min(int(i * every + 2 * every) + 1, len(points))
+        avg_length = avg_end - avg_start
+        avg_x = float(sum(xs[avg_start:avg_end])) / avg_length
+        avg_y = float(sum(ys[avg_start:avg_end])) / avg_length
+
+        max_area = -1
+        next_a = None
+        for j in range(int(i * every) + 1, int(i * every + every) + 1):
+            area = abs((xs[a] - avg_x) * (ys[j] - ys[a]) -
+                       (xs[a] - xs[j]) * (avg_y - ys[a]))
+            if area > max_area:
+                max_area = area
+                next_a = j
+        sampled.append(points[next_a])
+        a = next_a
+    sampled.append(points[-1])
+    return sampled
+
+
+def minmax(points, threshold):
+    """Keeps the lowest and the highest point of evenly sized buckets.
+
+    The points are split into ``threshold / 2`` buckets, so that the peaks
+    of the series are never dropped.
+    """
+    if threshold >= len(points) or threshold < MIN_POINTS:
+        return points
+    buckets = threshold // 2
+    size = float(len(points)) / buckets
+    sampled = []
+    for i in range(buckets):
+        bucket = range(int(i * size), int((i + 1) * size))
+        low = min(bucket, key=lambda j: points[j]['y'])
+        high = max(bucket, key=lambda j: points[j]['y'])
+        for j in sorted(set((low, high))):
+            sampled.append(points[j])
+    return sampled
+
+
+def limit_points(series, max_points, method='lttb'):
+    """Shares a budget of ``max_points`` points among all the series."""
+    if not series:
+        return series
+    reduce_func = minmax if method == 'minmax' else lttb
+    threshold = max(max_points // len(series), MIN_POINTS)
+    for serie in series:
+        serie['data'] = reduce_func(serie['data'], threshold)
+    return series
+
+
+def top_series(series, top, other_name):
+    """Keeps the ``top`` series with the largest sums.
+
+    The values of the other series are added up, date by date, into one
+    more series called ``other_name``.
+    """
+    if len(series) <= top:
+        return series
+    series = sorted(series, key=lambda serie: sum(point['y'] for point
+                                                  in serie['data']),
+                    reverse=True)
+    totals = {}
+    for serie in series[top:]:
+        for point in serie['data']:
+            totals[point['x']] = totals.get(point['x'], 0) + point['y']
+    other = {'unit': series[top]['unit'],
+             'name': other_name,
+             'data': [{'x': x, 'y': totals[x]} for x in sorted(totals)]}
+    return series[:top] + [other]
+
+
+def _grid(series, size):
+    """Puts the points of the series into ``size`` evenly sized buckets.
+
+    Returns the date of each bucket and, for each series, the average of
+    its points in each bucket, or ``None`` when it has none there.
+    """
+    timestamps = [[_timestamp(point['x']) for point in serie['data']]
+                  for serie in series]
+    start = min(min(xs) for xs in timestamps if xs)
+    end = max(max(xs) for xs in timestamps if xs)
+    width = float(end - start) / size
+    grid = []
+    for serie, xs in zip(series, timestamps):
+        sums = [0.0] * size
+        counts = [0] * size
+        for x, point in zip(xs, serie['data']):
+            i = min(int((x - start) / width), size - 1) if width else 0
+            sums[i] += point['y']
+            counts[i] += 1
+        grid.append([sums[i] / counts[i] if counts[i] else None
+                     for i in range(size)])
+    # Buckets where no series has a point aren't worth a date.
+    kept = [i for i in range(size)
+            if any(values[i] is not None for values in grid)]
+    return ([_date(start + int(i * width)) for i in kept],
+            [[values[i] for i in kept] for values in grid])
+
+
+def columnar(series):
+    """Encodes the series with one list of dates shared by all of them.
+
+    Each series gets a list of ``values`` matching the ``timestamps``,
+    with ``None`` where it has no point for that date. When the dates of
+    the series don't line up, such as the end of the last sample of each
+    period, their union would hold about one date per point, so the points
+    are averaged on a grid with as many dates as the longest series has
+    points instead.
+    """
+    timestamps = sorted(set(point['x'] for serie in series
+                            for point in serie['data']))
+    size = max([len(serie['data']) for serie in series] or [0])
+    if len(timestamps) > size:
+        timestamps, grid = _grid(series, size)
+    else:
+        index = dict((x, i) for i, x in enumerate(timestamps))
+        grid = []
+        for serie in series:
+            values = [None] * len(timestamps)
+            for point in serie['data']:
+                values[index[point['x']]] = point['y']
+            grid.append(values)
+    encoded = [{'unit': serie['unit'],
+                'name': serie['name'],
+                'values': values}
+               for serie, values in zip(series, grid)]
+    return {'timestamps': timestamps, 'series': encoded}
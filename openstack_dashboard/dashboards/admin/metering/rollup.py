@@ -0,0 +1,158 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Daily per-project averages of the meters, for the usage report.
+
+The statistics of a day which is over don't change anymore, so once they
+have been queried they are kept in the Django cache set in
+``OPENSTACK_METERING_ROLLUP``, one entry per meter, (UTC) day and project.
+Days which aren't stored yet are backfilled from Ceilometer when a report
+needs them, and only the current day is queried every time.
+"""
+
+from datetime import datetime  # noqa
+from datetime import timedelta  # noqa
+import hashlib
+
+from django.conf import settings
+from django.core import cache as django_cache
+
+from openstack_dashboard.api import base
+from openstack_dashboard.api import ceilometer
+
+
+DAY = 3600 * 24
+
+
+def _config():
+    return getattr(settings, 'OPENSTACK_METERING_ROLLUP', {})
+
+
+def _cache():
+    return django_cache.get_cache(_config().get('cache', 'default'))
+
+
+def _day_key(endpoint, meter_name, day, project_id):
+    digest = hashlib.md5(repr((endpoint, meter_name, day.isoformat(),
+                               project_id))).hexdigest()
+    return 'horizon:metering:rollup:%s' % digest
+
+
+def _ranges(days):
+    """Splits a sorted list of days into (first, last) runs of days."""
+    ranges = []
+    for day in days:
+        if ranges and ranges[-1][1] + timedelta(days=1) == day:
+            ranges[-1][1] = day
+        else:
+            ranges.append([day, day])
+    return ranges
+
+
+def _query_days(request, meter_name, project_ids, first, last):
+    """Queries the daily averages of a meter for each project.
+
+    Returns a dictionary mapping each day from ``first`` to ``last`` to a
+    dictionary of the projects with data on that day and their average,
+    and the set of projects whose statistics couldn't be obtained.
+    """
+    start = datetime.combine(first, datetime.min.time())
+    end = datetime.combine(last + timedelta(days=1), datetime.min.time())
+    queries = dict((project_id, [{'field': 'project_id',
+                                  'op': 'eq',
+                                  'value': project_id}])
+                   for project_id in project_ids)
+    additional_query = [{'field': 'timestamp', 'op': 'ge', 'value': start},
+                        {'field': 'timestamp', 'op': 'lt', 'value': end}]
+    ceilometer_usage = ceilometer.CeilometerUsage(request)
+    aggregates = ceilometer_usage.resource_aggregates_with_statistics(
+        queries, [meter_name], period=DAY, stats_attr=None,
+        additional_query=additional_query)
+
+    days = dict((first + timedelta(days=i), {})
+                for i in range((last - first).days + 1))
+    for aggregate in aggregates:
+        for statistic in aggregate.get_meter(meter_name.replace(".", "_")) \
+                or []:
+            day = datetime.strptime(statistic.period_start[:10],
+                                    "%Y-%m-%d").date()
+            if day in days:
+                days[day][aggregate.id] = statistic.avg
+    failed = set(project_id for project_id, meter, error
+                 in ceilometer_usage.statistics_errors)
+    return days, failed
+
+
+def daily_usage(request, meter_name, project_ids, first, last, store=True):
+    """Returns the daily averages of a meter for each project.
+
+    The result maps each day from ``first`` to ``last`` (dates, in UTC) to
+    a dictionary of the ids of the projects with data on that day and
+    their average. Days which are over are read from the rollup store,
+    after backfilling the ones it doesn't have yet. The backfilled days
+    are only stored when ``store`` is true, so callers which couldn't list
+    every project should pass ``False``.
+    """
+    today = datetime.utcnow().date()
+    days = [first + timedelta(days=i) for i in range((last - first).days + 1)]
+    closed = [day for day in days if day < today]
+    usage = dict((day, {}) for day in days)
+
+    # The days each project is missing, grouped by the projects missing
+    # the same days so that they are queried together.
+    missing = {}
+    config = _config()
+    store = store and config.get('enabled', True)
+    if config.get('enabled', True):
+        cache = _cache()
+        endpoint = base.url_for(request, 'metering')
+        keys = dict(((day, project_id),
+                     _day_key(endpoint, meter_name, day, project_id))
+                    for day in closed for project_id in project_ids)
+        stored = cache.get_many(keys.values())
+        for project_id in project_ids:
+            project_days = []
+            for day in closed:
+                entry = stored.get(keys[(day, project_id)])
+                if entry is None:
+                    project_days.append(day)
+                elif entry['avg'] is not None:
+                    usage[day][project_id] = entry['avg']
+            if project_days:
+                missing.setdefault(tuple(project_days), []).append(project_id)
+    elif closed:
+        missing[tuple(closed)] = list(project_ids)
+
+    for missing_days, missing_projects in missing.items():
+        for range_first, range_last in _ranges(missing_days):
+            queried, failed = _query_days(request, meter_name,
+                                          missing_projects, range_first,
+                                          range_last)
+            for day, projects in queried.items():
+                usage[day].update(projects)
+            if store:
+                # Projects with missing statistics are queried again next
+                # time. The others are stored even without data, as None.
+                cache.set_many(
+                    dict((keys[(day, project_id)],
+                          {'avg': projects.get(project_id)})
+                         for day, projects in queried.items()
+                         for project_id in set(missing_projects) - failed),
+                    config.get('timeout', DAY * 31))
+
+    if days and days[-1] >= today:
+        queried, failed = _query_days(request, meter_name, project_ids,
+                                      max(today, first), last)
+        for day, projects in queried.items():
+            usage[day].update(projects)
+    return usage
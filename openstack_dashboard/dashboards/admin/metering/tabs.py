@@ -36,7 +36,7 @@ class GlobalStatsTab(tabs.Tab):
                     'm1.large', 'm1.xlarge']
 
     def get_context_data(self, request):
-        meters = ceilometer.Meters(request)
+        meters = ceilometer.meter_catalog(request)
         if not meters._ceilometer_meter_list:
             msg = _("There are no meters defined yet.")
             messages.warning(request, msg)
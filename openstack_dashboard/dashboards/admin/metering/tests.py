@@ -9,14 +9,20 @@
 # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 # License for the specific language governing permissions and limitations
 # under the License.
+from datetime import datetime  # noqa
+from datetime import timedelta  # noqa
 import json
 import uuid
 
+from ceilometerclient.v2 import statistics
+from django.core import cache
 from django.core.urlresolvers import reverse
 from django import http
 from mox import IsA  # noqa
 
 from openstack_dashboard import api
+from openstack_dashboard.dashboards.admin.metering import downsample
+from openstack_dashboard.dashboards.admin.metering import rollup
 from openstack_dashboard.dashboards.admin.metering import tabs
 from openstack_dashboard.test import helpers as test
 
@@ -61,14 +67,12 @@ class MeteringViewTests(test.APITestCase, test.BaseAdminViewTests):
 
         self.assertEqual(data.get('settings'), {})
 
-    @test.create_stubs({api.keystone: ('tenant_list',)})
+    @test.create_stubs({api.keystone: ('iter_projects',)})
     def test_stats_for_line_chart(self):
         statistics = self.statistics.list()
 
-        api.keystone.tenant_list(IsA(http.HttpRequest),
-                                 domain=None,
-                                 paginate=False) \
-            .AndReturn([self.tenants.list(), False])
+        api.keystone.iter_projects(IsA(http.HttpRequest)) \
+            .AndReturn(iter(self.tenants.list()))
 
         ceilometerclient = self.stub_ceilometerclient()
         ceilometerclient.statistics = self.mox.CreateMockAnything()
@@ -92,14 +96,41 @@ class MeteringViewTests(test.APITestCase, test.BaseAdminViewTests):
         self._verify_series(res._container[0], 4.55, '2012-12-21T11:00:55',
                             expected_names)
 
-    @test.create_stubs({api.keystone: ('tenant_list',)})
+    @test.create_stubs({api.keystone: ('iter_projects',)})
+    def test_stats_for_line_chart_columnar_top(self):
+        statistics = self.statistics.list()
+
+        api.keystone.iter_projects(IsA(http.HttpRequest)) \
+            .AndReturn(iter(self.tenants.list()))
+
+        ceilometerclient = self.stub_ceilometerclient()
+        ceilometerclient.statistics = self.mox.CreateMockAnything()
+        ceilometerclient.statistics.list(meter_name="memory",
+                                         period=IsA(int), q=IsA(list)).\
+            MultipleTimes().\
+            AndReturn(statistics)
+
+        self.mox.ReplayAll()
+
+        res = self.client.get(reverse('horizon:admin:metering:samples') +
+            "?meter=memory&group_by=project&stats_attr=avg&date_options=7"
+            "&top=1&max_points=100&format=columnar")
+
+        data = json.loads(res.content)
+        self.assertEqual(data['timestamps'], ['2012-12-21T11:00:55'])
+        self.assertEqual(len(data['series']), 2)
+        self.assertAlmostEqual(data['series'][0]['values'][0], 4.55)
+        # The two other projects are added up.
+        self.assertEqual(data['series'][1]['name'], 'Other')
+        self.assertAlmostEqual(data['series'][1]['values'][0], 9.1)
+        self.assertEqual(data['settings'], {})
+
+    @test.create_stubs({api.keystone: ('iter_projects',)})
     def test_stats_for_line_chart_attr_max(self):
         statistics = self.statistics.list()
 
-        api.keystone.tenant_list(IsA(http.HttpRequest),
-                                 domain=None,
-                                 paginate=False) \
-            .AndReturn([self.tenants.list(), False])
+        api.keystone.iter_projects(IsA(http.HttpRequest)) \
+            .AndReturn(iter(self.tenants.list()))
 
         ceilometerclient = self.stub_ceilometerclient()
         ceilometerclient.statistics = self.mox.CreateMockAnything()
@@ -151,18 +182,15 @@ class MeteringViewTests(test.APITestCase, test.BaseAdminViewTests):
         self._verify_series(res._container[0], 4.55, '2012-12-21T11:00:55',
                             expected_names)
 
-    @test.create_stubs({api.keystone: ('tenant_list',)})
+    @test.create_stubs({api.keystone: ('iter_projects',)})
     def test_report(self):
         meters = self.meters.list()
         ceilometerclient = self.stub_ceilometerclient()
         ceilometerclient.meters = self.mox.CreateMockAnything()
         ceilometerclient.meters.list(None).AndReturn(meters)
 
-        api.keystone.tenant_list(IsA(http.HttpRequest),
-                                 domain=None,
-                                 paginate=False). \
-            MultipleTimes()\
-            .AndReturn([self.tenants.list(), False])
+        api.keystone.iter_projects(IsA(http.HttpRequest)) \
+            .MultipleTimes().AndReturn(self.tenants.list())
 
         statistics = self.statistics.list()
         ceilometerclient = self.stub_ceilometerclient()
@@ -190,6 +218,122 @@ class MeteringViewTests(test.APITestCase, test.BaseAdminViewTests):
         self.assertTemplateUsed(res, 'admin/metering/report.html')
 
 
+class MeteringRollupTests(test.APITestCase):
+    def setUp(self):
+        super(MeteringRollupTests, self).setUp()
+        cache.cache.clear()
+
+    def _statistic(self, day, avg):
+        return statistics.Statistics(statistics.StatisticsManager(None),
+                                     {'avg': avg,
+                                      'period_start': '%sT00:00:00' % day,
+                                      'period_end': '%sT00:00:00' % day})
+
+    def test_daily_usage(self):
+        tenant = self.tenants.first()
+        today = datetime.utcnow().date()
+        first = today - timedelta(days=2)
+        ceilometerclient = self.stub_ceilometerclient()
+        ceilometerclient.statistics = self.mox.CreateMockAnything()
+        # The closed days are queried once, in a single call.
+        ceilometerclient.statistics.list(meter_name='memory',
+                                         period=rollup.DAY, q=IsA(list)) \
+            .AndReturn([self._statistic(first, 1.0),
+                        self._statistic(first + timedelta(days=1), 2.0)])
+        ceilometerclient.statistics.list(meter_name='memory',
+                                         period=rollup.DAY, q=IsA(list)) \
+            .AndReturn([self._statistic(today, 3.0)])
+        ceilometerclient.statistics.list(meter_name='memory',
+                                         period=rollup.DAY, q=IsA(list)) \
+            .AndReturn([self._statistic(today, 4.0)])
+        self.mox.ReplayAll()
+
+        usage = rollup.daily_usage(self.request, 'memory', [tenant.id],
+                                   first, today)
+        self.assertEqual(usage, {first: {tenant.id: 1.0},
+                                 first + timedelta(days=1): {tenant.id: 2.0},
+                                 today: {tenant.id: 3.0}})
+
+        usage = rollup.daily_usage(self.request, 'memory', [tenant.id],
+                                   first, today)
+        self.assertEqual(usage, {first: {tenant.id: 1.0},
+                                 first + timedelta(days=1): {tenant.id: 2.0},
+                                 today: {tenant.id: 4.0}})
+
+    def test_daily_usage_not_stored(self):
+        tenant = self.tenants.first()
+        first = datetime.utcnow().date() - timedelta(days=2)
+        last = first + timedelta(days=1)
+        ceilometerclient = self.stub_ceilometerclient()
+        ceilometerclient.statistics = self.mox.CreateMockAnything()
+        # Nothing is stored, so the closed days are queried both times.
+        for i in range(2):
+            ceilometerclient.statistics.list(meter_name='memory',
+                                             period=rollup.DAY,
+                                             q=IsA(list)) \
+                .AndReturn([self._statistic(first, 1.0)])
+        self.mox.ReplayAll()
+
+        for i in range(2):
+            usage = rollup.daily_usage(self.request, 'memory', [tenant.id],
+                                       first, last, store=False)
+            self.assertEqual(usage, {first: {tenant.id: 1.0}, last: {}})
+
+
+class DownsampleTests(test.TestCase):
+    def _points(self, values):
+        start = datetime(2014, 1, 1)
+        return [{'x': (start + timedelta(hours=i)).isoformat(), 'y': y}
+                for i, y in enumerate(values)]
+
+    def test_lttb(self):
+        points = self._points([1] * 50 + [20] + [1] * 49)
+        sampled = downsample.lttb(points, 10)
+        self.assertEqual(len(sampled), 10)
+        self.assertEqual(sampled[0], points[0])
+        self.assertEqual(sampled[-1], points[-1])
+        self.assertIn(points[50], sampled)
+        self.assertEqual(sampled, sorted(sampled, key=lambda p: p['x']))
+
+    def test_minmax(self):
+        points = self._points(range(20) + [-5] + range(79))
+        sampled = downsample.minmax(points, 10)
+        self.assertEqual(len(sampled), 10)
+        self.assertIn(points[20], sampled)
+        self.assertIn(points[-1], sampled)
+
+    def test_limit_points_budget(self):
+        series = [{'unit': '', 'name': str(i), 'data': self._points(range(50))}
+                  for i in range(4)]
+        series = downsample.limit_points(series, 40)
+        self.assertEqual([len(serie['data']) for serie in series],
+                         [10] * 4)
+
+    def test_columnar(self):
+        points = self._points([1, 2, 3])
+        encoded = downsample.columnar([
+            {'unit': 'B', 'name': 'a', 'data': points},
+            {'unit': 'B', 'name': 'b', 'data': points[1:2]}])
+        self.assertEqual(encoded['timestamps'], [p['x'] for p in points])
+        self.assertEqual(encoded['series'][1],
+                         {'unit': 'B', 'name': 'b', 'values': [None, 2, None]})
+
+    def test_columnar_unaligned(self):
+        # Each series ends its periods a few seconds after the previous.
+        series = []
+        for i in range(10):
+            points = self._points(range(100))
+            for point in points:
+                point['x'] = point['x'][:17] + '%02d' % (i * 5)
+            series.append({'unit': 'B', 'name': str(i), 'data': points})
+        rows = json.dumps({'series': series})
+
+        encoded = downsample.columnar(series)
+        self.assertLessEqual(len(encoded['timestamps']), 100)
+        self.assertEqual(encoded['series'][3]['values'], range(100))
+        self.assertLess(len(json.dumps(encoded)), len(rows) / 2)
+
+
 class MeteringStatsTabTests(test.APITestCase):
 
     @test.create_stubs({api.nova: ('flavor_list',),
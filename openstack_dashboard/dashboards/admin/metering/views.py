@@ -21,6 +21,7 @@ from django.utils.translation import ugettext_lazy as _
 from django.views import generic
 
 from horizon import exceptions
+from horizon import messages
 from horizon import tables
 from horizon import tabs
 from horizon.utils import csvbase
@@ -28,6 +29,8 @@ from horizon.utils import csvbase
 from openstack_dashboard import api
 from openstack_dashboard.api import ceilometer
 
+from openstack_dashboard.dashboards.admin.metering import downsample
+from openstack_dashboard.dashboards.admin.metering import rollup
 from openstack_dashboard.dashboards.admin.metering import tables as \
     metering_tables
 from openstack_dashboard.dashboards.admin.metering import tabs as \
@@ -62,6 +65,14 @@ class SamplesView(generic.TemplateView):
                 series.append(point)
         return series
 
+    @staticmethod
+    def _positive_int(request, name):
+        try:
+            value = int(request.GET.get(name, 0))
+        except ValueError:
+            return None
+        return value if value > 0 else None
+
     def get(self, request, *args, **kwargs):
         meter = request.GET.get('meter', None)
         if not meter:
@@ -88,8 +99,22 @@ class SamplesView(generic.TemplateView):
                                         stats_attr,
                                         unit)
 
-        ret = {}
-        ret['series'] = series
+        # Charts with hundreds of series and thousands of points can't be
+        # read anyway, so the callers can ask for smaller responses.
+        top = self._positive_int(request, 'top')
+        if top:
+            series = downsample.top_series(series, top, unicode(_('Other')))
+        max_points = self._positive_int(request, 'max_points')
+        if max_points:
+            method = request.GET.get('downsample', 'lttb')
+            if method not in downsample.METHODS:
+                method = 'lttb'
+            series = downsample.limit_points(series, max_points, method)
+
+        if request.GET.get('format') == 'columnar':
+            ret = downsample.columnar(series)
+        else:
+            ret = {'series': series}
         ret['settings'] = {}
 
         return HttpResponse(json.dumps(ret),
@@ -98,11 +123,15 @@ class SamplesView(generic.TemplateView):
 
 class ReportView(tables.MultiTableView):
     template_name = 'admin/metering/report.html'
+    project_data = None
 
     def get_tables(self):
         if self._tables:
             return self._tables
-        project_data = load_report_data(self.request)
+        # A report without any usage has no tables, don't load it again.
+        project_data = self.project_data
+        if project_data is None:
+            project_data = load_report_data(self.request)
         table_instances = []
         limit = int(self.request.POST.get('limit', '1000'))
         for project in project_data.keys():
@@ -244,32 +273,25 @@ def query_data(request,
                               'op': 'le',
                               'value': date_to}]
 
-    # TODO(lsmola) replace this by logic implemented in I1 in bugs
-    # 1226479 and 1226482, this is just a quick fix for RC1
     try:
-        meter_list = [m for m in ceilometer.meter_list(request)
-                      if m.name == meter]
-        unit = meter_list[0].unit
+        unit = ceilometer.meter_catalog(request).unit(meter)
     except Exception:
         unit = ""
     if group_by == "project":
+        queries = {}
+        # Only the ids and names are needed, so don't build a list of all
+        # the projects.
         try:
-            tenants, more = api.keystone.tenant_list(
-                request,
-                domain=None,
-                paginate=False)
+            for tenant in api.keystone.iter_projects(request):
+                tenant_query = [{
+                                "field": "project_id",
+                                "op": "eq",
+                                "value": tenant.id}]
+
+                queries[tenant.name] = tenant_query
         except Exception:
-            tenants = []
             exceptions.handle(request,
                               _('Unable to retrieve tenant list.'))
-        queries = {}
-        for tenant in tenants:
-            tenant_query = [{
-                            "field": "project_id",
-                            "op": "eq",
-                            "value": tenant.id}]
-
-            queries[tenant.name] = tenant_query
 
         ceilometer_usage = ceilometer.CeilometerUsage(request)
         resources = ceilometer_usage.resource_aggregates_with_statistics(
@@ -301,51 +323,66 @@ def query_data(request,
             resources = []
             exceptions.handle(request,
                               _('Unable to retrieve statistics.'))
+    if ceilometer_usage.statistics_errors:
+        messages.warning(request, _('Unable to retrieve some of the '
+                                    'statistics, the data shown is '
+                                    'incomplete.'))
     return resources, unit
 
 
+SERVICE_LABELS = {
+    'nova': _('Nova'),
+    'neutron': _('Neutron'),
+    'glance': _('Glance'),
+    'cinder': _('Cinder'),
+    'swift': _('Swift_meters'),
+    'kwapi': _('Kwapi'),
+}
+
+
 def load_report_data(request):
-    meters = ceilometer.Meters(request)
-    services = {
-        _('Nova'): meters.list_nova(),
-        _('Neutron'): meters.list_neutron(),
-        _('Glance'): meters.list_glance(),
-        _('Cinder'): meters.list_cinder(),
-        _('Swift_meters'): meters.list_swift(),
-        _('Kwapi'): meters.list_kwapi(),
-    }
+    meters = ceilometer.meter_catalog(request)
     project_rows = {}
     date_options = request.GET.get('date_options', 7)
     date_from = request.GET.get('date_from')
     date_to = request.GET.get('date_to')
-    for meter in meters._cached_meters.values():
-        service = None
-        for name, m_list in services.items():
-            if meter in m_list:
-                service = name
-                break
-        # show detailed samples
-        # samples = ceilometer.sample_list(request, meter.name)
-        res, unit = query_data(request,
-                               date_from,
-                               date_to,
-                               date_options,
-                               "project",
-                               meter.name,
-                               3600 * 24)
-        for re in res:
-            values = re.get_meter(meter.name.replace(".", "_"))
-            if values:
-                for value in values:
-                    row = {"name": 'none',
-                           "project": re.id,
-                           "meter": meter.name,
-                           "description": meter.description,
-                           "service": service,
-                           "time": value._apiresource.period_end,
-                           "value": value._apiresource.avg}
-                    if re.id not in project_rows:
-                        project_rows[re.id] = [row]
-                    else:
-                        project_rows[re.id].append(row)
+    date_from, date_to = _calc_date_args(date_from,
+                                         date_to,
+                                         date_options)
+    if date_from is None:
+        date_from = date_to - timedelta(days=7)
+
+    # The projects are the same for every meter, so only list them once.
+    projects = SortedDict()
+    # Without every project, the days queried aren't complete and mustn't
+    # be kept in the rollup store.
+    all_projects = True
+    try:
+        for tenant in api.keystone.iter_projects(request):
+            projects[tenant.id] = tenant.name
+    except Exception:
+        all_projects = False
+        exceptions.handle(request,
+                          _('Unable to retrieve tenant list.'))
+
+    for meter in meters.list_all():
+        service = SERVICE_LABELS[meters.service(meter.name)]
+        # The days which are over are read from the rollup store and only
+        # the current one is queried from Ceilometer.
+        usage = rollup.daily_usage(request, meter.name, projects.keys(),
+                                   date_from.date(), date_to.date(),
+                                   store=all_projects)
+        for day in sorted(usage):
+            time = datetime.combine(day + timedelta(days=1),
+                                    datetime.min.time()).isoformat()
+            for project_id, value in usage[day].items():
+                project = projects[project_id]
+                row = {"name": 'none',
+                       "project": project,
+                       "meter": meter.name,
+                       "description": meter.description,
+                       "service": service,
+                       "time": time,
+                       "value": value}
+                project_rows.setdefault(project, []).append(row)
     return project_rows
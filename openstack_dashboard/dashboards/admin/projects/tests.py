@@ -688,6 +688,8 @@ class CreateProjectWorkflowTests(test.BaseAdminViewTests):
         self.test_add_project_missing_field_error()
 
 
+# Role changes are made one at a time, in a predictable order.
+@override_settings(OPENSTACK_BULK_CONCURRENCY={'identity': 1})
 class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
     def _get_quota_info(self, quota):
         cinder_quota = self.cinder_quotas.first()
@@ -725,12 +727,20 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
         return [group for group in self.groups.list()
                 if group.project_id == project_id]
 
+    def _get_proj_users_roles(self, project_id, roles):
+        return dict((user.id, [role.id for role in roles])
+                    for user in self._get_proj_users(project_id))
+
+    def _get_proj_groups_roles(self, project_id, roles):
+        return dict((group.id, [role.id for role in roles])
+                    for group in self._get_proj_groups(project_id))
+
     @test.create_stubs({api.keystone: ('get_default_role',
-                                       'roles_for_user',
+                                       'get_project_users_roles',
                                        'tenant_get',
                                        'domain_get',
                                        'user_list',
-                                       'roles_for_group',
+                                       'get_project_groups_roles',
                                        'group_list',
                                        'role_list'),
                         quotas: ('get_tenant_quota_data',
@@ -743,7 +753,6 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
         users = self._get_all_users(domain_id)
         groups = self._get_all_groups(domain_id)
         roles = self.roles.list()
-        proj_users = self._get_proj_users(project.id)
 
         api.keystone.tenant_get(IsA(http.HttpRequest),
                                 self.tenant.id, admin=True) \
@@ -764,18 +773,13 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
             .MultipleTimes().AndReturn(roles)
         api.keystone.group_list(IsA(http.HttpRequest), domain=domain_id) \
             .AndReturn(groups)
-        api.keystone.user_list(IsA(http.HttpRequest),
-                               project=self.tenant.id).AndReturn(proj_users)
-        for user in proj_users:
-            api.keystone.roles_for_user(IsA(http.HttpRequest),
-                                        user.id,
-                                        self.tenant.id).AndReturn(roles)
-
-        for group in groups:
-            api.keystone.roles_for_group(IsA(http.HttpRequest),
-                                         group=group.id,
-                                         project=self.tenant.id) \
-                .AndReturn(roles)
+        api.keystone.get_project_users_roles(IsA(http.HttpRequest),
+                                             project=self.tenant.id,
+                                             max_workers=1) \
+            .AndReturn(self._get_proj_users_roles(project.id, roles))
+        api.keystone.get_project_groups_roles(IsA(http.HttpRequest),
+                                              project=self.tenant.id) \
+            .AndReturn(self._get_proj_groups_roles(project.id, roles))
 
         self.mox.ReplayAll()
 
@@ -806,11 +810,11 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
                                        'domain_get',
                                        'tenant_update',
                                        'get_default_role',
-                                       'roles_for_user',
+                                       'get_project_users_roles',
                                        'remove_tenant_user_role',
                                        'add_tenant_user_role',
                                        'user_list',
-                                       'roles_for_group',
+                                       'get_project_groups_roles',
                                        'remove_group_role',
                                        'add_group_role',
                                        'group_list',
@@ -825,9 +829,7 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
         default_role = self.roles.first()
         domain_id = project.domain_id
         users = self._get_all_users(domain_id)
-        proj_users = self._get_proj_users(project.id)
         groups = self._get_all_groups(domain_id)
-        proj_groups = self._get_proj_groups(project.id)
         roles = self.roles.list()
 
         # get/init
@@ -853,18 +855,15 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
             .MultipleTimes().AndReturn(roles)
         api.keystone.group_list(IsA(http.HttpRequest), domain=domain_id) \
             .AndReturn(groups)
-        api.keystone.user_list(IsA(http.HttpRequest),
-                               project=self.tenant.id).AndReturn(proj_users)
+        api.keystone.get_project_users_roles(IsA(http.HttpRequest),
+                                             project=self.tenant.id,
+                                             max_workers=1) \
+            .AndReturn(self._get_proj_users_roles(project.id, roles))
+        api.keystone.get_project_groups_roles(IsA(http.HttpRequest),
+                                              project=self.tenant.id) \
+            .AndReturn(self._get_proj_groups_roles(project.id, roles))
+
         workflow_data = {}
-        for user in proj_users:
-            api.keystone.roles_for_user(IsA(http.HttpRequest),
-                                        user.id,
-                                        self.tenant.id).AndReturn(roles)
-        for group in groups:
-            api.keystone.roles_for_group(IsA(http.HttpRequest),
-                                         group=group.id,
-                                         project=self.tenant.id) \
-                .AndReturn(roles)
 
         workflow_data[USER_ROLE_PREFIX + "1"] = ['3']  # admin role
         workflow_data[USER_ROLE_PREFIX + "2"] = ['2']  # member role
@@ -890,91 +889,62 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
                                    **updated_project) \
             .AndReturn(project)
 
-        api.keystone.user_list(IsA(http.HttpRequest),
-                               project=self.tenant.id).AndReturn(proj_users)
+        # Only the differences between the current and the chosen roles are
+        # applied.
+        api.keystone.get_project_users_roles(IsA(http.HttpRequest),
+                                             project=self.tenant.id,
+                                             max_workers=1) \
+            .AndReturn({'1': ['1', '2'], '2': ['1'], '3': ['2']})
 
         # admin user - try to remove all roles on current project, warning
-        api.keystone.roles_for_user(IsA(http.HttpRequest), '1',
-                                    self.tenant.id) \
-                           .AndReturn(roles)
-
-        # member user 1 - has role 1, will remove it
-        api.keystone.roles_for_user(IsA(http.HttpRequest), '2',
-                                    self.tenant.id) \
-                           .AndReturn((roles[0],))
-        # remove role 1
-        api.keystone.remove_tenant_user_role(IsA(http.HttpRequest),
-                                             project=self.tenant.id,
-                                             user='2',
-                                             role='1')
-        # add role 2
+        # member user 2 - has role 1, will remove it and add role 2
+        # member user 3 - has role 2, will remove it and add role 1
         api.keystone.add_tenant_user_role(IsA(http.HttpRequest),
                                           project=self.tenant.id,
                                           user='2',
                                           role='2')
-
-        # member user 3 - has role 2
-        api.keystone.roles_for_user(IsA(http.HttpRequest), '3',
-                                    self.tenant.id) \
-                           .AndReturn((roles[1],))
-        # remove role 2
-        api.keystone.remove_tenant_user_role(IsA(http.HttpRequest),
-                                             project=self.tenant.id,
-                                             user='3',
-                                             role='2')
-        # add role 1
         api.keystone.add_tenant_user_role(IsA(http.HttpRequest),
                                           project=self.tenant.id,
                                           user='3',
                                           role='1')
+        api.keystone.remove_tenant_user_role(IsA(http.HttpRequest),
+                                             project=self.tenant.id,
+                                             user='2',
+                                             role='1')
+        api.keystone.remove_tenant_user_role(IsA(http.HttpRequest),
+                                             project=self.tenant.id,
+                                             user='3',
+                                             role='2')
 
         # Group assignments
-        api.keystone.group_list(IsA(http.HttpRequest),
-                                domain=domain_id,
-                                project=self.tenant.id).AndReturn(proj_groups)
+        api.keystone.get_project_groups_roles(IsA(http.HttpRequest),
+                                              project=self.tenant.id) \
+            .AndReturn({'1': ['1', '2'], '2': ['1'], '3': ['2']})
 
         # admin group - try to remove all roles on current project
-        api.keystone.roles_for_group(IsA(http.HttpRequest),
-                                     group='1',
-                                     project=self.tenant.id) \
-                           .AndReturn(roles)
+        # member group 2 - has role 1, will remove it and add role 2
+        # member group 3 - has role 2, will remove it and add role 1
+        api.keystone.add_group_role(IsA(http.HttpRequest),
+                                    role='2',
+                                    group='2',
+                                    project=self.tenant.id)
+        api.keystone.add_group_role(IsA(http.HttpRequest),
+                                    role='1',
+                                    group='3',
+                                    project=self.tenant.id)
         for role in roles:
             api.keystone.remove_group_role(IsA(http.HttpRequest),
                                            role=role.id,
                                            group='1',
                                            project=self.tenant.id)
-
-        # member group 1 - has role 1, will remove it
-        api.keystone.roles_for_group(IsA(http.HttpRequest),
-                                     group='2',
-                                     project=self.tenant.id) \
-                           .AndReturn((roles[0],))
-        # remove role 1
         api.keystone.remove_group_role(IsA(http.HttpRequest),
                                        role='1',
                                        group='2',
                                        project=self.tenant.id)
-        # add role 2
-        api.keystone.add_group_role(IsA(http.HttpRequest),
-                                    role='2',
-                                    group='2',
-                                    project=self.tenant.id)
-
-        # member group 3 - has role 2
-        api.keystone.roles_for_group(IsA(http.HttpRequest),
-                                     group='3',
-                                     project=self.tenant.id) \
-                           .AndReturn((roles[1],))
-        # remove role 2
         api.keystone.remove_group_role(IsA(http.HttpRequest),
                                        role='2',
                                        group='3',
                                        project=self.tenant.id)
-        # add role 1
-        api.keystone.add_group_role(IsA(http.HttpRequest),
-                                    role='1',
-                                    group='3',
-                                    project=self.tenant.id)
 
         nova_updated_quota = dict([(key, updated_quota[key]) for key in
                                    quotas.NOVA_QUOTA_FIELDS])
@@ -1043,11 +1013,11 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
                                        'domain_get',
                                        'tenant_update',
                                        'get_default_role',
-                                       'roles_for_user',
+                                       'get_project_users_roles',
                                        'remove_tenant_user',
                                        'add_tenant_user_role',
                                        'user_list',
-                                       'roles_for_group',
+                                       'get_project_groups_roles',
                                        'remove_group_role',
                                        'add_group_role',
                                        'group_list',
@@ -1085,24 +1055,22 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
             .MultipleTimes().AndReturn(roles)
         api.keystone.group_list(IsA(http.HttpRequest), domain=domain_id) \
             .AndReturn(groups)
-        api.keystone.user_list(IsA(http.HttpRequest),
-                               project=self.tenant.id).AndReturn(proj_users)
+        api.keystone.get_project_users_roles(IsA(http.HttpRequest),
+                                             project=self.tenant.id,
+                                             max_workers=1) \
+            .AndReturn(self._get_proj_users_roles(project.id, roles))
+        api.keystone.get_project_groups_roles(IsA(http.HttpRequest),
+                                              project=self.tenant.id) \
+            .AndReturn(self._get_proj_groups_roles(project.id, roles))
 
         workflow_data = {}
         for user in proj_users:
-            api.keystone.roles_for_user(IsA(http.HttpRequest),
-                                        user.id,
-                                        self.tenant.id).AndReturn(roles)
             role_ids = [role.id for role in roles]
             if role_ids:
                 workflow_data.setdefault(USER_ROLE_PREFIX + role_ids[0], []) \
                              .append(user.id)
 
         for group in groups:
-            api.keystone.roles_for_group(IsA(http.HttpRequest),
-                                         group=group.id,
-                                         project=self.tenant.id) \
-                .AndReturn(roles)
             role_ids = [role.id for role in roles]
             if role_ids:
                 workflow_data.setdefault(GROUP_ROLE_PREFIX + role_ids[0], []) \
@@ -1147,11 +1115,11 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
                                        'domain_get',
                                        'tenant_update',
                                        'get_default_role',
-                                       'roles_for_user',
+                                       'get_project_users_roles',
                                        'remove_tenant_user_role',
                                        'add_tenant_user_role',
                                        'user_list',
-                                       'roles_for_group',
+                                       'get_project_groups_roles',
                                        'remove_group_role',
                                        'add_group_role',
                                        'group_list',
@@ -1165,9 +1133,7 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
         default_role = self.roles.first()
         domain_id = project.domain_id
         users = self._get_all_users(domain_id)
-        proj_users = self._get_proj_users(project.id)
         groups = self._get_all_groups(domain_id)
-        proj_groups = self._get_proj_groups(project.id)
         roles = self.roles.list()
 
         # get/init
@@ -1190,22 +1156,16 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
             .MultipleTimes().AndReturn(roles)
         api.keystone.group_list(IsA(http.HttpRequest), domain=domain_id) \
             .AndReturn(groups)
-        api.keystone.user_list(IsA(http.HttpRequest),
-                       project=self.tenant.id).AndReturn(proj_users)
+        api.keystone.get_project_users_roles(IsA(http.HttpRequest),
+                                             project=self.tenant.id,
+                                             max_workers=1) \
+            .AndReturn(self._get_proj_users_roles(project.id, roles))
+        api.keystone.get_project_groups_roles(IsA(http.HttpRequest),
+                                              project=self.tenant.id) \
+            .AndReturn(self._get_proj_groups_roles(project.id, roles))
 
         workflow_data = {}
 
-        for user in proj_users:
-            api.keystone.roles_for_user(IsA(http.HttpRequest),
-                                        user.id,
-                                        self.tenant.id).AndReturn(roles)
-
-        for group in groups:
-            api.keystone.roles_for_group(IsA(http.HttpRequest),
-                                         group=group.id,
-                                         project=self.tenant.id) \
-                .AndReturn(roles)
-
         workflow_data[USER_ROLE_PREFIX + "1"] = ['1', '3']  # admin role
         workflow_data[USER_ROLE_PREFIX + "2"] = ['1', '2', '3']  # member role
         # Group role assignment data
@@ -1230,53 +1190,25 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
                                    **updated_project) \
             .AndReturn(project)
 
-        api.keystone.user_list(IsA(http.HttpRequest),
-                               project=self.tenant.id).AndReturn(proj_users)
+        api.keystone.get_project_users_roles(IsA(http.HttpRequest),
+                                             project=self.tenant.id,
+                                             max_workers=1) \
+            .AndReturn({'1': ['1', '2'], '2': ['2'], '3': ['1']})
 
-        # admin user - try to remove all roles on current project, warning
-        api.keystone.roles_for_user(IsA(http.HttpRequest), '1',
-                                    self.tenant.id) \
-                           .AndReturn(roles)
-
-        # member user 1 - has role 1, will remove it
-        api.keystone.roles_for_user(IsA(http.HttpRequest), '2',
-                                    self.tenant.id) \
-                           .AndReturn((roles[1],))
-
-        # member user 3 - has role 2
-        api.keystone.roles_for_user(IsA(http.HttpRequest), '3',
-                                    self.tenant.id) \
-                           .AndReturn((roles[0],))
-        # add role 2
+        # admin user and member user 2 - no change
+        # member user 3 - has role 1, will add role 2
         api.keystone.add_tenant_user_role(IsA(http.HttpRequest),
                                           project=self.tenant.id,
                                           user='3',
                                           role='2')
 
         # Group assignment
-        api.keystone.group_list(IsA(http.HttpRequest),
-                                domain=domain_id,
-                                project=self.tenant.id).AndReturn(proj_groups)
-
-        # admin group 1- try to remove all roles on current project
-        api.keystone.roles_for_group(IsA(http.HttpRequest),
-                                     group='1',
-                                     project=self.tenant.id) \
-                           .AndReturn(roles)
-
-        # member group 1 - has no change
-        api.keystone.roles_for_group(IsA(http.HttpRequest),
-                                     group='2',
-                                     project=self.tenant.id) \
-                           .AndReturn((roles[1],))
-
-        # member group 3 - has role 1
-        api.keystone.roles_for_group(IsA(http.HttpRequest),
-                                     group='3',
-                                     project=self.tenant.id) \
-                           .AndReturn((roles[0],))
-
-        # add role 2
+        api.keystone.get_project_groups_roles(IsA(http.HttpRequest),
+                                              project=self.tenant.id) \
+            .AndReturn({'1': ['1', '2'], '2': ['2'], '3': ['1']})
+
+        # admin group 1 and member group 2 - no change
+        # member group 3 - has role 1, will add role 2
         api.keystone.add_group_role(IsA(http.HttpRequest),
                                     role='2',
                                     group='3',
@@ -1311,11 +1243,11 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
                                        'domain_get',
                                        'tenant_update',
                                        'get_default_role',
-                                       'roles_for_user',
+                                       'get_project_users_roles',
                                        'remove_tenant_user_role',
                                        'add_tenant_user_role',
                                        'user_list',
-                                       'roles_for_group',
+                                       'get_project_groups_roles',
                                        'remove_group_role',
                                        'add_group_role',
                                        'group_list',
@@ -1328,7 +1260,6 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
         default_role = self.roles.first()
         domain_id = project.domain_id
         users = self._get_all_users(domain_id)
-        proj_users = self._get_proj_users(project.id)
         groups = self._get_all_groups(domain_id)
         roles = self.roles.list()
 
@@ -1352,19 +1283,15 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
             .MultipleTimes().AndReturn(roles)
         api.keystone.group_list(IsA(http.HttpRequest), domain=domain_id) \
             .AndReturn(groups)
-        api.keystone.user_list(IsA(http.HttpRequest),
-                       project=self.tenant.id).AndReturn(proj_users)
+        api.keystone.get_project_users_roles(IsA(http.HttpRequest),
+                                             project=self.tenant.id,
+                                             max_workers=1) \
+            .AndReturn(self._get_proj_users_roles(project.id, roles))
+        api.keystone.get_project_groups_roles(IsA(http.HttpRequest),
+                                              project=self.tenant.id) \
+            .AndReturn(self._get_proj_groups_roles(project.id, roles))
 
         workflow_data = {}
-        for user in proj_users:
-            api.keystone.roles_for_user(IsA(http.HttpRequest),
-                                        user.id,
-                                        self.tenant.id).AndReturn(roles)
-        for group in groups:
-            api.keystone.roles_for_group(IsA(http.HttpRequest),
-                                         group=group.id,
-                                         project=self.tenant.id) \
-                .AndReturn(roles)
 
         workflow_data[USER_ROLE_PREFIX + "1"] = ['1', '3']  # admin role
         workflow_data[USER_ROLE_PREFIX + "2"] = ['1', '2', '3']  # member role
@@ -1389,21 +1316,13 @@ class UpdateProjectWorkflowTests(test.BaseAdminViewTests):
                                    **updated_project) \
             .AndReturn(project)
 
-        api.keystone.user_list(IsA(http.HttpRequest),
-                               project=self.tenant.id).AndReturn(proj_users)
-
-        # admin user - try to remove all roles on current project, warning
-        api.keystone.roles_for_user(IsA(http.HttpRequest), '1',
-                                    self.tenant.id).AndReturn(roles)
-
-        # member user 1 - has role 1, will remove it
-        api.keystone.roles_for_user(IsA(http.HttpRequest), '2',
-                                    self.tenant.id).AndReturn((roles[1],))
+        api.keystone.get_project_users_roles(IsA(http.HttpRequest),
+                                             project=self.tenant.id,
+                                             max_workers=1) \
+            .AndReturn({'1': ['1', '2'], '2': ['2'], '3': ['1']})
 
-        # member user 3 - has role 2
-        api.keystone.roles_for_user(IsA(http.HttpRequest), '3',
-                                    self.tenant.id).AndReturn((roles[0],))
-        # add role 2
+        # admin user and member user 2 - no change
+        # member user 3 - has role 1, will add role 2
         api.keystone.add_tenant_user_role(IsA(http.HttpRequest),
                                           project=self.tenant.id,
                                           user='3',
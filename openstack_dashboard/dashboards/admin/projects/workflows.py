@@ -20,10 +20,12 @@
 from django.conf import settings
 from django.core.urlresolvers import reverse
 from django.utils.translation import ugettext_lazy as _
+import six
 
 from horizon import exceptions
 from horizon import forms
 from horizon import messages
+from horizon.utils import concurrency
 from horizon import workflows
 
 from openstack_dashboard import api
@@ -40,6 +42,59 @@ PROJECT_USER_MEMBER_SLUG = "update_members"
 PROJECT_GROUP_MEMBER_SLUG = "update_group_members"
 
 
+def _requested_roles(data, step, roles):
+    """Maps the ids of the users or groups chosen in a membership step to
+    the ids of the roles chosen for them.
+    """
+    requested = {}
+    for role in roles:
+        field_name = step.get_member_field_name(role.id)
+        for member in data[field_name]:
+            requested.setdefault(member, []).append(role.id)
+    return requested
+
+
+def _diff_roles(current, requested, members=None):
+    """Returns the ``(member, role)`` pairs to grant and to revoke to go from
+    the ``current`` to the ``requested`` roles.
+
+    When ``members`` is given, only the roles of those members are changed.
+    """
+    to_grant = []
+    to_revoke = []
+    for member in sorted(set(current) | set(requested)):
+        if members is not None and member not in members:
+            continue
+        current_roles = set(current.get(member, ()))
+        requested_roles = set(requested.get(member, ()))
+        to_grant.extend((member, role)
+                        for role in sorted(requested_roles - current_roles))
+        to_revoke.extend((member, role)
+                         for role in sorted(current_roles - requested_roles))
+    return to_grant, to_revoke
+
+
+def _apply_role_changes(request, changes):
+    """Makes role changes concurrently.
+
+    ``changes`` is a list of ``(member, function, kwargs)`` tuples, each
+    function being called with the request and its keyword arguments.
+    Returns the members for which a change failed and the ``exc_info`` of
+    the first failure, or ``None`` if every change was made.
+    """
+    tasks = [concurrency.Task(func, args=(request,), kwargs=kwargs)
+             for member, func, kwargs in changes]
+    concurrency.run_concurrently(
+        tasks, max_workers=api.bulk.max_concurrency('identity'))
+    failed = set()
+    exc_info = None
+    for (member, func, kwargs), task in zip(changes, tasks):
+        if task.exc_info:
+            failed.add(member)
+            exc_info = exc_info or task.exc_info
+    return failed, exc_info
+
+
 class UpdateProjectQuotaAction(workflows.Action):
     ifcb_label = _("Injected File Content Bytes")
     metadata_items = forms.IntegerField(min_value=-1,
@@ -177,6 +232,7 @@ class UpdateProjectMembersAction(workflows.MembershipAction):
         except Exception:
             exceptions.handle(request, err_msg)
         users_list = [(user.id, user.name) for user in all_users]
+        self.available_members = set(user.id for user in all_users)
 
         # Get list of roles
         role_list = []
@@ -197,23 +253,17 @@ class UpdateProjectMembersAction(workflows.MembershipAction):
         # Figure out users & roles
         if project_id:
             try:
-                project_members = api.keystone.user_list(request,
-                    project=project_id)
+                users_roles = api.keystone.get_project_users_roles(
+                    request, project=project_id,
+                    max_workers=api.bulk.max_concurrency('identity'))
             except Exception:
-                exceptions.handle(request, err_msg)
-
-            for user in project_members:
-                try:
-                    roles = api.keystone.roles_for_user(self.request,
-                                                        user.id,
-                                                        project_id)
-                except Exception:
-                    exceptions.handle(request,
-                                      err_msg,
-                                      redirect=reverse(INDEX_URL))
-                for role in roles:
-                    field_name = self.get_member_field_name(role.id)
-                    self.fields[field_name].initial.append(user.id)
+                exceptions.handle(request,
+                                  err_msg,
+                                  redirect=reverse(INDEX_URL))
+            for user_id, role_ids in users_roles.items():
+                for role_id in role_ids:
+                    field_name = self.get_member_field_name(role_id)
+                    self.fields[field_name].initial.append(user_id)
 
     class Meta:
         name = _("Project Members")
@@ -280,6 +330,7 @@ class UpdateProjectGroupsAction(workflows.MembershipAction):
         except Exception:
             exceptions.handle(request, err_msg)
         groups_list = [(group.id, group.name) for group in all_groups]
+        self.available_members = set(group.id for group in all_groups)
 
         # Get list of roles
         role_list = []
@@ -299,18 +350,17 @@ class UpdateProjectGroupsAction(workflows.MembershipAction):
 
         # Figure out groups & roles
         if project_id:
-            for group in all_groups:
-                try:
-                    roles = api.keystone.roles_for_group(self.request,
-                                                         group=group.id,
-                                                         project=project_id)
-                except Exception:
-                    exceptions.handle(request,
-                                      err_msg,
-                                      redirect=reverse(INDEX_URL))
-                for role in roles:
-                    field_name = self.get_member_field_name(role.id)
-                    self.fields[field_name].initial.append(group.id)
+            try:
+                groups_roles = api.keystone.get_project_groups_roles(
+                    request, project=project_id)
+            except Exception:
+                exceptions.handle(request,
+                                  err_msg,
+                                  redirect=reverse(INDEX_URL))
+            for group_id, role_ids in groups_roles.items():
+                for role_id in role_ids:
+                    field_name = self.get_member_field_name(role_id)
+                    self.fields[field_name].initial.append(group_id)
 
     class Meta:
         name = _("Project Groups")
@@ -387,23 +437,17 @@ class CreateProject(workflows.Workflow):
         try:
             available_roles = api.keystone.role_list(request)
             member_step = self.get_step(PROJECT_USER_MEMBER_SLUG)
-            # count how many users are to be added
-            for role in available_roles:
-                field_name = member_step.get_member_field_name(role.id)
-                role_list = data[field_name]
-                users_to_add += len(role_list)
+            requested = _requested_roles(data, member_step, available_roles)
+            users_to_add = len(requested)
             # add new users to project
-            for role in available_roles:
-                field_name = member_step.get_member_field_name(role.id)
-                role_list = data[field_name]
-                users_added = 0
-                for user in role_list:
-                    api.keystone.add_tenant_user_role(request,
-                                                      project=project_id,
-                                                      user=user,
-                                                      role=role.id)
-                    users_added += 1
-                users_to_add -= users_added
+            to_grant, to_revoke = _diff_roles({}, requested)
+            changes = [(user, api.keystone.add_tenant_user_role,
+                        {'project': project_id, 'user': user, 'role': role})
+                       for user, role in to_grant]
+            failed, exc_info = _apply_role_changes(request, changes)
+            users_to_add = len(failed)
+            if exc_info:
+                six.reraise(*exc_info)
         except Exception:
             if PROJECT_GROUP_ENABLED:
                 group_msg = _(", add project groups")
@@ -421,24 +465,19 @@ class CreateProject(workflows.Workflow):
             try:
                 available_roles = api.keystone.role_list(request)
                 member_step = self.get_step(PROJECT_GROUP_MEMBER_SLUG)
-
-                # count how many groups are to be added
-                for role in available_roles:
-                    field_name = member_step.get_member_field_name(role.id)
-                    role_list = data[field_name]
-                    groups_to_add += len(role_list)
+                requested = _requested_roles(data, member_step,
+                                             available_roles)
+                groups_to_add = len(requested)
                 # add new groups to project
-                for role in available_roles:
-                    field_name = member_step.get_member_field_name(role.id)
-                    role_list = data[field_name]
-                    groups_added = 0
-                    for group in role_list:
-                        api.keystone.add_group_role(request,
-                                                    role=role.id,
-                                                    group=group,
-                                                    project=project_id)
-                        groups_added += 1
-                    groups_to_add -= groups_added
+                to_grant, to_revoke = _diff_roles({}, requested)
+                changes = [(group, api.keystone.add_group_role,
+                            {'role': role, 'group': group,
+                             'project': project_id})
+                           for group, role in to_grant]
+                failed, exc_info = _apply_role_changes(request, changes)
+                groups_to_add = len(failed)
+                if exc_info:
+                    six.reraise(*exc_info)
             except Exception:
                 exceptions.handle(request, _('Failed to add %s project groups '
                                              'and update project quotas.'
@@ -520,22 +559,15 @@ class UpdateProject(workflows.Workflow):
         return message % self.context.get('name', 'unknown project')
 
     def handle(self, request, data):
-        # FIXME(gabriel): This should be refactored to use Python's built-in
-        # sets and do this all in a single "roles to add" and "roles to remove"
-        # pass instead of the multi-pass thing happening now.
-
         project_id = data['project_id']
-        domain_id = ''
         # update project info
         try:
-            project = api.keystone.tenant_update(
+            api.keystone.tenant_update(
                 request,
                 project_id,
                 name=data['name'],
                 description=data['description'],
                 enabled=data['enabled'])
-            # Use the domain_id from the project if available
-            domain_id = getattr(project, "domain_id", None)
         except Exception:
             exceptions.handle(request, ignore=True)
             return False
@@ -547,49 +579,24 @@ class UpdateProject(workflows.Workflow):
         try:
             # Get our role options
             available_roles = api.keystone.role_list(request)
-            # Get the users currently associated with this project so we
-            # can diff against it.
-            project_members = api.keystone.user_list(request,
-                                                     project=project_id)
-            users_to_modify = len(project_members)
-
-            for user in project_members:
-                # Check if there have been any changes in the roles of
-                # Existing project members.
-                current_roles = api.keystone.roles_for_user(self.request,
-                                                            user.id,
-                                                            project_id)
-                current_role_ids = [role.id for role in current_roles]
-
-                for role in available_roles:
-                    field_name = member_step.get_member_field_name(role.id)
-                    # Check if the user is in the list of users with this role.
-                    if user.id in data[field_name]:
-                        # Add it if necessary
-                        if role.id not in current_role_ids:
-                            # user role has changed
-                            api.keystone.add_tenant_user_role(
-                                request,
-                                project=project_id,
-                                user=user.id,
-                                role=role.id)
-                        else:
-                            # User role is unchanged, so remove it from the
-                            # remaining roles list to avoid removing it later.
-                            index = current_role_ids.index(role.id)
-                            current_role_ids.pop(index)
-
-                # Prevent admins from doing stupid things to themselves.
-                is_current_user = user.id == request.user.id
-                is_current_project = project_id == request.user.tenant_id
-                admin_roles = [role for role in current_roles
+            # Get the roles currently granted on this project so we can diff
+            # against them, and only make the changes.
+            current = api.keystone.get_project_users_roles(
+                request, project=project_id,
+                max_workers=api.bulk.max_concurrency('identity'))
+            requested = _requested_roles(data, member_step, available_roles)
+            # Users missing from the step can't have been changed in it.
+            to_grant, to_revoke = _diff_roles(
+                current, requested, member_step.action.available_members)
+
+            # Prevent admins from doing stupid things to themselves.
+            if project_id == request.user.tenant_id:
+                admin_roles = [role.id for role in available_roles
                                if role.name.lower() == 'admin']
-                if len(admin_roles):
-                    removing_admin = any([role.id in current_role_ids
-                                          for role in admin_roles])
-                else:
-                    removing_admin = False
-                if is_current_user and is_current_project and removing_admin:
+                removing_admin = any(user == request.user.id and
+                                     role in admin_roles
+                                     for user, role in to_revoke)
+                if removing_admin:
                     # Cannot remove "admin" role on current(admin) project
                     msg = _('You cannot revoke your administrative privileges '
                             'from the project you are currently logged into. '
@@ -597,33 +604,22 @@ class UpdateProject(workflows.Workflow):
                             'administrative privileges or remove the '
                             'administrative role manually via the CLI.')
                     messages.warning(request, msg)
-
-                # Otherwise go through and revoke any removed roles.
-                else:
-                    for id_to_delete in current_role_ids:
-                        api.keystone.remove_tenant_user_role(
-                            request,
-                            project=project_id,
-                            user=user.id,
-                            role=id_to_delete)
-                users_to_modify -= 1
-
-            # Grant new roles on the project.
-            for role in available_roles:
-                field_name = member_step.get_member_field_name(role.id)
-                # Count how many users may be added for exception handling.
-                users_to_modify += len(data[field_name])
-            for role in available_roles:
-                users_added = 0
-                field_name = member_step.get_member_field_name(role.id)
-                for user_id in data[field_name]:
-                    if not filter(lambda x: user_id == x.id, project_members):
-                        api.keystone.add_tenant_user_role(request,
-                                                          project=project_id,
-                                                          user=user_id,
-                                                          role=role.id)
-                    users_added += 1
-                users_to_modify -= users_added
+                    to_revoke = [(user, role) for user, role in to_revoke
+                                 if user != request.user.id]
+
+            changes = [(user, api.keystone.add_tenant_user_role,
+                        {'project': project_id, 'user': user, 'role': role})
+                       for user, role in to_grant]
+            changes.extend((user, api.keystone.remove_tenant_user_role,
+                            {'project': project_id, 'user': user,
+                             'role': role})
+                           for user, role in to_revoke)
+            users_to_modify = len(set(user for user, func, kwargs
+                                      in changes))
+            failed, exc_info = _apply_role_changes(request, changes)
+            users_to_modify = len(failed)
+            if exc_info:
+                six.reraise(*exc_info)
         except Exception:
             if PROJECT_GROUP_ENABLED:
                 group_msg = _(", update project groups")
@@ -641,65 +637,26 @@ class UpdateProject(workflows.Workflow):
             groups_to_modify = 0
             member_step = self.get_step(PROJECT_GROUP_MEMBER_SLUG)
             try:
-                # Get the groups currently associated with this project so we
-                # can diff against it.
-                project_groups = api.keystone.group_list(request,
-                                                         domain=domain_id,
-                                                         project=project_id)
-                groups_to_modify = len(project_groups)
-                for group in project_groups:
-                    # Check if there have been any changes in the roles of
-                    # Existing project members.
-                    current_roles = api.keystone.roles_for_group(
-                        self.request,
-                        group=group.id,
-                        project=project_id)
-                    current_role_ids = [role.id for role in current_roles]
-                    for role in available_roles:
-                        # Check if the group is in the list of groups with
-                        # this role.
-                        field_name = member_step.get_member_field_name(role.id)
-                        if group.id in data[field_name]:
-                            # Add it if necessary
-                            if role.id not in current_role_ids:
-                                # group role has changed
-                                api.keystone.add_group_role(
-                                    request,
-                                    role=role.id,
-                                    group=group.id,
-                                    project=project_id)
-                            else:
-                                # Group role is unchanged, so remove it from
-                                # the remaining roles list to avoid removing it
-                                # later.
-                                index = current_role_ids.index(role.id)
-                                current_role_ids.pop(index)
-
-                    # Revoke any removed roles.
-                    for id_to_delete in current_role_ids:
-                        api.keystone.remove_group_role(request,
-                                                       role=id_to_delete,
-                                                       group=group.id,
-                                                       project=project_id)
-                    groups_to_modify -= 1
-
-                # Grant new roles on the project.
-                for role in available_roles:
-                    field_name = member_step.get_member_field_name(role.id)
-                    # Count how many groups may be added for error handling.
-                    groups_to_modify += len(data[field_name])
-                for role in available_roles:
-                    groups_added = 0
-                    field_name = member_step.get_member_field_name(role.id)
-                    for group_id in data[field_name]:
-                        if not filter(lambda x: group_id == x.id,
-                                      project_groups):
-                            api.keystone.add_group_role(request,
-                                                        role=role.id,
-                                                        group=group_id,
-                                                        project=project_id)
-                        groups_added += 1
-                    groups_to_modify -= groups_added
+                current = api.keystone.get_project_groups_roles(
+                    request, project=project_id)
+                requested = _requested_roles(data, member_step,
+                                             available_roles)
+                to_grant, to_revoke = _diff_roles(
+                    current, requested, member_step.action.available_members)
+                changes = [(group, api.keystone.add_group_role,
+                            {'role': role, 'group': group,
+                             'project': project_id})
+                           for group, role in to_grant]
+                changes.extend((group, api.keystone.remove_group_role,
+                                {'role': role, 'group': group,
+                                 'project': project_id})
+                               for group, role in to_revoke)
+                groups_to_modify = len(set(group for group, func, kwargs
+                                           in changes))
+                failed, exc_info = _apply_role_changes(request, changes)
+                groups_to_modify = len(failed)
+                if exc_info:
+                    six.reraise(*exc_info)
             except Exception:
                 exceptions.handle(request, _('Failed to modify %s project '
                                              'members, update project groups '
@@ -20,6 +20,7 @@ from socket import timeout as socket_timeout  # noqa
 
 from django.core.urlresolvers import reverse
 from django import http
+from django.test.utils import override_settings  # noqa
 
 from mox import IgnoreArg  # noqa
 from mox import IsA  # noqa
@@ -49,13 +50,15 @@ class UsersViewTests(test.BaseAdminViewTests):
                      if user.domain_id == domain_id]
         return users
 
-    @test.create_stubs({api.keystone: ('user_list',)})
+    @test.create_stubs({api.keystone: ('user_list_paged',)})
     def test_index(self):
         domain = self._get_default_domain()
         domain_id = domain.id
         users = self._get_users(domain_id)
-        api.keystone.user_list(IgnoreArg(),
-                               domain=domain_id).AndReturn(users)
+        api.keystone.user_list_paged(IgnoreArg(),
+                                     domain=domain_id,
+                                     marker=None,
+                                     filters={}).AndReturn([users, False])
 
         self.mox.ReplayAll()
         res = self.client.get(USERS_INDEX_URL)
@@ -72,6 +75,28 @@ class UsersViewTests(test.BaseAdminViewTests):
                               domain_context_name=domain.name)
         self.test_index()
 
+    @override_settings(API_RESULT_PAGE_SIZE=1)
+    @test.create_stubs({api.keystone: ('user_list',)})
+    def test_index_filter_past_first_page(self):
+        users = self.users.list()
+        last = users[-1]
+        api.keystone.user_list(IgnoreArg(), domain=None, filters={}) \
+            .AndReturn(users)
+        # Keystone filters on the name, so the search covers every user.
+        api.keystone.user_list(IgnoreArg(), domain=None,
+                               filters={'name': last.name}) \
+            .AndReturn([last])
+        self.mox.ReplayAll()
+
+        res = self.client.get(USERS_INDEX_URL)
+        self.assertEqual(res.context['table'].data, users[:1])
+
+        res = self.client.post(USERS_INDEX_URL,
+                               {'users__filter__q': last.name,
+                                'users__filter__q_field': 'name'})
+        self.assertEqual(res.context['table'].data, [last])
+        self.assertFalse(res.context['table'].has_more_data())
+
     @test.create_stubs({api.keystone: ('user_create',
                                        'get_default_domain',
                                        'tenant_list',
@@ -452,7 +477,8 @@ class UsersViewTests(test.BaseAdminViewTests):
             res, "form", 'password',
             ['Password must be between 8 and 18 characters.'])
 
-    @test.create_stubs({api.keystone: ('user_update_enabled', 'user_list')})
+    @test.create_stubs({api.keystone: ('user_update_enabled',
+                                       'user_list_paged')})
     def test_enable_user(self):
         domain = self._get_default_domain()
         domain_id = domain.id
@@ -460,7 +486,10 @@ class UsersViewTests(test.BaseAdminViewTests):
         users = self._get_users(domain_id)
         user.enabled = False
 
-        api.keystone.user_list(IgnoreArg(), domain=domain_id).AndReturn(users)
+        api.keystone.user_list_paged(IgnoreArg(),
+                                     domain=domain_id,
+                                     marker=None,
+                                     filters={}).AndReturn([users, False])
         api.keystone.user_update_enabled(IgnoreArg(),
                                          user.id,
                                          True).AndReturn(user)
@@ -472,7 +501,8 @@ class UsersViewTests(test.BaseAdminViewTests):
 
         self.assertRedirectsNoFollow(res, USERS_INDEX_URL)
 
-    @test.create_stubs({api.keystone: ('user_update_enabled', 'user_list')})
+    @test.create_stubs({api.keystone: ('user_update_enabled',
+                                       'user_list_paged')})
     def test_disable_user(self):
         domain = self._get_default_domain()
         domain_id = domain.id
@@ -481,8 +511,11 @@ class UsersViewTests(test.BaseAdminViewTests):
 
         self.assertTrue(user.enabled)
 
-        api.keystone.user_list(IgnoreArg(), domain=domain_id) \
-            .AndReturn(users)
+        api.keystone.user_list_paged(IgnoreArg(),
+                                     domain=domain_id,
+                                     marker=None,
+                                     filters={}) \
+            .AndReturn([users, False])
         api.keystone.user_update_enabled(IgnoreArg(),
                                          user.id,
                                          False).AndReturn(user)
@@ -494,7 +527,8 @@ class UsersViewTests(test.BaseAdminViewTests):
 
         self.assertRedirectsNoFollow(res, USERS_INDEX_URL)
 
-    @test.create_stubs({api.keystone: ('user_update_enabled', 'user_list')})
+    @test.create_stubs({api.keystone: ('user_update_enabled',
+                                       'user_list_paged')})
     def test_enable_disable_user_exception(self):
         domain = self._get_default_domain()
         domain_id = domain.id
@@ -502,8 +536,11 @@ class UsersViewTests(test.BaseAdminViewTests):
         users = self._get_users(domain_id)
         user.enabled = False
 
-        api.keystone.user_list(IgnoreArg(), domain=domain_id) \
-            .AndReturn(users)
+        api.keystone.user_list_paged(IgnoreArg(),
+                                     domain=domain_id,
+                                     marker=None,
+                                     filters={}) \
+            .AndReturn([users, False])
         api.keystone.user_update_enabled(IgnoreArg(), user.id, True) \
                     .AndRaise(self.exceptions.keystone)
         self.mox.ReplayAll()
@@ -513,14 +550,17 @@ class UsersViewTests(test.BaseAdminViewTests):
 
         self.assertRedirectsNoFollow(res, USERS_INDEX_URL)
 
-    @test.create_stubs({api.keystone: ('user_list',)})
+    @test.create_stubs({api.keystone: ('user_list_paged',)})
     def test_disabling_current_user(self):
         domain = self._get_default_domain()
         domain_id = domain.id
         users = self._get_users(domain_id)
         for i in range(0, 2):
-            api.keystone.user_list(IgnoreArg(), domain=domain_id) \
-                .AndReturn(users)
+            api.keystone.user_list_paged(IgnoreArg(),
+                                         domain=domain_id,
+                                         marker=None,
+                                         filters={}) \
+                .AndReturn([users, False])
 
         self.mox.ReplayAll()
 
@@ -531,14 +571,17 @@ class UsersViewTests(test.BaseAdminViewTests):
                          u'You cannot disable the user you are currently '
                          u'logged in as.')
 
-    @test.create_stubs({api.keystone: ('user_list',)})
+    @test.create_stubs({api.keystone: ('user_list_paged',)})
     def test_delete_user_with_improper_permissions(self):
         domain = self._get_default_domain()
         domain_id = domain.id
         users = self._get_users(domain_id)
         for i in range(0, 2):
-            api.keystone.user_list(IgnoreArg(), domain=domain_id) \
-                .AndReturn(users)
+            api.keystone.user_list_paged(IgnoreArg(),
+                                         domain=domain_id,
+                                         marker=None,
+                                         filters={}) \
+                .AndReturn([users, False])
 
         self.mox.ReplayAll()
 
@@ -559,7 +602,7 @@ class SeleniumTests(test.SeleniumAdminTestCase):
                                        'tenant_list',
                                        'get_default_role',
                                        'role_list',
-                                       'user_list')})
+                                       'user_list_paged')})
     def test_modal_create_user_with_passwords_not_matching(self):
         domain = self._get_default_domain()
 
@@ -568,8 +611,11 @@ class SeleniumTests(test.SeleniumAdminTestCase):
         api.keystone.tenant_list(IgnoreArg(), domain=None, user=None) \
             .AndReturn([self.tenants.list(), False])
         api.keystone.role_list(IgnoreArg()).AndReturn(self.roles.list())
-        api.keystone.user_list(IgnoreArg(), domain=None) \
-            .AndReturn(self.users.list())
+        api.keystone.user_list_paged(IgnoreArg(),
+                                     domain=None,
+                                     marker=None,
+                                     filters={}) \
+            .AndReturn([self.users.list(), False])
         api.keystone.get_default_role(IgnoreArg()) \
                     .AndReturn(self.roles.first())
         self.mox.ReplayAll()
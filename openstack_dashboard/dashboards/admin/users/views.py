@@ -41,13 +41,23 @@ class IndexView(tables.DataTableView):
     table_class = project_tables.UsersTable
     template_name = 'admin/users/index.html'
 
+    def has_more_data(self, table):
+        return self._more
+
     def get_data(self):
         users = []
+        marker = self.request.GET.get(
+            project_tables.UsersTable._meta.pagination_param, None)
         domain_context = self.request.session.get('domain_context', None)
+        filters = self.get_filters()
         try:
-            users = api.keystone.user_list(self.request,
-                                           domain=domain_context)
+            users, self._more = api.keystone.user_list_paged(
+                self.request,
+                domain=domain_context,
+                marker=marker,
+                filters=filters)
         except Exception:
+            self._more = False
             exceptions.handle(self.request,
                               _('Unable to retrieve user list.'))
         return users
@@ -175,31 +175,25 @@ class FloatingIpNeutronViewTests(FloatingIpViewTests):
         self.floating_ips = self._floating_ips_orig
         super(FloatingIpViewTests, self).tearDown()
 
-    @test.create_stubs({api.nova: ('tenant_quota_get', 'flavor_list',
-                                   'server_list'),
-                        api.cinder: ('tenant_quota_get', 'volume_list',
-                                     'volume_snapshot_list',),
+    @test.create_stubs({api.nova: ('tenant_quota_get',
+                                   'tenant_absolute_limits'),
+                        api.cinder: ('tenant_quota_get',
+                                     'tenant_absolute_limits'),
                         api.network: ('floating_ip_pools_list',
                                       'tenant_floating_ip_list'),
                         api.neutron: ('is_extension_supported',
                                       'tenant_quota_get')})
     @override_settings(OPENSTACK_NEUTRON_NETWORK={'enable_quotas': True})
     def test_correct_quotas_displayed(self):
-        servers = [s for s in self.servers.list()
-                   if s.tenant_id == self.request.user.tenant_id]
-
         api.nova.tenant_quota_get(IsA(http.HttpRequest), '1') \
             .AndReturn(self.quotas.first())
-        api.nova.flavor_list(IsA(http.HttpRequest)) \
-            .AndReturn(self.flavors.list())
-        api.nova.server_list(IsA(http.HttpRequest)) \
-            .AndReturn([servers, False])
-        api.cinder.volume_list(IsA(http.HttpRequest)) \
-            .AndReturn(self.volumes.list())
-        api.cinder.volume_snapshot_list(IsA(http.HttpRequest)) \
-            .AndReturn(self.snapshots.list())
+        api.nova.tenant_absolute_limits(IsA(http.HttpRequest)) \
+            .AndReturn(self.limits['absolute'])
         api.cinder.tenant_quota_get(IsA(http.HttpRequest), '1') \
             .AndReturn(self.cinder_quotas.first())
+        api.cinder.tenant_absolute_limits(IsA(http.HttpRequest)) \
+            .AndReturn(dict(self.cinder_limits['absolute'],
+                            totalSnapshotsUsed=0))
         api.neutron.is_extension_supported(
             IsA(http.HttpRequest), 'security-group').AndReturn(True)
         api.neutron.is_extension_supported(IsA(http.HttpRequest), 'quotas') \
@@ -367,16 +367,25 @@ class DownloadObject(tables.LinkAction):
 
 
 class ObjectFilterAction(tables.FilterAction):
+    filter_type = "server"
+    # Swift lists objects by prefix itself, see ContainerView.objects.
+    filter_choices = (('prefix', _("Name starts with"), True),
+                      ('name', _("Name contains")))
+
     def _filtered_data(self, table, filter_string):
-        request = table.request
-        container = self.table.kwargs['container_name']
-        subfolder = self.table.kwargs['subfolder_path']
+        # The subfolders and objects are filtered from the same listing. The
+        # actions are shared by every table of the class, so the listing is
+        # kept on the table, which only lives for the current request.
+        container = table.kwargs['container_name']
+        subfolder = table.kwargs['subfolder_path']
         prefix = wrap_delimiter(subfolder) if subfolder else ''
-        self.filtered_data = api.swift.swift_filter_objects(request,
-                                                            filter_string,
-                                                            container,
-                                                            prefix=prefix)
-        return self.filtered_data
+        key = (filter_string, container, prefix)
+        cached = getattr(table, '_object_filter_data', None)
+        if cached is None or cached[0] != key:
+            data = api.swift.swift_filter_objects(
+                table.request, filter_string, container, prefix=prefix)
+            cached = table._object_filter_data = (key, data)
+        return cached[1]
 
     def filter_subfolders_data(self, table, objects, filter_string):
         data = self._filtered_data(table, filter_string)
@@ -175,6 +175,66 @@ class SwiftTests(test.TestCase):
                                             CONTAINER_NAME_1_QUOTED)
         self.assertContains(res, form_action, count=2)
 
+    @test.create_stubs({api.swift: ('swift_get_containers',
+                                    'swift_get_objects')})
+    def test_index_container_api_filter(self):
+        containers = (self.containers.list(), False)
+        ret = (self.objects.list()[:1], False)
+        api.swift.swift_get_containers(IsA(http.HttpRequest),
+                                       marker=None).AndReturn(containers)
+        # Swift lists the objects starting with the filter term.
+        api.swift.swift_get_objects(IsA(http.HttpRequest),
+                                    self.containers.first().name,
+                                    marker=None,
+                                    prefix='test').AndReturn(ret)
+        self.mox.ReplayAll()
+
+        res = self.client.post(
+            reverse('horizon:project:containers:index',
+                    args=[tables.wrap_delimiter(
+                        self.containers.first().name)]),
+            {'objects__filter__q': 'test',
+             'objects__filter__q_field': 'prefix'})
+        self.assertTemplateUsed(res, 'project/containers/index.html')
+        self.assertEqual(len(res.context['objects_table'].filtered_data), 1)
+
+    @test.create_stubs({api.swift: ('swift_get_containers',
+                                    'swift_get_objects',
+                                    'swift_filter_objects')})
+    def test_index_container_name_filter(self):
+        containers = (self.containers.list(), False)
+        objects = self.objects.list()
+        url = reverse('horizon:project:containers:index',
+                      args=[tables.wrap_delimiter(
+                          self.containers.first().name)])
+        api.swift.swift_get_containers(IsA(http.HttpRequest),
+                                       marker=None) \
+            .MultipleTimes().AndReturn(containers)
+        api.swift.swift_get_objects(IsA(http.HttpRequest),
+                                    self.containers.first().name,
+                                    marker=None,
+                                    prefix=None) \
+            .MultipleTimes().AndReturn((objects, False))
+        # Each filter lists the objects again, nothing is kept from the
+        # previous request.
+        api.swift.swift_filter_objects(IsA(http.HttpRequest), 'one',
+                                       self.containers.first().name,
+                                       prefix='').AndReturn(objects[:1])
+        api.swift.swift_filter_objects(IsA(http.HttpRequest), 'two',
+                                       self.containers.first().name,
+                                       prefix='').AndReturn(objects[1:])
+        self.mox.ReplayAll()
+
+        for filter_string, expected in (('one', objects[:1]),
+                                        ('two', objects[1:])):
+            res = self.client.post(url,
+                                   {'objects__filter__q': filter_string,
+                                    'objects__filter__q_field': 'name'})
+            self.assertEqual(
+                [obj.name for obj
+                 in res.context['objects_table'].filtered_data],
+                [obj.name for obj in expected])
+
     @test.create_stubs({api.swift: ('swift_upload_object',)})
     def test_upload(self):
         container = self.containers.first()
@@ -308,21 +368,32 @@ class SwiftTests(test.TestCase):
         handled = table.maybe_handle()
         self.assertEqual(handled['location'], index_url)
 
+    def _streamed_object(self, obj, content_range=None):
+        return api.swift.StorageObject(
+            dict(obj._apidict, bytes=len(obj.data), etag=obj.hash,
+                 content_range=content_range),
+            obj.container_name, data=iter([obj.data]))
+
     @test.create_stubs({api.swift: ('swift_get_object',)})
     def test_download(self):
         for container in self.containers.list():
             for obj in self.objects.list():
                 self.mox.ResetAll()  # mandatory in a for loop
-                api.swift.swift_get_object(IsA(http.HttpRequest),
-                                           container.name,
-                                           obj.name).AndReturn(obj)
+                api.swift.swift_get_object(
+                    IsA(http.HttpRequest),
+                    container.name,
+                    obj.name,
+                    resp_chunk_size=api.swift.CHUNK_SIZE,
+                    byte_range=None).AndReturn(self._streamed_object(obj))
                 self.mox.ReplayAll()
 
                 download_url = reverse(
                     'horizon:project:containers:object_download',
                     args=[container.name, obj.name])
                 res = self.client.get(download_url)
-                self.assertEqual(res.content, obj.data)
+                self.assertEqual(''.join(res.streaming_content), obj.data)
+                self.assertEqual(res['Content-Length'], str(len(obj.data)))
+                self.assertEqual(res['ETag'], '"%s"' % obj.hash)
                 self.assertTrue(res.has_header('Content-Disposition'))
                 # Check that the returned Content-Disposition filename is well
                 # surrounded by double quotes and with commas removed
@@ -333,6 +404,35 @@ class SwiftTests(test.TestCase):
                     'attachment; filename=%s' % expected_name
                 )
 
+    @test.create_stubs({api.swift: ('swift_get_object',)})
+    def test_download_range(self):
+        container = self.containers.first()
+        obj = self.objects.first()
+        part = self._streamed_object(obj, content_range='bytes 0-3/9')
+        api.swift.swift_get_object(IsA(http.HttpRequest),
+                                   container.name,
+                                   obj.name,
+                                   resp_chunk_size=api.swift.CHUNK_SIZE,
+                                   byte_range='bytes=0-3').AndReturn(part)
+        # Several ranges would need a multipart body, the whole object is
+        # sent instead.
+        api.swift.swift_get_object(IsA(http.HttpRequest),
+                                   container.name,
+                                   obj.name,
+                                   resp_chunk_size=api.swift.CHUNK_SIZE,
+                                   byte_range=None) \
+            .AndReturn(self._streamed_object(obj))
+        self.mox.ReplayAll()
+
+        download_url = reverse('horizon:project:containers:object_download',
+                               args=[container.name, obj.name])
+        res = self.client.get(download_url, HTTP_RANGE='bytes=0-3')
+        self.assertEqual(res.status_code, 206)
+        self.assertEqual(res['Content-Range'], 'bytes 0-3/9')
+        res = self.client.get(download_url, HTTP_RANGE='bytes=0-1,4-5')
+        self.assertEqual(res.status_code, 200)
+        self.assertFalse(res.has_header('Content-Range'))
+
     @test.create_stubs({api.swift: ('swift_get_containers',)})
     def test_copy_index(self):
         ret = (self.containers.list(), False)
@@ -20,6 +20,7 @@
 Views for managing Swift containers.
 """
 
+from django import VERSION  # noqa
 from django.core.urlresolvers import reverse
 from django import http
 from django.utils.functional import cached_property  # noqa
@@ -41,6 +42,12 @@ from openstack_dashboard.dashboards.project.containers \
 from openstack_dashboard.dashboards.project.containers import tables
 
 import os
+import re
+
+
+# Swift answers requests for several ranges with a multipart body, so only
+# single ranges are passed on to it.
+SINGLE_RANGE_RE = re.compile(r'^bytes=(\d+-\d*|-\d+)$')
 
 
 def for_url(container_name):
@@ -85,6 +92,10 @@ class ContainerView(browsers.ResourceBrowserView):
             self.navigation_selection = True
             if subfolder:
                 prefix = subfolder
+            table = self.get_tables()[tables.ObjectsTable._meta.name]
+            filters = table.get_api_filters()
+            if 'prefix' in filters:
+                prefix = (prefix or '') + filters['prefix']
             try:
                 objects, self._more = api.swift.swift_get_objects(
                     self.request,
@@ -200,9 +211,16 @@ class UploadView(forms.ModalFormView):
 
 
 def object_download(request, container_name, object_path):
+    byte_range = request.META.get('HTTP_RANGE')
+    if byte_range and not SINGLE_RANGE_RE.match(byte_range):
+        byte_range = None
     try:
-        obj = api.swift.swift_get_object(request, container_name, object_path)
-    except Exception:
+        obj = api.swift.swift_get_object(request, container_name, object_path,
+                                         resp_chunk_size=swift.CHUNK_SIZE,
+                                         byte_range=byte_range)
+    except Exception as exc:
+        if byte_range and getattr(exc, 'http_status', None) == 416:
+            return http.HttpResponse(status=416)
         redirect = reverse("horizon:project:containers:index")
         exceptions.handle(request,
                           _("Unable to retrieve object."),
@@ -213,11 +231,23 @@ def object_download(request, container_name, object_path):
     if not os.path.splitext(obj.name)[1] and obj.orig_name:
         name, ext = os.path.splitext(obj.orig_name)
         filename = "%s%s" % (filename, ext)
-    response = http.HttpResponse()
+    # The object is passed on a piece at a time as it arrives from Swift.
+    # Django 1.4 has no streaming responses.
+    if VERSION >= (1, 5, 0):
+        response = http.StreamingHttpResponse(obj.data)
+    else:
+        response = http.HttpResponse(obj.data)
     safe_name = filename.replace(",", "").encode('utf-8')
     response['Content-Disposition'] = 'attachment; filename="%s"' % safe_name
     response['Content-Type'] = 'application/octet-stream'
-    response.write(obj.data)
+    response['Accept-Ranges'] = 'bytes'
+    if obj.bytes is not None:
+        response['Content-Length'] = obj.bytes
+    if obj.etag:
+        response['ETag'] = '"%s"' % obj.etag.strip('"')
+    if obj.content_range:
+        response.status_code = 206
+        response['Content-Range'] = obj.content_range
     return response
 
 
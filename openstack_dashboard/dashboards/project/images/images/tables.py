@@ -182,6 +182,9 @@ class UpdateRow(tables.Row):
 
     def get_data(self, request, image_id):
         image = api.glance.image_get(request, image_id)
+        if image.status in ("queued", "saving"):
+            image.upload_progress = api.glance.image_upload_progress(
+                request, image_id)
         return image
 
     def load_cells(self, image=None):
@@ -194,6 +197,24 @@ class UpdateRow(tables.Row):
             self.classes.append('category-' + category)
 
 
+class ImageStatusColumn(tables.Column):
+    """Shows how far along an upload of the image's data from the dashboard
+    is, while the image waits for its data.
+    """
+    def get_data(self, image):
+        data = super(ImageStatusColumn, self).get_data(image)
+        progress = getattr(image, "upload_progress", None)
+        if not progress:
+            return data
+        if progress['status'] == "failed":
+            return _("%s (upload failed)") % data
+        if progress['status'] == "uploading" and progress['total']:
+            percent = 100 * progress['bytes'] // progress['total']
+            return _("%(status)s (%(percent)d%% uploaded)") % {
+                'status': data, 'percent': percent}
+        return data
+
+
 class ImagesTable(tables.DataTable):
     STATUS_CHOICES = (
         ("active", True),
@@ -209,11 +230,11 @@ class ImagesTable(tables.DataTable):
     image_type = tables.Column(get_image_type,
                                verbose_name=_("Type"),
                                filters=(filters.title,))
-    status = tables.Column("status",
-                           filters=(filters.title,),
-                           verbose_name=_("Status"),
-                           status=True,
-                           status_choices=STATUS_CHOICES)
+    status = ImageStatusColumn("status",
+                               filters=(filters.title,),
+                               verbose_name=_("Status"),
+                               status=True,
+                               status_choices=STATUS_CHOICES)
     public = tables.Column("is_public",
                            verbose_name=_("Public"),
                            empty_value=False,
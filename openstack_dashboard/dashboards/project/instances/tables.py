@@ -78,6 +78,7 @@ class TerminateInstance(tables.BatchAction):
     data_type_plural = _("Instances")
     classes = ('btn-danger', 'btn-terminate')
     policy_rules = (("compute", "compute:delete"),)
+    allowed_fields = ("OS-EXT-STS:task_state",)
 
     def get_policy_target(self, request, datum=None):
         project_id = None
@@ -101,6 +102,7 @@ class RebootInstance(tables.BatchAction):
     data_type_plural = _("Instances")
     classes = ('btn-danger', 'btn-reboot')
     policy_rules = (("compute", "compute:reboot"),)
+    allowed_fields = ("status", "OS-EXT-STS:task_state")
 
     def get_policy_target(self, request, datum=None):
         project_id = None
@@ -260,6 +262,7 @@ class EditInstance(tables.LinkAction):
     url = "horizon:project:instances:update"
     classes = ("ajax-modal", "btn-edit")
     policy_rules = (("compute", "compute:update"),)
+    allowed_fields = ("OS-EXT-STS:task_state",)
 
     def get_policy_target(self, request, datum=None):
         project_id = None
@@ -282,6 +285,7 @@ class EditInstance(tables.LinkAction):
 class EditInstanceSecurityGroups(EditInstance):
     name = "edit_secgroups"
     verbose_name = _("Edit Security Groups")
+    allowed_fields = ("status", "OS-EXT-STS:task_state", "tenant_id")
 
     def get_link_url(self, project):
         return self._get_link_url(project, 'update_security_groups')
@@ -298,6 +302,7 @@ class CreateSnapshot(tables.LinkAction):
     url = "horizon:project:images:snapshots:create"
     classes = ("ajax-modal", "btn-camera")
     policy_rules = (("compute", "compute:snapshot"),)
+    allowed_fields = ("status", "OS-EXT-STS:task_state")
 
     def get_policy_target(self, request, datum=None):
         project_id = None
@@ -316,6 +321,7 @@ class ConsoleLink(tables.LinkAction):
     url = "horizon:project:instances:detail"
     classes = ("btn-console",)
     policy_rules = (("compute", "compute_extension:consoles"),)
+    allowed_fields = ("status", "OS-EXT-STS:task_state")
 
     def get_policy_target(self, request, datum=None):
         project_id = None
@@ -339,6 +345,7 @@ class LogLink(tables.LinkAction):
     url = "horizon:project:instances:detail"
     classes = ("btn-log",)
     policy_rules = (("compute", "compute_extension:console_output"),)
+    allowed_fields = ("status", "OS-EXT-STS:task_state")
 
     def get_policy_target(self, request, datum=None):
         project_id = None
@@ -362,6 +369,7 @@ class ResizeLink(tables.LinkAction):
     url = "horizon:project:instances:resize"
     classes = ("ajax-modal", "btn-resize")
     policy_rules = (("compute", "compute:resize"),)
+    allowed_fields = ("status", "OS-EXT-STS:task_state")
 
     def get_policy_target(self, request, datum=None):
         project_id = None
@@ -388,6 +396,7 @@ class ConfirmResize(tables.Action):
     verbose_name = _("Confirm Resize/Migrate")
     classes = ("btn-confirm", "btn-action-required")
     policy_rules = (("compute", "compute:confirm_resize"),)
+    allowed_fields = ("status",)
 
     def get_policy_target(self, request, datum=None):
         project_id = None
@@ -407,6 +416,7 @@ class RevertResize(tables.Action):
     verbose_name = _("Revert Resize/Migrate")
     classes = ("btn-revert", "btn-action-required")
     policy_rules = (("compute", "compute:revert_resize"),)
+    allowed_fields = ("status",)
 
     def get_policy_target(self, request, datum=None):
         project_id = None
@@ -427,6 +437,7 @@ class RebuildInstance(tables.LinkAction):
     classes = ("btn-rebuild", "ajax-modal")
     url = "horizon:project:instances:rebuild"
     policy_rules = (("compute", "compute:rebuild"),)
+    allowed_fields = ("status", "OS-EXT-STS:task_state")
 
     def get_policy_target(self, request, datum=None):
         project_id = None
@@ -449,6 +460,7 @@ class DecryptInstancePassword(tables.LinkAction):
     verbose_name = _("Retrieve Password")
     classes = ("btn-decrypt", "ajax-modal")
     url = "horizon:project:instances:decryptpassword"
+    allowed_fields = ("status", "OS-EXT-STS:task_state", "key_name")
 
     def allowed(self, request, instance):
         enable = getattr(settings,
@@ -473,6 +485,7 @@ class AssociateIP(tables.LinkAction):
     url = "horizon:project:access_and_security:floating_ips:associate"
     classes = ("ajax-modal", "btn-associate")
     policy_rules = (("compute", "network:associate_floating_ip"),)
+    allowed_fields = ("OS-EXT-STS:task_state",)
 
     def get_policy_target(self, request, datum=None):
         project_id = None
@@ -499,6 +512,7 @@ class SimpleAssociateIP(tables.Action):
     verbose_name = _("Associate Floating IP")
     classes = ("btn-associate-simple",)
     policy_rules = (("compute", "network:associate_floating_ip"),)
+    allowed_fields = ("OS-EXT-STS:task_state",)
 
     def get_policy_target(self, request, datum=None):
         project_id = None
@@ -534,6 +548,7 @@ class SimpleDisassociateIP(tables.Action):
     verbose_name = _("Disassociate Floating IP")
     classes = ("btn-danger", "btn-disassociate",)
     policy_rules = (("compute", "network:disassociate_floating_ip"),)
+    allowed_fields = ("OS-EXT-STS:task_state",)
 
     def get_policy_target(self, request, datum=None):
         project_id = None
@@ -609,6 +624,39 @@ class UpdateRow(tables.Row):
             messages.error(request, error)
         return instance
 
+    def prepare_instances(self, request, instances):
+        """Sets the flavors of several instances from a single listing."""
+        flavors = dict((flavor.id, flavor)
+                       for flavor in api.nova.flavor_list(request))
+        for instance in instances:
+            flavor_id = instance.flavor["id"]
+            if flavor_id not in flavors:
+                flavors[flavor_id] = api.nova.flavor_get(request, flavor_id)
+            instance.full_flavor = flavors[flavor_id]
+            error = get_instance_error(instance)
+            if error:
+                messages.error(request, error)
+
+    def get_data_batch(self, request, instance_ids):
+        if len(instance_ids) < 2:
+            return super(UpdateRow, self).get_data_batch(request,
+                                                         instance_ids)
+        # A single listing of the project's instances, however many rows
+        # are pending.
+        instances, has_more = api.nova.server_list(request)
+        data = dict((instance.id, instance) for instance in instances
+                    if instance.id in instance_ids)
+        self.prepare_instances(request, data.values())
+        missing = [instance_id for instance_id in instance_ids
+                   if instance_id not in data]
+        if len(instances) < getattr(settings, 'API_RESULT_LIMIT', 1000):
+            # The listing is complete, so these instances are gone.
+            data.update((instance_id, None) for instance_id in missing)
+        else:
+            data.update(super(UpdateRow, self).get_data_batch(request,
+                                                              missing))
+        return data
+
 
 class StartInstance(tables.BatchAction):
     name = "start"
@@ -617,6 +665,7 @@ class StartInstance(tables.BatchAction):
     data_type_singular = _("Instance")
     data_type_plural = _("Instances")
     policy_rules = (("compute", "compute:start"),)
+    allowed_fields = ("status",)
 
     def get_policy_target(self, request, datum=None):
         project_id = None
@@ -639,6 +688,7 @@ class StopInstance(tables.BatchAction):
     data_type_plural = _("Instances")
     classes = ('btn-danger',)
     policy_rules = (("compute", "compute:stop"),)
+    allowed_fields = ("OS-EXT-STS:power_state", "OS-EXT-STS:task_state")
 
     def get_policy_target(self, request, datum=None):
         project_id = None
@@ -764,6 +814,10 @@ POWER_DISPLAY_CHOICES = (
 
 
 class InstancesFilterAction(tables.FilterAction):
+    filter_type = "server"
+    # Nova filters on the name and status itself, see IndexView.get_data.
+    filter_choices = (('name', _("Name"), True),
+                      ('status', _("Status"), True))
 
     def filter(self, table, instances, filter_string):
         """Naive case-insensitive search."""
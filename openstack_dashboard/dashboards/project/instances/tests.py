@@ -29,6 +29,7 @@ from django.utils.http import urlencode
 
 from mox import IgnoreArg  # noqa
 from mox import IsA  # noqa
+from novaclient import exceptions as nova_exceptions
 
 from horizon import exceptions
 from horizon.workflows import views
@@ -3078,6 +3079,83 @@ class InstanceAjaxTests(test.TestCase):
         self.assertEqual(messages[0][0], 'error')
         self.assertTrue(messages[0][1].startswith('Failed'))
 
+    @test.create_stubs({api.nova: ("server_list",
+                                   "flavor_list",
+                                   "extension_supported"),
+                        api.neutron: ("is_extension_supported",)})
+    def test_rows_update(self):
+        servers = self.servers.list()[:2]
+
+        api.nova.extension_supported('AdminActions', IsA(http.HttpRequest))\
+            .MultipleTimes().AndReturn(True)
+        api.neutron.is_extension_supported(IsA(http.HttpRequest),
+                                           'security-group')\
+            .MultipleTimes().AndReturn(True)
+        # One listing of the project's instances for all of the rows, so
+        # an instance missing from it is gone.
+        api.nova.server_list(IsA(http.HttpRequest))\
+            .AndReturn([self.servers.list(), False])
+        api.nova.flavor_list(IsA(http.HttpRequest))\
+            .AndReturn(self.flavors.list())
+
+        self.mox.ReplayAll()
+
+        params = [('action', 'rows_update'),
+                  ('table', 'instances'),
+                  ('obj_id', servers[0].id),
+                  ('obj_id', servers[1].id),
+                  ('obj_id', 'gone')]
+        res = self.client.get('?'.join((INDEX_URL, urlencode(params))),
+                              HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        rows = json.loads(res.content)
+        self.assertEqual(sorted(rows),
+                         sorted([servers[0].id, servers[1].id, 'gone']))
+        self.assertIn(servers[0].name, rows[servers[0].id])
+        self.assertIn(servers[1].name, rows[servers[1].id])
+        self.assertIsNone(rows['gone'])
+
+    @test_utils.override_settings(API_RESULT_LIMIT=2)
+    @test.create_stubs({api.nova: ("server_list",
+                                   "server_get",
+                                   "flavor_get",
+                                   "flavor_list",
+                                   "extension_supported"),
+                        api.neutron: ("is_extension_supported",)})
+    def test_rows_update_truncated_listing(self):
+        servers = self.servers.list()[:3]
+
+        api.nova.extension_supported('AdminActions', IsA(http.HttpRequest))\
+            .MultipleTimes().AndReturn(True)
+        api.neutron.is_extension_supported(IsA(http.HttpRequest),
+                                           'security-group')\
+            .MultipleTimes().AndReturn(True)
+        api.nova.server_list(IsA(http.HttpRequest))\
+            .AndReturn([servers[:2], False])
+        api.nova.flavor_list(IsA(http.HttpRequest))\
+            .AndReturn(self.flavors.list())
+        # The listing may have been cut short, so the instances missing
+        # from it are looked up on their own.
+        api.nova.server_get(IsA(http.HttpRequest), servers[2].id)\
+            .AndReturn(servers[2])
+        api.nova.flavor_get(IsA(http.HttpRequest), servers[2].flavor['id'])\
+            .AndReturn(self.flavors.first())
+        api.nova.server_get(IsA(http.HttpRequest), 'gone')\
+            .AndRaise(nova_exceptions.NotFound(404))
+
+        self.mox.ReplayAll()
+
+        params = [('action', 'rows_update'),
+                  ('table', 'instances'),
+                  ('obj_id', servers[0].id),
+                  ('obj_id', servers[2].id),
+                  ('obj_id', 'gone')]
+        res = self.client.get('?'.join((INDEX_URL, urlencode(params))),
+                              HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        rows = json.loads(res.content)
+        self.assertIn(servers[0].name, rows[servers[0].id])
+        self.assertIn(servers[2].name, rows[servers[2].id])
+        self.assertIsNone(rows['gone'])
+
 
 class ConsoleManagerTests(test.TestCase):
 
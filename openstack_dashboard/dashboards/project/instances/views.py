@@ -30,6 +30,7 @@ from horizon import exceptions
 from horizon import forms
 from horizon import tables
 from horizon import tabs
+from horizon.utils import concurrency
 from horizon.utils import memoized
 from horizon import workflows
 
@@ -57,12 +58,14 @@ class IndexView(tables.DataTableView):
     def get_data(self):
         marker = self.request.GET.get(
             project_tables.InstancesTable._meta.pagination_param, None)
+        search_opts = self.get_filters({'marker': marker, 'paginate': True})
+        if 'status' in search_opts:
+            search_opts['status'] = search_opts['status'].upper()
         # Gather our instances
         try:
             instances, self._more = api.nova.server_list(
                 self.request,
-                search_opts={'marker': marker,
-                             'paginate': True})
+                search_opts=search_opts)
         except Exception:
             self._more = False
             instances = []
@@ -70,28 +73,25 @@ class IndexView(tables.DataTableView):
                               _('Unable to retrieve instances.'))
 
         if instances:
-            try:
-                api.network.servers_update_addresses(self.request, instances)
-            except Exception:
-                exceptions.handle(
-                    self.request,
+            # Addresses, flavors and images don't depend on each other, so
+            # fetch them all at once and correlate our instances to them.
+            # TODO(gabriel): Handle image pagination.
+            results = self.fetch_concurrently(
+                addresses=concurrency.Task(
+                    api.network.servers_update_addresses,
+                    args=(self.request, instances),
                     message=_('Unable to retrieve IP addresses from Neutron.'),
-                    ignore=True)
-
-            # Gather our flavors and images and correlate our instances to them
-            try:
-                flavors = api.nova.flavor_list(self.request)
-            except Exception:
-                flavors = []
-                exceptions.handle(self.request, ignore=True)
-
-            try:
-                # TODO(gabriel): Handle pagination.
-                images, more, prev = api.glance.image_list_detailed(
-                    self.request)
-            except Exception:
-                images = []
-                exceptions.handle(self.request, ignore=True)
+                    ignore=True),
+                flavors=concurrency.Task(api.nova.flavor_list,
+                                         args=(self.request,),
+                                         default=[],
+                                         ignore=True),
+                images=concurrency.Task(api.glance.image_list_detailed,
+                                        args=(self.request,),
+                                        default=([], False, False),
+                                        ignore=True))
+            flavors = results['flavors']
+            images, more, prev = results['images']
 
             full_flavors = SortedDict([(str(flavor.id), flavor)
                                        for flavor in flavors])
@@ -10,74 +10,152 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import hashlib
 import json
 
+from django.core import cache as django_cache
+
+from horizon.utils import concurrency
+
 from openstack_dashboard.api import heat
 
 from openstack_dashboard.dashboards.project.stacks import mappings
 from openstack_dashboard.dashboards.project.stacks import sro
 
 
+# Seconds the snapshots the topology graphs were last sent are kept for.
+# Graphs polling with an expired snapshot get the whole topology again.
+SNAPSHOT_TIMEOUT = 60 * 10
+
+
 class Stack(object):
     pass
 
 
-def d3_data(request, stack_id=''):
-    try:
-        stack = heat.stack_get(request, stack_id)
-    except Exception:
+def _get_stack_and_resources(request, stack_id):
+    # The resources are listed by stack id so that both calls can be made
+    # at the same time.
+    tasks = {'stack': concurrency.Task(heat.stack_get,
+                                       args=(request, stack_id)),
+             'resources': concurrency.Task(heat.resources_list,
+                                           args=(request, stack_id),
+                                           default=[])}
+    concurrency.run_concurrently(tasks.values())
+    if tasks['stack'].exc_info:
         stack = Stack()
         stack.id = stack_id
         stack.stack_name = request.session.get('stack_name', '')
         stack.stack_status = 'DELETE_COMPLETE'
         stack.stack_status_reason = 'DELETE_COMPLETE'
+        stack.status = 'COMPLETE'
+    else:
+        stack = tasks['stack'].result
+    return stack, tasks['resources'].result
+
+
+def _stack_node(stack):
+    stack_image = mappings.get_resource_image(stack.stack_status, 'stack')
+    return {
+        'stack_id': stack.id,
+        'name': stack.stack_name,
+        'status': stack.stack_status,
+        'image': stack_image,
+        'image_size': 60,
+        'image_x': -30,
+        'image_y': -30,
+        'text_x': 40,
+        'text_y': ".35em",
+        'in_progress': (stack.status == 'IN_PROGRESS'),
+        'info_box': sro.stack_info(stack, stack_image)
+    }
+
+
+def _resource_in_progress(resource):
+    resource_status = mappings.get_resource_status(
+        resource.resource_status)
+    return resource_status in ('IN_PROGRESS', 'INIT')
+
+
+def _resource_node(resource):
+    resource_image = mappings.get_resource_image(
+        resource.resource_status,
+        resource.resource_type)
+    # The info box is only rendered when the graph asks for it, see
+    # resource_info_box().
+    return {
+        'name': resource.resource_name,
+        'status': resource.resource_status,
+        'image': resource_image,
+        'required_by': resource.required_by,
+        'image_size': 50,
+        'image_x': -25,
+        'image_y': -25,
+        'text_x': 35,
+        'text_y': ".35em",
+        'in_progress': _resource_in_progress(resource),
+    }
+
 
-    try:
-        resources = heat.resources_list(request, stack.stack_name)
-    except Exception:
-        resources = []
-
-    d3_data = {"nodes": [], "stack": {}}
-    if stack:
-        stack_image = mappings.get_resource_image(stack.stack_status, 'stack')
-        stack_node = {
-            'stack_id': stack.id,
-            'name': stack.stack_name,
-            'status': stack.stack_status,
-            'image': stack_image,
-            'image_size': 60,
-            'image_x': -30,
-            'image_y': -30,
-            'text_x': 40,
-            'text_y': ".35em",
-            'in_progress': (stack.status == 'IN_PROGRESS'),
-            'info_box': sro.stack_info(stack, stack_image)
-        }
-        d3_data['stack'] = stack_node
-
-    if resources:
-        for resource in resources:
-            resource_image = mappings.get_resource_image(
-                resource.resource_status,
-                resource.resource_type)
-            resource_status = mappings.get_resource_status(
-                resource.resource_status)
-            if resource_status in ('IN_PROGRESS', 'INIT'):
-                in_progress = True
-            else:
-                in_progress = False
-            resource_node = {
-                'name': resource.resource_name,
-                'status': resource.resource_status,
-                'image': resource_image,
-                'required_by': resource.required_by,
-                'image_size': 50,
-                'image_x': -25,
-                'image_y': -25,
-                'text_x': 35,
-                'text_y': ".35em",
-                'in_progress': in_progress,
-                'info_box': sro.resource_info(resource)
-            }
-            d3_data['nodes'].append(resource_node)
+def _fingerprint(status, updated_time):
+    return [status, updated_time]
+
+
+def _snapshot_key(request, stack_id, version):
+    return 'horizon:stacks:topology:%s:%s:%s' % (request.user.tenant_id,
+                                                 stack_id, version)
+
+
+def _save_snapshot(request, stack_id, snapshot):
+    version = hashlib.md5(json.dumps(snapshot, sort_keys=True)).hexdigest()
+    django_cache.cache.set(_snapshot_key(request, stack_id, version),
+                           snapshot, SNAPSHOT_TIMEOUT)
+    return version
+
+
+def d3_data(request, stack_id='', since=None):
+    """Returns the topology graph of a stack, as JSON.
+
+    The result has a ``version`` identifying the statuses it describes.
+    When ``since`` is the version the graph already has, and it is still
+    known, only the nodes whose status or status time changed since then
+    are returned in ``nodes``, the names of the resources which are gone in
+    ``removed`` and ``stack`` is left empty unless the stack changed;
+    ``full`` tells which kind of result it is. ``in_progress`` is true while
+    the stack or any of its resources is in progress.
+    """
+    stack, resources = _get_stack_and_resources(request, stack_id)
+
+    snapshot = {'stack': _fingerprint(stack.stack_status,
+                                      getattr(stack, 'updated_time', None)),
+                'resources': dict(
+                    (resource.resource_name,
+                     _fingerprint(resource.resource_status,
+                                  getattr(resource, 'updated_time', None)))
+                    for resource in resources)}
+    previous = None
+    if since:
+        previous = django_cache.cache.get(_snapshot_key(request, stack_id,
+                                                        since))
+    version = _save_snapshot(request, stack_id, snapshot)
+
+    in_progress = (getattr(stack, 'status', None) == 'IN_PROGRESS' or
+                   any(_resource_in_progress(resource)
+                       for resource in resources))
+    d3_data = {"nodes": [], "stack": {}, "removed": [],
+               "version": version, "full": previous is None,
+               "in_progress": in_progress}
+    if previous is None or previous['stack'] != snapshot['stack']:
+        d3_data['stack'] = _stack_node(stack)
+    known = previous['resources'] if previous is not None else {}
+    for resource in resources:
+        name = resource.resource_name
+        if known.get(name) != snapshot['resources'][name]:
+            d3_data['nodes'].append(_resource_node(resource))
+    d3_data['removed'] = sorted(set(known) - set(snapshot['resources']))
     return json.dumps(d3_data)
+
+
+def resource_info_box(request, stack_id, resource_name):
+    """Renders the info box shown for a resource of the topology graph."""
+    resource = heat.resource_get(request, stack_id, resource_name)
+    return sro.resource_info(resource)
@@ -10,9 +10,11 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import copy
 import json
 
 from django.conf import settings
+from django.core import cache as django_cache
 from django.core import exceptions
 from django.core.urlresolvers import reverse
 from django import http
@@ -357,6 +359,69 @@ class StackTests(test.TestCase):
         self.assertFormError(res, "form", 'stack_name', error)
 
 
+class TopologyTests(test.TestCase):
+
+    def setUp(self):
+        super(TopologyTests, self).setUp()
+        django_cache.cache.clear()
+
+    @test.create_stubs({api.heat: ('stack_get', 'resources_list')})
+    def test_d3_data_only_sends_changes(self):
+        stack = self.stacks.first()
+        resources = self.stack_resources.list()
+        web, database = resources
+        changed = copy.copy(database)
+        changed.resource_status = 'UPDATE_IN_PROGRESS'
+        changed.updated_time = '2013-04-22T00:12:39Z'
+        api.heat.stack_get(IsA(http.HttpRequest), stack.id) \
+            .MultipleTimes().AndReturn(stack)
+        api.heat.resources_list(IsA(http.HttpRequest), stack.id) \
+            .AndReturn(resources)
+        api.heat.resources_list(IsA(http.HttpRequest), stack.id) \
+            .AndReturn(resources)
+        api.heat.resources_list(IsA(http.HttpRequest), stack.id) \
+            .AndReturn([changed])
+        self.mox.ReplayAll()
+
+        url = reverse('horizon:project:stacks:d3_data', args=[stack.id])
+        data = json.loads(self.client.get(url).content)
+        self.assertTrue(data['full'])
+        self.assertFalse(data['in_progress'])
+        self.assertEqual([node['name'] for node in data['nodes']],
+                         [web.resource_name, database.resource_name])
+        self.assertNotIn('info_box', data['nodes'][0])
+        self.assertIn('info_box', data['stack'])
+
+        # Nothing changed.
+        data = json.loads(self.client.get(
+            url, {'since': data['version']}).content)
+        self.assertFalse(data['full'])
+        self.assertEqual(data['nodes'], [])
+        self.assertEqual(data['stack'], {})
+        self.assertEqual(data['removed'], [])
+
+        data = json.loads(self.client.get(
+            url, {'since': data['version']}).content)
+        self.assertFalse(data['full'])
+        self.assertTrue(data['in_progress'])
+        self.assertEqual([node['status'] for node in data['nodes']],
+                         ['UPDATE_IN_PROGRESS'])
+        self.assertEqual(data['removed'], [web.resource_name])
+
+    @test.create_stubs({api.heat: ('resource_get',)})
+    def test_resource_info_box(self):
+        stack = self.stacks.first()
+        resource = self.stack_resources.first()
+        api.heat.resource_get(IsA(http.HttpRequest), stack.id,
+                              resource.resource_name).AndReturn(resource)
+        self.mox.ReplayAll()
+
+        url = reverse('horizon:project:stacks:d3_info',
+                      args=[stack.id, resource.resource_name])
+        res = self.client.get(url)
+        self.assertContains(res, '<h3>%s</h3>' % resource.resource_name)
+
+
 class TemplateFormTests(test.TestCase):
 
     class SimpleFile(object):
@@ -32,4 +32,6 @@ urlpatterns = patterns(
         views.ResourceView.as_view(), name='resource'),
     url(r'^get_d3_data/(?P<stack_id>[^/]+)/$',
         views.JSONView.as_view(), name='d3_data'),
+    url(r'^get_d3_info/(?P<stack_id>[^/]+)/(?P<resource_name>[^/]+)/$',
+        views.ResourceInfoView.as_view(), name='d3_info'),
 )
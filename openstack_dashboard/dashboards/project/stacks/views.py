@@ -248,5 +248,17 @@ class ResourceView(tabs.TabView):
 
 class JSONView(generic.View):
     def get(self, request, stack_id=''):
-        return HttpResponse(project_api.d3_data(request, stack_id=stack_id),
+        return HttpResponse(project_api.d3_data(request, stack_id=stack_id,
+                                                since=request.GET.get('since')),
                             content_type="application/json")
+
+
+class ResourceInfoView(generic.View):
+    def get(self, request, stack_id, resource_name):
+        try:
+            info_box = project_api.resource_info_box(request, stack_id,
+                                                     resource_name)
+        except Exception:
+            info_box = ''
+            exceptions.handle(request, ignore=True)
+        return HttpResponse(info_box)
@@ -15,14 +15,20 @@
 
 """Policy engine for Horizon"""
 
+import ast
 import logging
 import os.path
+import re
 
 from django.conf import settings
+from django import http
 
 from oslo.config import cfg
 
 from openstack_auth import utils as auth_utils
+import six
+
+from horizon.utils import memoized
 
 from openstack_dashboard.openstack.common import policy
 
@@ -33,6 +39,16 @@ CONF = cfg.CONF
 _ENFORCER = None
 _BASE_PATH = getattr(settings, 'POLICY_FILES_PATH', '')
 
+# Compiled rules of each service, rebuilt whenever its enforcer loads a new
+# version of the policy file.
+_COMPILED = {}
+
+# Target fields used by generic checks such as "project_id:%(project_id)s".
+_TARGET_FIELD_RE = re.compile(r'%\(([^)]+)\)')
+
+# Stands for target fields which are not set, in decision cache keys.
+_MISSING = object()
+
 
 def _get_enforcer():
     global _ENFORCER
@@ -55,9 +71,184 @@ def _get_enforcer():
 def reset():
     global _ENFORCER
     _ENFORCER = None
+    _COMPILED.clear()
+
+
+def _true(target, credentials):
+    return True
+
+
+def _false(target, credentials):
+    return False
+
+
+def _union(fields):
+    """Joins sets of target fields, where ``None`` stands for all fields."""
+    result = set()
+    for field_set in fields:
+        if field_set is None:
+            return None
+        result |= field_set
+    return frozenset(result)
+
+
+class _CompiledRules(object):
+    """The rules of a policy file, turned into plain functions.
+
+    Evaluating the parsed rules directly means looking referenced rules up
+    by name and parsing the left side of every generic check each time.
+    Here each rule becomes a function of ``(target, credentials)`` once,
+    along with the set of target fields its result depends on (``None`` if
+    that isn't known), which is used to cache decisions.
+    """
+    def __init__(self, enforcer):
+        self.enforcer = enforcer
+        self.rules = enforcer.rules
+        self._compiled = {}
+        self._compiling = set()
+
+    def get(self, name):
+        """Returns ``(function, fields)`` for the rule with the given name.
+
+        Unknown names get the default rule, or fail closed, exactly like
+        lookups in the policy's :class:`Rules`.
+        """
+        if name not in self._compiled:
+            if name in self._compiling:
+                # A rule referring back to itself; evaluate it lazily.
+                return (lambda t, c: self.get(name)[0](t, c)), None
+            self._compiling.add(name)
+            try:
+                try:
+                    check = self.rules[name]
+                except KeyError:
+                    compiled = (_false, frozenset())
+                else:
+                    compiled = self._compile(check)
+            finally:
+                self._compiling.discard(name)
+            self._compiled[name] = compiled
+        return self._compiled[name]
+
+    def evaluate(self, name, target, credentials):
+        return self.get(name)[0](target, credentials)
+
+    def _compile(self, check):
+        check_type = type(check)
+        if check_type is policy.TrueCheck:
+            return _true, frozenset()
+        if check_type is policy.FalseCheck:
+            return _false, frozenset()
+        if check_type is policy.NotCheck:
+            func, fields = self._compile(check.rule)
+            return (lambda t, c: not func(t, c)), fields
+        if check_type in (policy.AndCheck, policy.OrCheck):
+            compiled = [self._compile(rule) for rule in check.rules]
+            funcs = [func for func, fields in compiled]
+            fields = _union(fields for func, fields in compiled)
+            if check_type is policy.AndCheck:
+                return (lambda t, c: all(f(t, c) for f in funcs)), fields
+            return (lambda t, c: any(f(t, c) for f in funcs)), fields
+        if check_type is policy.RuleCheck:
+            return self.get(check.match)
+        if check_type is policy.RoleCheck:
+            role = check.match.lower()
+            return ((lambda t, c: role in [r.lower() for r in c['roles']]),
+                    frozenset())
+        if check_type is policy.GenericCheck:
+            return self._compile_generic(check)
+        # Checks which call out (http:) or are registered by others are
+        # evaluated as they are, and may depend on the whole target.
+        enforcer = self.enforcer
+        return (lambda t, c: check(t, c, enforcer)), None
+
+    def _compile_generic(self, check):
+        match = check.match
+        kind = check.kind
+        fields = frozenset(_TARGET_FIELD_RE.findall(match))
+        try:
+            # The left side is either a literal or a credentials key.
+            literal = six.text_type(ast.literal_eval(kind))
+        except ValueError:
+            literal = None
+        except Exception:
+            enforcer = self.enforcer
+            return (lambda t, c: check(t, c, enforcer)), None
+
+        def generic_check(target, credentials):
+            try:
+                value = match % target
+            except KeyError:
+                return False
+            if literal is not None:
+                return value == literal
+            if kind not in credentials:
+                return False
+            return value == six.text_type(credentials[kind])
+        return generic_check, fields
 
 
-def check(actions, request, target={}):
+def _get_rules(scope, enforcer):
+    """Returns the :class:`_CompiledRules` of a service's current rules."""
+    enforcer.load_rules()
+    compiled = _COMPILED.get(scope)
+    if compiled is None or compiled.rules is not enforcer.rules:
+        compiled = _CompiledRules(enforcer)
+        _COMPILED[scope] = compiled
+    return compiled
+
+
+@memoized.memoized_per_request
+def _get_request_rules(request, scope, enforcer):
+    # The policy file is only checked for changes once per request.
+    return _get_rules(scope, enforcer)
+
+
+@memoized.memoized_per_request
+def _get_request_credentials(request):
+    user = auth_utils.get_user(request)
+    credentials = _user_to_credentials(request, user)
+    fingerprint = (credentials['user_id'], credentials['project_id'],
+                   credentials['domain_id'], credentials['is_admin'],
+                   tuple(sorted(credentials['roles'])))
+    return user, credentials, fingerprint
+
+
+def _is_allowed(compiled, action, target, credentials):
+    if not compiled.rules:
+        # No rules to reference means we're going to fail closed
+        return False
+    if compiled.evaluate(action, target, credentials):
+        return True
+    # to match service implementations, if a rule is not found,
+    # use the default rule for that service policy
+    return bool(action not in compiled.rules and
+                compiled.evaluate('default', target, credentials))
+
+
+def _decision_key(compiled, action, target, fingerprint):
+    """Returns the key of a decision in the request's cache, if it has one.
+
+    Only the target fields the rules look at are part of the key, so that
+    targets which differ in other fields share decisions.
+    """
+    fields = compiled.get(action)[1]
+    if action not in compiled.rules:
+        fields = _union((fields, compiled.get('default')[1]))
+    if fields is None:
+        target_key = tuple(sorted(target.items()))
+    else:
+        target_key = tuple((field, target.get(field, _MISSING))
+                           for field in sorted(fields))
+    key = (compiled, action, fingerprint, target_key)
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def check(actions, request, target=None):
     """Check user permission.
 
     Check if the user has permission to the action according
@@ -94,48 +285,71 @@ def check(actions, request, target={}):
                       {'tenant_id': object.tenant_id}
     :returns: boolean if the user has permission or not for the actions.
     """
-    user = auth_utils.get_user(request)
+    return check_many(actions, request, [target])[0]
 
-    # Several service policy engines default to a project id check for
-    # ownership. Since the user is already scoped to a project, if a
-    # different project id has not been specified use the currently scoped
-    # project's id.
-    #
-    # The reason is the operator can edit the local copies of the service
-    # policy file. If a rule is removed, then the default rule is used. We
-    # don't want to block all actions because the operator did not fully
-    # understand the implication of editing the policy file. Additionally,
-    # the service APIs will correct us if we are too permissive.
-    if target.get('project_id') is None:
-        target['project_id'] = user.project_id
-    # same for user_id
-    if target.get('user_id') is None:
-        target['user_id'] = user.id
 
-    credentials = _user_to_credentials(request, user)
+def check_many(actions, request, targets):
+    """Check user permission for the same actions on several targets.
+
+    This is the equivalent of calling :func:`check` for each target, e.g.
+    for each row of a table, but the user's credentials and the rules are
+    only looked up once. Decisions are cached for the rest of the request,
+    keyed by the user's credentials, the action and the target fields the
+    rules depend on.
 
+    :param actions: list of (scope, action) pairs, as for :func:`check`.
+    :param request: django http request object.
+    :param targets: list of target dictionaries (or ``None``).
+    :returns: list of booleans, one for each target.
+    """
+    user, credentials, fingerprint = _get_request_credentials(request)
     enforcer = _get_enforcer()
+    rules = [(_get_request_rules(request, scope, enforcer[scope]), action)
+             for scope, action in actions if scope in enforcer]
+    # if no policy for scope, allow action, underlying API will
+    # ultimately block the action if not permitted, treat as though
+    # allowed
+    if isinstance(request, http.HttpRequest):
+        decisions = request.__dict__.setdefault('_policy_decisions', {})
+    else:
+        decisions = {}
+
+    results = []
+    for target in targets:
+        target = dict(target or {})
+        # Several service policy engines default to a project id check for
+        # ownership. Since the user is already scoped to a project, if a
+        # different project id has not been specified use the currently
+        # scoped project's id.
+        #
+        # The reason is the operator can edit the local copies of the
+        # service policy file. If a rule is removed, then the default rule
+        # is used. We don't want to block all actions because the operator
+        # did not fully understand the implication of editing the policy
+        # file. Additionally, the service APIs will correct us if we are
+        # too permissive.
+        if target.get('project_id') is None:
+            target['project_id'] = user.project_id
+        # same for user_id
+        if target.get('user_id') is None:
+            target['user_id'] = user.id
 
-    for action in actions:
-        scope, action = action[0], action[1]
-        if scope in enforcer:
+        allowed = True
+        for compiled, action in rules:
+            key = _decision_key(compiled, action, target, fingerprint)
+            if key is not None and key in decisions:
+                decision = decisions[key]
+            else:
+                decision = _is_allowed(compiled, action, target,
+                                       credentials)
+                if key is not None:
+                    decisions[key] = decision
             # if any check fails return failure
-            if not enforcer[scope].enforce(action, target, credentials):
-                # to match service implementations, if a rule is not found,
-                # use the default rule for that service policy
-                #
-                # waiting to make the check because the first call to
-                # enforce loads the rules
-                if action not in enforcer[scope].rules:
-                    if not enforcer[scope].enforce('default',
-                                                   target, credentials):
-                        return False
-                else:
-                    return False
-        # if no policy for scope, allow action, underlying API will
-        # ultimately block the action if not permitted, treat as though
-        # allowed
-    return True
+            if not decision:
+                allowed = False
+                break
+        results.append(allowed)
+    return results
 
 
 def _user_to_credentials(request, user):
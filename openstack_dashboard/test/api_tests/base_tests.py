@@ -18,6 +18,10 @@
 
 from __future__ import absolute_import
 
+from django.contrib.auth import signals as auth_signals
+from django.core import cache as django_cache
+from django.test.utils import override_settings
+
 from horizon import exceptions
 
 from openstack_dashboard.api import base as api_base
@@ -200,6 +204,202 @@ class ApiHelperTests(test.TestCase):
         with self.assertRaises(exceptions.ServiceCatalogException):
             url = api_base.url_for(self.request, 'image')
 
+    def test_service_catalog_index(self):
+        catalog = api_base.get_service_catalog(self.request)
+        # The index is built once and kept with the user.
+        self.assertIs(api_base.get_service_catalog(self.request), catalog)
+        self.assertEqual(catalog.get_service('compute'),
+                         api_base.get_service_from_catalog(
+                             self.request.user.service_catalog, 'compute'))
+        self.assertIsNone(catalog.get_service('notAnApi'))
+
+        self.assertTrue(catalog.is_enabled('compute', 'RegionTwo'))
+        self.assertFalse(catalog.is_enabled('image', 'RegionTwo'))
+        self.assertTrue(catalog.is_enabled('identity', 'bogus_value'))
+        self.assertFalse(catalog.is_enabled('notAnApi', 'RegionOne'))
+
+        self.assertEqual(catalog.url('compute', 'RegionTwo', 'publicURL'),
+                         'http://public.nova2.example.com:8774/v2')
+        self.assertIsNone(catalog.url('image', 'RegionTwo', 'publicURL'))
+
+        # A new catalog, e.g. after switching projects, gets a new index.
+        self.request.user.service_catalog = list(
+            self.request.user.service_catalog)
+        self.assertIsNot(api_base.get_service_catalog(self.request), catalog)
+
+    def test_is_service_enabled(self):
+        self.assertTrue(api_base.is_service_enabled(self.request, 'compute'))
+        self.assertFalse(api_base.is_service_enabled(self.request,
+                                                     'notAnApi'))
+        service = api_base.get_service_from_catalog(
+            self.request.user.service_catalog, 'volume')
+        self.assertTrue(api_base.is_service_enabled(
+            self.request, 'volume', service_name=service['name']))
+        self.assertFalse(api_base.is_service_enabled(
+            self.request, 'volume', service_name='bogus'))
+
+
+@override_settings(OPENSTACK_CLIENT_CACHE={'enabled': True, 'max_size': 2})
+class ClientCacheTests(test.APITestCase):
+    def setUp(self):
+        super(ClientCacheTests, self).setUp()
+        self.cache = api_base.ClientCache()
+
+    def _factory(self):
+        return object()
+
+    def test_client_reused_for_same_token(self):
+        first = self.cache.get(self.request, 'compute', 'http://nova',
+                               self._factory)
+        second = self.cache.get(self.request, 'compute', 'http://nova',
+                                self._factory)
+        self.assertIs(first, second)
+        self.assertEqual(self.cache.stats(),
+                         {'hits': 1, 'misses': 1, 'evictions': 0, 'size': 1})
+
+    def test_clients_keyed_by_endpoint_and_region(self):
+        nova = self.cache.get(self.request, 'compute', 'http://nova',
+                              self._factory)
+        other = self.cache.get(self.request, 'compute', 'http://nova2',
+                               self._factory)
+        self.assertIsNot(nova, other)
+        self.request.user.services_region = "RegionTwo"
+        region_two = self.cache.get(self.request, 'compute', 'http://nova',
+                                    self._factory)
+        self.assertIsNot(nova, region_two)
+
+    def test_lru_eviction(self):
+        first = self.cache.get(self.request, 'compute', 'http://a',
+                               self._factory)
+        self.cache.get(self.request, 'compute', 'http://b', self._factory)
+        self.cache.get(self.request, 'compute', 'http://a', self._factory)
+        self.cache.get(self.request, 'compute', 'http://c', self._factory)
+        self.assertEqual(self.cache.stats()['size'], 2)
+        self.assertEqual(self.cache.stats()['evictions'], 1)
+        self.assertIs(first, self.cache.get(self.request, 'compute',
+                                            'http://a', self._factory))
+
+    def test_expired_token_is_evicted(self):
+        first = self.cache.get(self.request, 'compute', 'http://nova',
+                               self._factory)
+        self.mox.StubOutWithMock(api_base.auth_utils,
+                                 'check_token_expiration')
+        api_base.auth_utils.check_token_expiration(
+            self.request.user.token).AndReturn(False)
+        self.mox.ReplayAll()
+        second = self.cache.get(self.request, 'compute', 'http://nova',
+                                self._factory)
+        self.assertIsNot(first, second)
+        self.assertEqual(self.cache.stats()['evictions'], 1)
+
+    def test_logout_evicts_token(self):
+        self.mox.StubOutWithMock(api_base, 'CLIENT_CACHE')
+        api_base.CLIENT_CACHE.evict_token(self.request.user.token.id)
+        self.mox.ReplayAll()
+        auth_signals.user_logged_out.send(sender=None,
+                                          request=self.request,
+                                          user=self.request.user)
+
+    @override_settings(OPENSTACK_CLIENT_CACHE={'enabled': False})
+    def test_disabled(self):
+        first = self.cache.get(self.request, 'compute', 'http://nova',
+                               self._factory)
+        second = self.cache.get(self.request, 'compute', 'http://nova',
+                                self._factory)
+        self.assertIsNot(first, second)
+        self.assertEqual(self.cache.stats()['size'], 0)
+
+
+class FakeTime(object):
+    def __init__(self):
+        self.now = 0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FakeResource(object):
+    def __init__(self, manager, info, loaded=False):
+        self.manager = manager
+        self._info = info
+
+
+class FakeManager(object):
+    resource_class = FakeResource
+
+
+@override_settings(OPENSTACK_API_CACHE={'enabled': True, 'ttl': 60})
+class CachedAPITests(test.APITestCase):
+    def setUp(self):
+        super(CachedAPITests, self).setUp()
+        django_cache.get_cache('default').clear()
+        self.calls = []
+
+        @api_base.cached_api('compute', project_scoped=True)
+        def things(request, detailed=False):
+            self.calls.append(detailed)
+            return ['thing', detailed]
+
+        self.things = things
+
+    def test_cached_between_calls(self):
+        self.assertEqual(self.things(self.request), ['thing', False])
+        self.assertEqual(self.things(self.request), ['thing', False])
+        self.assertEqual(self.things(self.request, detailed=True),
+                         ['thing', True])
+        self.assertEqual(self.calls, [False, True])
+
+    def test_scoped_by_project(self):
+        self.things(self.request)
+        self.request.user.tenant_id = 'another'
+        self.things(self.request)
+        self.assertEqual(len(self.calls), 2)
+
+    def test_invalidate(self):
+        self.things(self.request)
+        self.request.user.tenant_id = 'another'
+        self.things(self.request)
+        self.things.invalidate(self.request)
+        self.things(self.request)
+        self.request.user.tenant_id = self.tenant.id
+        self.things(self.request)
+        self.assertEqual(len(self.calls), 4)
+
+    def test_stale_value_served_during_refresh(self):
+        clock = FakeTime()
+        self.mox.stubs.Set(api_base, 'time', clock)
+        served_during_refresh = []
+
+        @api_base.cached_api('compute')
+        def counter(request):
+            self.calls.append(clock.now)
+            if len(self.calls) == 2:
+                # A concurrent caller while the value is being refreshed.
+                served_during_refresh.append(counter(request))
+            return len(self.calls)
+
+        self.assertEqual(counter(self.request), 1)
+        clock.now = 100
+        self.assertEqual(counter(self.request), 2)
+        self.assertEqual(served_during_refresh, [1])
+        self.assertEqual(counter(self.request), 2)
+        self.assertEqual(self.calls, [0, 100])
+
+    def test_resources_rebuilt_around_manager(self):
+        manager = FakeManager()
+
+        @api_base.cached_api('compute', manager=lambda request: manager)
+        def resources(request):
+            return [FakeResource(None, {'id': 1})]
+
+        resources(self.request)
+        cached = resources(self.request)
+        self.assertIs(cached[0].manager, manager)
+        self.assertEqual(cached[0]._info, {'id': 1})
+
 
 class QuotaSetTests(test.TestCase):
 
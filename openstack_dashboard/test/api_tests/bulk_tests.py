@@ -0,0 +1,100 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from __future__ import absolute_import
+
+import threading
+
+from django.test.utils import override_settings  # noqa
+
+from openstack_dashboard import api
+from openstack_dashboard.test import helpers as test
+
+
+class BulkApiTests(test.APITestCase):
+    def _fake_delete(self, failing=()):
+        deleted = []
+        threads = set()
+
+        def delete(request, obj_id):
+            threads.add(threading.current_thread().ident)
+            if obj_id in failing:
+                raise self.exceptions.nova
+            deleted.append(obj_id)
+        return delete, deleted, threads
+
+    @override_settings(OPENSTACK_BULK_CONCURRENCY={'compute': 3})
+    def test_delete(self):
+        delete, deleted, threads = self._fake_delete(failing=('2',))
+        self.mox.stubs.Set(api.nova, 'server_delete', delete)
+
+        results = api.bulk.delete(self.request, 'instance',
+                                  ['1', '2', '3', '4'])
+
+        self.assertEqual(sorted(deleted), ['1', '3', '4'])
+        self.assertEqual(results, {'1': None, '2': self.exceptions.nova,
+                                   '3': None, '4': None})
+        self.assertNotIn(threading.current_thread().ident, threads)
+
+    def test_delete_unknown_type(self):
+        self.assertRaises(ValueError, api.bulk.delete, self.request,
+                          'unknown', ['1'])
+
+    def test_delete_objects(self):
+        calls = []
+
+        def delete_objects(request, container_name, object_names):
+            calls.append((container_name, object_names))
+            return dict((name, None) for name in object_names)
+
+        self.mox.stubs.Set(api.swift, 'swift_delete_objects', delete_objects)
+
+        results = api.bulk.delete(self.request, 'object',
+                                  ['c1/a', 'c2/b/c', 'c1/d'])
+
+        self.assertEqual(sorted(calls), [('c1', ['a', 'd']),
+                                         ('c2', ['b/c'])])
+        self.assertEqual(results, {'c1/a': None, 'c2/b/c': None,
+                                   'c1/d': None})
+
+    def test_delete_many(self):
+        delete_servers, deleted_servers, threads = self._fake_delete()
+        delete_volumes, deleted_volumes, threads = self._fake_delete(
+            failing=('v2',))
+        self.mox.stubs.Set(api.nova, 'server_delete', delete_servers)
+        self.mox.stubs.Set(api.cinder, 'volume_delete', delete_volumes)
+
+        results = api.bulk.delete_many(self.request,
+                                       {'instance': ['i1', 'i2'],
+                                        'volume': ['v1', 'v2'],
+                                        'unknown': ['u1']})
+
+        self.assertEqual(sorted(deleted_servers), ['i1', 'i2'])
+        self.assertEqual(deleted_volumes, ['v1'])
+        self.assertEqual(results['instance'], {'i1': None, 'i2': None})
+        self.assertEqual(results['volume'], {'v1': None,
+                                             'v2': self.exceptions.nova})
+        self.assertIsInstance(results['unknown']['u1'], ValueError)
+
+    def test_disassociate(self):
+        calls = []
+
+        def disassociate(request, floating_ip_id, port_id):
+            calls.append(floating_ip_id)
+
+        self.mox.stubs.Set(api.network, 'floating_ip_disassociate',
+                           disassociate)
+
+        results = api.bulk.disassociate(self.request, 'floating_ip',
+                                        ['f1', 'f2'])
+        self.assertEqual(sorted(calls), ['f1', 'f2'])
+        self.assertEqual(results, {'f1': None, 'f2': None})
@@ -158,11 +158,36 @@ class CeilometerApiTests(test.APITestCase):
             self.assertIn(ret.name, names)
             names.remove(ret.name)
 
+    @test.create_stubs({api.nova: ('flavor_list',),
+                        })
+    def test_meter_catalog(self):
+        meters = self.meters.list()
+
+        api.nova.flavor_list(IsA(http.HttpRequest), None).AndReturn([])
+        ceilometerclient = self.stub_ceilometerclient()
+        ceilometerclient.meters = self.mox.CreateMockAnything()
+        # The meters are only listed once per request.
+        ceilometerclient.meters.list(None).AndReturn(meters)
+        self.mox.ReplayAll()
+
+        catalog = api.ceilometer.meter_catalog(self.request)
+        self.assertIs(api.ceilometer.meter_catalog(self.request), catalog)
+
+        # The meters listed once per resource are indexed once.
+        self.assertEqual(len(catalog.list_all()), 3)
+        meter = catalog.get('disk.read.bytes')
+        self.assertEqual(meter.name, 'disk.read.bytes')
+        self.assertNotEqual(meter.description, '')
+        self.assertEqual(catalog.unit('disk.read.bytes'), 'instance')
+        self.assertEqual(catalog.service('disk.read.bytes'), 'nova')
+        self.assertIsNone(catalog.get('unknown'))
+        self.assertEqual(catalog.unit('unknown'), '')
+
     #TODO(lsmola)
     #test resource aggregates
 
-    @test.create_stubs({api.ceilometer.CeilometerUsage: ("get_user",
-                                                         "get_tenant")})
+    @test.create_stubs({api.ceilometer.CeilometerUsage: (
+        "get_user", "get_tenant", "resolve_users_and_tenants")})
     def test_global_data_get(self):
         class TempUsage(api.base.APIResourceWrapper):
             _attrs = ["id", "tenant", "user", "resource", "get_meter"]
@@ -192,6 +217,8 @@ class CeilometerApiTests(test.APITestCase):
                                          period=None, q=IsA(list)).\
             AndReturn(statistics)
 
+        api.ceilometer.CeilometerUsage\
+                .resolve_users_and_tenants(IsA(list))
         api.ceilometer.CeilometerUsage\
                 .get_user(IsA(str)).AndReturn(user)
         api.ceilometer.CeilometerUsage\
@@ -216,8 +243,8 @@ class CeilometerApiTests(test.APITestCase):
         # check that only one resource is returned
         self.assertEqual(len(data), 1)
 
-    @test.create_stubs({api.ceilometer.CeilometerUsage: ("get_user",
-                                                         "get_tenant")})
+    @test.create_stubs({api.ceilometer.CeilometerUsage: (
+        "get_user", "get_tenant", "resolve_users_and_tenants")})
     def test_global_data_get_without_statistic_data(self):
         class TempUsage(api.base.APIResourceWrapper):
             _attrs = ["id", "tenant", "user", "resource", "fake_meter_1",
@@ -237,6 +264,8 @@ class CeilometerApiTests(test.APITestCase):
         ceilometerclient.resources = self.mox.CreateMockAnything()
         ceilometerclient.resources.list(q=IsA(list)).AndReturn(resources)
 
+        api.ceilometer.CeilometerUsage\
+                .resolve_users_and_tenants(IsA(list))
         api.ceilometer.CeilometerUsage\
                 .get_user(IsA(str)).MultipleTimes().AndReturn(user)
         api.ceilometer.CeilometerUsage\
@@ -261,8 +290,8 @@ class CeilometerApiTests(test.APITestCase):
 
         self.assertEqual(len(data), len(resources))
 
-    @test.create_stubs({api.ceilometer.CeilometerUsage: ("get_user",
-                                                         "get_tenant")})
+    @test.create_stubs({api.ceilometer.CeilometerUsage: (
+        "get_user", "get_tenant", "resolve_users_and_tenants")})
     def test_global_data_get_all_statistic_data(self):
         class TempUsage(api.base.APIResourceWrapper):
             _attrs = ["id", "tenant", "user", "resource", "get_meter", ]
@@ -289,6 +318,8 @@ class CeilometerApiTests(test.APITestCase):
             MultipleTimes().\
             AndReturn(statistics)
 
+        api.ceilometer.CeilometerUsage\
+                .resolve_users_and_tenants(IsA(list))
         api.ceilometer.CeilometerUsage\
                 .get_user(IsA(str)).MultipleTimes().AndReturn(user)
         api.ceilometer.CeilometerUsage\
@@ -316,3 +347,107 @@ class CeilometerApiTests(test.APITestCase):
                          vars(statistic_obj))
 
         self.assertEqual(len(data), len(resources))
+
+    @test.create_stubs({api.keystone: ("user_get", "tenant_get")})
+    def test_resources_resolve_users_and_tenants(self):
+        resources = self.resources.list()
+        user = self.ceilometer_users.first()
+        tenant = self.ceilometer_tenants.first()
+
+        ceilometerclient = self.stub_ceilometerclient()
+        ceilometerclient.resources = self.mox.CreateMockAnything()
+        ceilometerclient.resources.list(q=IsA(list)).MultipleTimes() \
+            .AndReturn(resources)
+        # The resources share a user and a tenant, which are only fetched
+        # once, even by a second listing.
+        api.keystone.user_get(IsA(http.HttpRequest), 'fake_user_id') \
+            .AndReturn(user)
+        api.keystone.tenant_get(IsA(http.HttpRequest), 'fake_project_id') \
+            .AndReturn(tenant)
+        self.mox.ReplayAll()
+
+        name_cache = api.ceilometer.NameCache()
+        for i in range(2):
+            ceilometer_usage = api.ceilometer.CeilometerUsage(
+                self.request, name_cache=name_cache)
+            data = ceilometer_usage.resources([], with_users_and_tenants=True)
+            self.assertEqual(len(data), len(resources))
+            for resource in data:
+                self.assertEqual(resource.user, user)
+                self.assertEqual(resource.tenant, tenant)
+
+    @test.create_stubs({api.keystone: ("iter_users", "iter_projects")})
+    def test_resources_preload_users_and_tenants(self):
+        resources = self.resources.list()
+        user = api.base.APIDictWrapper({'id': 'fake_user_id',
+                                        'name': 'user'})
+        tenant = api.base.APIDictWrapper({'id': 'fake_project_id',
+                                          'name': 'test_tenant'})
+        users = self.ceilometer_users.list() + [user]
+        tenants = self.ceilometer_tenants.list() + [tenant]
+
+        ceilometerclient = self.stub_ceilometerclient()
+        ceilometerclient.resources = self.mox.CreateMockAnything()
+        ceilometerclient.resources.list(q=IsA(list)).AndReturn(resources)
+        api.keystone.iter_users(IsA(http.HttpRequest)) \
+            .AndReturn(iter(users))
+        api.keystone.iter_projects(IsA(http.HttpRequest)) \
+            .AndReturn(iter(tenants))
+        self.mox.ReplayAll()
+
+        ceilometer_usage = api.ceilometer.CeilometerUsage(
+            self.request, name_cache=api.ceilometer.NameCache())
+        ceilometer_usage.preload_threshold = 0
+        data = ceilometer_usage.resources([], with_users_and_tenants=True)
+        for resource in data:
+            self.assertEqual(resource.user, user)
+            self.assertEqual(resource.tenant, tenant)
+
+    def test_statistics_deduplicated(self):
+        statistics = self.statistics.list()
+        query = [{'field': 'project_id', 'op': 'eq', 'value': 'tenant'}]
+        ceilometerclient = self.stub_ceilometerclient()
+        ceilometerclient.statistics = self.mox.CreateMockAnything()
+        # Both aggregates have the same query, so there is a single call.
+        ceilometerclient.statistics.list(meter_name='fake_meter',
+                                         period=None, q=query).\
+            AndReturn(statistics)
+        self.mox.ReplayAll()
+
+        before = api.ceilometer.STATISTICS_EXECUTOR.stats()
+        ceilometer_usage = api.ceilometer.CeilometerUsage(self.request)
+        aggregates = ceilometer_usage.resource_aggregates_with_statistics(
+            {'first': query, 'second': list(query)}, ['fake_meter'],
+            stats_attr='max')
+        after = api.ceilometer.STATISTICS_EXECUTOR.stats()
+
+        self.assertEqual([a.get_meter('fake_meter') for a in aggregates],
+                         [statistics[0].max] * 2)
+        self.assertEqual(after['deduplicated'] - before['deduplicated'], 1)
+        self.assertEqual(after['calls'] - before['calls'], 1)
+        self.assertEqual(after['queued'], 0)
+        self.assertEqual(after['in_flight'], 0)
+
+    def test_statistics_partial_results(self):
+        statistics = self.statistics.list()
+        ceilometerclient = self.stub_ceilometerclient()
+        ceilometerclient.statistics = self.mox.CreateMockAnything()
+        ceilometerclient.statistics.list(meter_name='fake_meter_1',
+                                         period=None, q=IsA(list)).\
+            AndReturn(statistics)
+        ceilometerclient.statistics.list(meter_name='fake_meter_2',
+                                         period=None, q=IsA(list)).\
+            AndRaise(self.exceptions.ceilometer)
+        self.mox.ReplayAll()
+
+        ceilometer_usage = api.ceilometer.CeilometerUsage(self.request)
+        aggregate, = ceilometer_usage.resource_aggregates_with_statistics(
+            {'tenant': []}, ['fake_meter_1', 'fake_meter_2'],
+            stats_attr='max')
+
+        self.assertEqual(aggregate.get_meter('fake_meter_1'),
+                         statistics[0].max)
+        self.assertIsNone(aggregate.get_meter('fake_meter_2'))
+        self.assertEqual(len(ceilometer_usage.statistics_errors), 1)
+        resource_id, meter, error = ceilometer_usage.statistics_errors[0]
+        self.assertEqual((resource_id, meter), ('tenant', 'fake_meter_2'))
@@ -17,7 +17,9 @@
 #    under the License.
 
 from django.conf import settings
+from django.core.files.base import ContentFile  # noqa
 from django.test.utils import override_settings
+from mox import IsA  # noqa
 
 from openstack_dashboard import api
 from openstack_dashboard.test import helpers as test
@@ -247,3 +249,48 @@ class GlanceApiTests(test.APITestCase):
         self.mox.ReplayAll()
         image = api.glance.image_get(self.request, 'empty')
         self.assertIsNone(image.name)
+
+    def test_image_create_queues_upload(self):
+        image = self.images.first()
+        data = ContentFile('image data', name='image.iso')
+        glanceclient = self.stub_glanceclient()
+        glanceclient.images = self.mox.CreateMockAnything()
+        glanceclient.images.create(name=image.name).AndReturn(image)
+        self.mox.StubOutWithMock(api.glance, '_queue_upload')
+        api.glance._queue_upload(self.request, image.id, data=data)
+        self.mox.ReplayAll()
+
+        ret_val = api.glance.image_create(self.request, name=image.name,
+                                          data=data)
+        self.assertEqual(ret_val, image)
+
+    def test_image_upload_progress(self):
+        image = self.images.first()
+        data = ContentFile('image data', name='image.iso')
+
+        def read_data(image_id, data=None, purge_props=None):
+            self.assertEqual(
+                api.glance.image_upload_progress(self.request, image_id),
+                {'status': 'uploading', 'bytes': 0, 'total': 10})
+            data.read()
+
+        glanceclient = self.stub_glanceclient()
+        glanceclient.images = self.mox.CreateMockAnything()
+        glanceclient.images.update(image.id, purge_props=False,
+                                   data=IsA(api.glance._ProgressFile)) \
+            .WithSideEffects(read_data)
+        glanceclient.images.update(image.id, purge_props=False,
+                                   copy_from='http://example.com/image') \
+            .AndRaise(self.exceptions.glance)
+        self.mox.ReplayAll()
+
+        api.glance._upload(self.request, image.id, {'data': data})
+        self.assertEqual(
+            api.glance.image_upload_progress(self.request, image.id),
+            {'status': 'finished', 'bytes': 10, 'total': 10})
+
+        api.glance._upload(self.request, image.id,
+                           {'copy_from': 'http://example.com/image'})
+        self.assertEqual(
+            api.glance.image_upload_progress(self.request, image.id),
+            {'status': 'failed', 'bytes': 0, 'total': None})
@@ -18,6 +18,7 @@
 
 from __future__ import absolute_import
 
+from django.test.utils import override_settings  # noqa
 from keystoneclient.v2_0 import client as keystone_client
 
 from openstack_dashboard import api
@@ -71,6 +72,83 @@ class RoleAPITests(test.APITestCase):
         self.mox.ReplayAll()
         api.keystone.remove_tenant_user(self.request, tenant.id, self.user.id)
 
+    def test_remove_tenant_users(self):
+        tenant = self.tenants.first()
+        users = self.users.list()[:2]
+        assignments = [
+            api.base.APIDictWrapper({'user': {'id': users[0].id},
+                                     'role': {'id': role.id}})
+            for role in self.roles]
+        assignments.append(api.base.APIDictWrapper(
+            {'group': {'id': '1'}, 'role': {'id': self.role.id}}))
+
+        keystoneclient = self.stub_keystoneclient()
+        keystoneclient.role_assignments = self.mox.CreateMockAnything()
+        keystoneclient.role_assignments.list(project=tenant.id, user=None,
+                                             role=None, group=None,
+                                             domain=None, effective=False) \
+            .AndReturn(assignments)
+        keystoneclient.roles = self.mox.CreateMockAnything()
+        for role in self.roles:
+            keystoneclient.roles.revoke(role.id,
+                                        domain=None,
+                                        group=None,
+                                        project=tenant.id,
+                                        user=users[0].id)
+        self.mox.ReplayAll()
+
+        results = api.keystone.remove_tenant_users(
+            self.request, tenant.id, users, max_workers=1)
+        self.assertEqual(results, {users[0].id: None, users[1].id: None})
+
+    def test_get_project_roles(self):
+        tenant = self.tenants.first()
+        user = self.users.first()
+        assignments = [
+            api.base.APIDictWrapper({'user': {'id': user.id},
+                                     'role': {'id': role.id}})
+            for role in self.roles]
+        assignments.append(api.base.APIDictWrapper(
+            {'group': {'id': '1'}, 'role': {'id': self.role.id}}))
+
+        keystoneclient = self.stub_keystoneclient()
+        keystoneclient.role_assignments = self.mox.CreateMockAnything()
+        # The users and groups share a single listing.
+        keystoneclient.role_assignments.list(project=tenant.id, user=None,
+                                             role=None, group=None,
+                                             domain=None, effective=False) \
+            .AndReturn(assignments)
+        self.mox.ReplayAll()
+
+        users_roles = api.keystone.get_project_users_roles(self.request,
+                                                           tenant.id)
+        groups_roles = api.keystone.get_project_groups_roles(self.request,
+                                                             tenant.id)
+        self.assertEqual(users_roles,
+                         {user.id: [role.id for role in self.roles]})
+        self.assertEqual(groups_roles, {'1': [self.role.id]})
+
+    def test_get_project_users_roles_v2(self):
+        self.mox.stubs.Set(api.keystone.VERSIONS, '_active', 2.0)
+        tenant = self.tenants.first()
+        users = self.users.list()[:2]
+
+        keystoneclient = self.stub_keystoneclient()
+        keystoneclient.users = self.mox.CreateMockAnything()
+        keystoneclient.users.list(tenant_id=tenant.id).AndReturn(users)
+        keystoneclient.roles = self.mox.CreateMockAnything()
+        keystoneclient.roles.roles_for_user(users[0].id, tenant.id) \
+            .AndReturn(self.roles)
+        keystoneclient.roles.roles_for_user(users[1].id, tenant.id) \
+            .AndReturn([self.role])
+        self.mox.ReplayAll()
+
+        users_roles = api.keystone.get_project_users_roles(
+            self.request, tenant.id, max_workers=1)
+        self.assertEqual(users_roles,
+                         {users[0].id: [role.id for role in self.roles],
+                          users[1].id: [self.role.id]})
+
     def test_get_default_role(self):
         keystoneclient = self.stub_keystoneclient()
         keystoneclient.roles = self.mox.CreateMockAnything()
@@ -83,6 +161,83 @@ class RoleAPITests(test.APITestCase):
         role = api.keystone.get_default_role(self.request)
 
 
+@override_settings(API_RESULT_PAGE_SIZE=2)
+class ListingAPITests(test.APITestCase):
+    def test_tenant_list_paginated(self):
+        tenants = self.tenants.list()
+        keystoneclient = self.stub_keystoneclient()
+        keystoneclient.projects = self.mox.CreateMockAnything()
+        keystoneclient.projects.list(domain=None, user=None, enabled=True) \
+            .MultipleTimes().AndReturn(tenants)
+        self.mox.ReplayAll()
+
+        page, has_more = api.keystone.tenant_list(
+            self.request, paginate=True, filters={'enabled': True})
+        self.assertEqual(page, tenants[:2])
+        self.assertTrue(has_more)
+
+        page, has_more = api.keystone.tenant_list(
+            self.request, paginate=True, marker=tenants[1].id,
+            filters={'enabled': True})
+        self.assertEqual(page, tenants[2:])
+        self.assertFalse(has_more)
+
+    def test_user_list_paged_v2(self):
+        self.mox.stubs.Set(api.keystone.VERSIONS, '_active', 2.0)
+        users = self.users.list()
+        keystoneclient = self.stub_keystoneclient()
+        keystoneclient.users = self.mox.CreateMockAnything()
+        # The v2 API ignores limit and marker, the users are paged here.
+        keystoneclient.users.list(tenant_id=None).AndReturn(users)
+        self.mox.ReplayAll()
+
+        page, has_more = api.keystone.user_list_paged(self.request,
+                                                      marker=users[0].id)
+        self.assertEqual(page, users[1:3])
+        self.assertTrue(has_more)
+
+    def test_user_list_filters_v2(self):
+        self.mox.stubs.Set(api.keystone.VERSIONS, '_active', 2.0)
+        users = self.users.list()
+        keystoneclient = self.stub_keystoneclient()
+        keystoneclient.users = self.mox.CreateMockAnything()
+        keystoneclient.users.list(tenant_id=None).AndReturn(users)
+        self.mox.ReplayAll()
+
+        ret_val = api.keystone.user_list(self.request,
+                                         filters={'name': users[1].name})
+        self.assertEqual(ret_val, [users[1]])
+
+    @override_settings(API_RESULT_LIMIT=2)
+    def test_iter_users_v2(self):
+        self.mox.stubs.Set(api.keystone.VERSIONS, '_active', 2.0)
+        users = self.users.list()
+        keystoneclient = self.stub_keystoneclient()
+        keystoneclient.users = self.mox.CreateMockAnything()
+        keystoneclient.users.list(tenant_id=None).AndReturn(users)
+        self.mox.ReplayAll()
+
+        ret_val = api.keystone.iter_users(self.request)
+        self.assertNotIsInstance(ret_val, list)
+        self.assertEqual(list(ret_val), users)
+
+    @override_settings(API_RESULT_LIMIT=2)
+    def test_iter_projects_v2_marker_ignored(self):
+        self.mox.stubs.Set(api.keystone.VERSIONS, '_active', 2.0)
+        tenants = self.tenants.list()
+        keystoneclient = self.stub_keystoneclient()
+        keystoneclient.tenants = self.mox.CreateMockAnything()
+        # An API which ignores the marker sends the same page every time.
+        keystoneclient.tenants.list(limit=2, marker=None) \
+            .AndReturn(tenants)
+        keystoneclient.tenants.list(limit=2, marker=tenants[-1].id) \
+            .AndReturn(tenants)
+        self.mox.ReplayAll()
+
+        ret_val = api.keystone.iter_projects(self.request)
+        self.assertEqual(list(ret_val), tenants)
+
+
 class ServiceAPITests(test.APITestCase):
     def test_service_wrapper(self):
         catalog = self.service_catalog
@@ -30,6 +30,75 @@ class NeutronApiTests(test.APITestCase):
         for n in ret_val:
             self.assertIsInstance(n, api.neutron.Network)
 
+    def test_network_list_without_subnets(self):
+        networks = {'networks': self.api_networks.list()}
+
+        neutronclient = self.stub_neutronclient()
+        neutronclient.list_networks(shared=True).AndReturn(networks)
+        self.mox.ReplayAll()
+
+        ret_val = api.neutron.network_list(self.request, shared=True,
+                                           expand_subnets=False)
+        self.assertEqual([n.id for n in ret_val],
+                         [n['id'] for n in self.api_networks.list()])
+
+    def test_list_resources_with_long_filters(self):
+        calls = []
+
+        def list_method(request, **params):
+            calls.append(params)
+            return [value * 2 for value in params['id']]
+
+        self.mox.stubs.Set(api.neutron, 'FILTER_QUERY_MAX_LENGTH', 16)
+        values = ['aaaa', 'bbbb', 'cccc', 'aaaa', 'dddd', 'eeee']
+        ret_val = api.neutron.list_resources_with_long_filters(
+            self.request, list_method, 'id', values, shared=True)
+
+        self.assertEqual(ret_val, ['aaaaaaaa', 'bbbbbbbb', 'cccccccc',
+                                   'dddddddd', 'eeeeeeee'])
+        self.assertEqual(sorted(call['id'] for call in calls),
+                         [['aaaa', 'bbbb'], ['cccc', 'dddd'], ['eeee']])
+        self.assertTrue(all(call['shared'] for call in calls))
+
+    def test_list_resources_with_long_filters_no_values(self):
+        def list_method(request, **params):
+            self.fail("Nothing should be listed.")
+
+        self.assertEqual(api.neutron.list_resources_with_long_filters(
+            self.request, list_method, 'id', []), [])
+
+    def test_servers_update_addresses(self):
+        servers = self.servers.list()
+        ports = [p for p in self.api_ports.list()
+                 if p['device_owner'] == 'compute:nova']
+        fips = [f for f in self.api_q_floating_ips.list() if f['port_id']]
+        networks = [n for n in self.api_networks.list()
+                    if n['id'] in [p['network_id'] for p in ports]]
+
+        neutronclient = self.stub_neutronclient()
+        neutronclient.list_ports(
+            device_id=sorted(s.id for s in servers)).AndReturn(
+                {'ports': ports})
+        neutronclient.list_floatingips(
+            tenant_id=self.request.user.tenant_id,
+            port_id=sorted(p['id'] for p in ports)).AndReturn(
+                {'floatingips': fips})
+        neutronclient.list_networks(
+            id=sorted(n['id'] for n in networks)).AndReturn(
+                {'networks': networks})
+        self.mox.ReplayAll()
+
+        api.neutron.servers_update_addresses(self.request, servers)
+
+        self.assertEqual(
+            [addr['addr'] for addr in servers[0].addresses['net1']],
+            [ports[0]['fixed_ips'][0]['ip_address'],
+             fips[0]['floating_ip_address']])
+        self.assertEqual(
+            [addr['addr'] for addr in servers[1].addresses['net2']],
+            [ports[1]['fixed_ips'][0]['ip_address']])
+        self.assertEqual(servers[2].addresses, {})
+
     def test_network_get(self):
         network = {'network': self.api_networks.first()}
         subnet = {'subnet': self.api_subnets.first()}
@@ -20,10 +20,12 @@
 from __future__ import absolute_import
 
 from django.conf import settings
+from django.core import cache
 from django import http
 from django.test.utils import override_settings
 
 from mox import IsA  # noqa
+from novaclient.v1_1 import flavors
 from novaclient.v1_1 import servers
 import six
 
@@ -231,3 +233,32 @@ class ComputeApiTests(test.APITestCase):
                             "maxTotalInstances": 10}
         for key in expected_results.keys():
             self.assertEqual(ret_val[key], expected_results[key])
+
+    @override_settings(OPENSTACK_API_CACHE={'enabled': True})
+    def test_flavor_list_cached_until_flavor_delete(self):
+        cache.get_cache('default').clear()
+        flavor_list = self.flavors.list()
+
+        novaclient = self.stub_novaclient()
+        novaclient.flavors = self.mox.CreateMockAnything()
+        novaclient.flavors.resource_class = flavors.Flavor
+        novaclient.flavors.list(is_public=True).AndReturn(flavor_list)
+        novaclient.flavors.delete(flavor_list[0].id)
+        novaclient.flavors.list(is_public=True).AndReturn(flavor_list[1:])
+        self.mox.ReplayAll()
+
+        def new_request():
+            request = http.HttpRequest()
+            request.user = self.request.user
+            return request
+
+        api.nova.flavor_list(new_request())
+        cached = api.nova.flavor_list(new_request())
+        self.assertEqual([f.id for f in cached],
+                         [f.id for f in flavor_list])
+        self.assertIs(cached[0].manager, novaclient.flavors)
+
+        api.nova.flavor_delete(new_request(), flavor_list[0].id)
+        ret_val = api.nova.flavor_list(new_request())
+        self.assertEqual([f.id for f in ret_val],
+                         [f.id for f in flavor_list[1:]])
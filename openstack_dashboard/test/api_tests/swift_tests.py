@@ -18,7 +18,11 @@
 
 from __future__ import absolute_import
 
+from django.core.files.base import ContentFile  # noqa
+from django.test.utils import override_settings  # noqa
 from mox import IsA  # noqa
+import six.moves.urllib.parse as urlparse
+import swiftclient
 
 from horizon import exceptions
 
@@ -138,6 +142,27 @@ class SwiftApiTests(test.APITestCase):
                                          object.name)
         self.assertEqual(obj.name, object.name)
 
+    def test_swift_get_object_streamed(self):
+        container = self.containers.first()
+        object = self.objects.first()
+
+        swift_api = self.stub_swiftclient()
+        swift_api.get_object(container.name, object.name,
+                             resp_chunk_size=4,
+                             headers={'Range': 'bytes=0-7'}) \
+            .AndReturn([{'content-range': 'bytes 0-7/9'},
+                        iter(['Fake', ' Dat'])])
+
+        self.mox.ReplayAll()
+
+        obj = api.swift.swift_get_object(self.request,
+                                         container.name,
+                                         object.name,
+                                         resp_chunk_size=4,
+                                         byte_range='bytes=0-7')
+        self.assertEqual(obj.content_range, 'bytes 0-7/9')
+        self.assertEqual(list(obj.data), ['Fake', ' Dat'])
+
     def test_swift_get_object_without_data(self):
         container = self.containers.first()
         object = self.objects.first()
@@ -172,7 +197,9 @@ class SwiftApiTests(test.APITestCase):
         swift_api.put_object(container.name,
                              obj.name,
                              IsA(FakeFile),
-                             headers=headers)
+                             headers=headers,
+                             content_length=len(obj.data),
+                             chunk_size=api.swift.CHUNK_SIZE)
         self.mox.ReplayAll()
 
         api.swift.swift_upload_object(self.request,
@@ -180,6 +207,44 @@ class SwiftApiTests(test.APITestCase):
                                       obj.name,
                                       FakeFile())
 
+    @override_settings(SWIFT_SEGMENTED_UPLOADS={'threshold': 4,
+                                                'segment_size': 4,
+                                                'max_workers': 1})
+    def test_swift_upload_object_segmented(self):
+        self.mox.stubs.Set(api.swift, '_swift_capabilities',
+                           lambda url: {})
+        self.mox.stubs.Set(api.swift.timeutils, 'utcnow_ts', lambda: 1)
+        container = self.containers.first()
+        obj = self.objects.first()
+        object_file = ContentFile(obj.data, name='fake')
+        segments_container = container.name + '_segments'
+        prefix = '%s/1/9/4/' % obj.name
+
+        swift_api = self.stub_swiftclient(expected_calls=5)
+        swift_api.put_container(segments_container)
+        for index, length in enumerate((4, 4, 1)):
+            swift_api.put_object(segments_container,
+                                 '%s%08d' % (prefix, index),
+                                 object_file,
+                                 content_length=length,
+                                 chunk_size=api.swift.CHUNK_SIZE) \
+                .AndReturn('etag%d' % index)
+        # A dynamic large object, as the cluster doesn't support static ones.
+        manifest = urlparse.quote(
+            ('%s/%s' % (segments_container, prefix)).encode('utf-8'))
+        swift_api.put_object(container.name, obj.name, '',
+                             headers={'X-Object-Meta-Orig-Filename': 'fake',
+                                      'X-Object-Manifest': manifest}) \
+            .AndReturn('manifest_etag')
+        self.mox.ReplayAll()
+
+        result = api.swift.swift_upload_object(self.request,
+                                               container.name,
+                                               obj.name,
+                                               object_file)
+        self.assertEqual(result.etag, 'manifest_etag')
+        self.assertEqual(result.bytes, 9)
+
     def test_swift_upload_object_without_file(self):
         container = self.containers.first()
         obj = self.objects.first()
@@ -212,3 +277,45 @@ class SwiftApiTests(test.APITestCase):
         self.assertTrue(api.swift.swift_object_exists(*args))
         # Again, for a "non-existent" object
         self.assertFalse(api.swift.swift_object_exists(*args))
+
+    def test_swift_delete_objects_bulk(self):
+        self.mox.stubs.Set(api.swift, '_swift_capabilities', lambda url: {
+            'bulk_delete': {'max_deletes_per_request': 2}})
+        swift_api = self.stub_swiftclient(expected_calls=2)
+        swift_api._retry(None, api.swift._bulk_delete,
+                         ['/c1/a', '/c1/b%20c']) \
+            .AndReturn({'Errors': [['/c1/b%20c', '409 Conflict']]})
+        swift_api._retry(None, api.swift._bulk_delete, ['/c1/d']) \
+            .AndReturn({'Errors': []})
+        self.mox.ReplayAll()
+
+        results = api.swift.swift_delete_objects(self.request, 'c1',
+                                                 ['a', 'b c', 'd'])
+        self.assertIsNone(results['a'])
+        self.assertIsNone(results['d'])
+        self.assertIsInstance(results['b c'],
+                              swiftclient.client.ClientException)
+
+    def test_swift_delete_objects_bulk_unicode(self):
+        self.mox.stubs.Set(api.swift, '_swift_capabilities', lambda url: {
+            'bulk_delete': {'max_deletes_per_request': 2}})
+        swift_api = self.stub_swiftclient()
+        swift_api._retry(None, api.swift._bulk_delete, ['/c1/caf%C3%A9']) \
+            .AndReturn({'Errors': []})
+        self.mox.ReplayAll()
+
+        results = api.swift.swift_delete_objects(self.request, u'c1',
+                                                 [u'caf\xe9'])
+        self.assertEqual(results, {u'caf\xe9': None})
+
+    def test_swift_delete_objects_without_bulk_delete(self):
+        self.mox.stubs.Set(api.swift, '_swift_capabilities',
+                           lambda url: {'swift': {}})
+        swift_api = self.stub_swiftclient(expected_calls=2)
+        swift_api.delete_object('c1', 'a')
+        swift_api.delete_object('c1', 'b').AndRaise(self.exceptions.swift)
+        self.mox.ReplayAll()
+
+        results = api.swift.swift_delete_objects(self.request, 'c1',
+                                                 ['a', 'b'])
+        self.assertEqual(results, {'a': None, 'b': self.exceptions.swift})
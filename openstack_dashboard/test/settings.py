@@ -112,6 +112,16 @@ OPENSTACK_KEYSTONE_BACKEND = {
     'can_edit_role': True
 }
 
+# Clients and API calls are stubbed out per test, so neither clients nor
+# API results may outlive a test.
+OPENSTACK_CLIENT_CACHE = {
+    'enabled': False,
+}
+
+OPENSTACK_API_CACHE = {
+    'enabled': False,
+}
+
 OPENSTACK_CINDER_FEATURES = {
     'enable_backup': True,
 }
@@ -10,6 +10,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from heatclient.v1 import resources
 from heatclient.v1 import stacks
 
 from openstack_dashboard.test.test_data import utils
@@ -326,6 +327,7 @@ def data(TEST):
     TEST.stacks = utils.TestDataContainer()
     TEST.stack_templates = utils.TestDataContainer()
     TEST.stack_environments = utils.TestDataContainer()
+    TEST.stack_resources = utils.TestDataContainer()
 
     for i in range(10):
         stack_data = {
@@ -358,5 +360,22 @@ def data(TEST):
         stack = stacks.Stack(stacks.StackManager(None), stack_data)
         TEST.stacks.add(stack)
 
+    for name, resource_type, required_by in (
+            ("WebServer", "AWS::EC2::Instance", []),
+            ("DatabaseServer", "AWS::EC2::Instance", ["WebServer"])):
+        resource_data = {
+            "resource_name": name,
+            "resource_type": resource_type,
+            "resource_status": "CREATE_COMPLETE",
+            "resource_status_reason": "state changed",
+            "physical_resource_id": "%s-id" % name,
+            "required_by": required_by,
+            "updated_time": "2013-04-22T00:11:39Z",
+            "links": [],
+        }
+        resource = resources.Resource(resources.ResourceManager(None),
+                                      resource_data)
+        TEST.stack_resources.add(resource)
+
     TEST.stack_templates.add(Template(TEMPLATE, VALIDATE))
     TEST.stack_environments.add(Environment(ENVIRONMENT))
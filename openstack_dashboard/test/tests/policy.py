@@ -63,6 +63,49 @@ class PolicyTestCase(test.TestCase):
                              request=self.request)
         self.assertTrue(value)
 
+    def test_check_many(self):
+        policy.reset()
+        project_id = self.request.user.project_id
+        targets = [{'project_id': project_id},
+                   {'project_id': 'another-project'},
+                   None]
+        value = policy.check_many((("compute", "compute:start"),),
+                                  self.request, targets)
+        self.assertEqual(value, [True, False, True])
+
+    def test_check_many_caches_decisions(self):
+        policy.reset()
+        actions = (("compute", "compute:start"),)
+        targets = [{'project_id': 'another-project', 'id': '1'}]
+        self.assertEqual(policy.check_many(actions, self.request, targets),
+                         [False])
+
+        # The rule doesn't depend on the id, so targets which only differ
+        # in it share the decision.
+        self.mox.StubOutWithMock(policy, '_is_allowed')
+        self.mox.ReplayAll()
+        targets = [{'project_id': 'another-project', 'id': '2'}]
+        self.assertEqual(policy.check_many(actions, self.request, targets),
+                         [False])
+
+    def test_compiled_rules_match_enforcer(self):
+        policy.reset()
+        user = self.request.user
+        credentials = policy._user_to_credentials(self.request, user)
+        admin_credentials = dict(credentials, is_admin=True,
+                                 roles=['admin'])
+        targets = ({'project_id': user.project_id, 'user_id': user.id},
+                   {'project_id': 'another-project', 'user_id': user.id})
+        for scope, enforcer in policy._get_enforcer().items():
+            compiled = policy._get_rules(scope, enforcer)
+            for name in enforcer.rules:
+                for creds in (credentials, admin_credentials):
+                    for target in targets:
+                        self.assertEqual(
+                            bool(compiled.evaluate(name, target, creds)),
+                            bool(enforcer.enforce(name, target, creds)),
+                            "%s differs for %s" % (name, target))
+
 
 class PolicyTestCaseAdmin(test.BaseAdminViewTests):
     def test_check_admin_required_true(self):
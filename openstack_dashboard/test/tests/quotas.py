@@ -19,9 +19,13 @@
 
 from __future__ import absolute_import
 
+from django.core import cache as django_cache
 from django import http
+from django.test.utils import override_settings  # noqa
 from mox import IsA  # noqa
 
+from horizon.utils import memoized
+
 from openstack_dashboard import api
 from openstack_dashboard.api import cinder
 from openstack_dashboard.test import helpers as test
@@ -51,11 +55,13 @@ class QuotaTests(test.APITestCase):
 
     @test.create_stubs({api.nova: ('server_list',
                                    'flavor_list',
-                                   'tenant_quota_get',),
+                                   'tenant_quota_get',
+                                   'tenant_absolute_limits',),
                         api.network: ('tenant_floating_ip_list',),
                         api.base: ('is_service_enabled',),
                         cinder: ('volume_list', 'volume_snapshot_list',
-                                 'tenant_quota_get',)})
+                                 'tenant_quota_get',
+                                 'tenant_absolute_limits',)})
     def test_tenant_quota_usages(self):
         servers = [s for s in self.servers.list()
                    if s.tenant_id == self.request.user.tenant_id]
@@ -64,6 +70,8 @@ class QuotaTests(test.APITestCase):
                                   'volume').AndReturn(True)
         api.base.is_service_enabled(IsA(http.HttpRequest),
                                   'network').AndReturn(False)
+        api.nova.tenant_absolute_limits(IsA(http.HttpRequest)) \
+                .AndReturn({})
         api.nova.flavor_list(IsA(http.HttpRequest)) \
                 .AndReturn(self.flavors.list())
         api.nova.tenant_quota_get(IsA(http.HttpRequest), '1') \
@@ -72,6 +80,8 @@ class QuotaTests(test.APITestCase):
                 .AndReturn(self.floating_ips.list())
         api.nova.server_list(IsA(http.HttpRequest)) \
                 .AndReturn([servers, False])
+        cinder.tenant_absolute_limits(IsA(http.HttpRequest)) \
+                .AndReturn({})
         cinder.volume_list(IsA(http.HttpRequest)) \
                 .AndReturn(self.volumes.list())
         cinder.volume_snapshot_list(IsA(http.HttpRequest)) \
@@ -89,7 +99,8 @@ class QuotaTests(test.APITestCase):
 
     @test.create_stubs({api.nova: ('server_list',
                                    'flavor_list',
-                                   'tenant_quota_get',),
+                                   'tenant_quota_get',
+                                   'tenant_absolute_limits',),
                         api.network: ('tenant_floating_ip_list',),
                         api.base: ('is_service_enabled',)})
     def test_tenant_quota_usages_without_volume(self):
@@ -100,6 +111,8 @@ class QuotaTests(test.APITestCase):
                                   'volume').AndReturn(False)
         api.base.is_service_enabled(IsA(http.HttpRequest),
                                   'network').AndReturn(False)
+        api.nova.tenant_absolute_limits(IsA(http.HttpRequest)) \
+                .AndReturn({})
         api.nova.flavor_list(IsA(http.HttpRequest)) \
                 .AndReturn(self.flavors.list())
         api.nova.tenant_quota_get(IsA(http.HttpRequest), '1') \
@@ -124,7 +137,8 @@ class QuotaTests(test.APITestCase):
 
     @test.create_stubs({api.nova: ('server_list',
                                    'flavor_list',
-                                   'tenant_quota_get',),
+                                   'tenant_quota_get',
+                                   'tenant_absolute_limits',),
                         api.network: ('tenant_floating_ip_list',),
                         api.base: ('is_service_enabled',)})
     def test_tenant_quota_usages_no_instances_running(self):
@@ -132,6 +146,8 @@ class QuotaTests(test.APITestCase):
                                   'volume').AndReturn(False)
         api.base.is_service_enabled(IsA(http.HttpRequest),
                                   'network').AndReturn(False)
+        api.nova.tenant_absolute_limits(IsA(http.HttpRequest)) \
+                .AndReturn({})
         api.nova.flavor_list(IsA(http.HttpRequest)) \
                 .AndReturn(self.flavors.list())
         api.nova.tenant_quota_get(IsA(http.HttpRequest), '1') \
@@ -156,11 +172,13 @@ class QuotaTests(test.APITestCase):
 
     @test.create_stubs({api.nova: ('server_list',
                                    'flavor_list',
-                                   'tenant_quota_get',),
+                                   'tenant_quota_get',
+                                   'tenant_absolute_limits',),
                         api.network: ('tenant_floating_ip_list',),
                         api.base: ('is_service_enabled',),
                         cinder: ('volume_list', 'volume_snapshot_list',
-                                 'tenant_quota_get',)})
+                                 'tenant_quota_get',
+                                 'tenant_absolute_limits',)})
     def test_tenant_quota_usages_unlimited_quota(self):
         inf_quota = self.quotas.first()
         inf_quota['ram'] = -1
@@ -171,6 +189,8 @@ class QuotaTests(test.APITestCase):
                                   'volume').AndReturn(True)
         api.base.is_service_enabled(IsA(http.HttpRequest),
                                   'network').AndReturn(False)
+        api.nova.tenant_absolute_limits(IsA(http.HttpRequest)) \
+                .AndReturn({})
         api.nova.flavor_list(IsA(http.HttpRequest)) \
                 .AndReturn(self.flavors.list())
         api.nova.tenant_quota_get(IsA(http.HttpRequest), '1') \
@@ -179,6 +199,8 @@ class QuotaTests(test.APITestCase):
                 .AndReturn(self.floating_ips.list())
         api.nova.server_list(IsA(http.HttpRequest)) \
                 .AndReturn([servers, False])
+        cinder.tenant_absolute_limits(IsA(http.HttpRequest)) \
+                .AndReturn({})
         cinder.volume_list(IsA(http.HttpRequest)) \
                 .AndReturn(self.volumes.list())
         cinder.volume_snapshot_list(IsA(http.HttpRequest)) \
@@ -196,3 +218,72 @@ class QuotaTests(test.APITestCase):
 
         # Compare internal structure of usages to expected.
         self.assertEqual(quota_usages.usages, expected_output)
+
+    @test.create_stubs({api.nova: ('tenant_quota_get',
+                                   'tenant_absolute_limits',),
+                        api.network: ('tenant_floating_ip_list',),
+                        api.base: ('is_service_enabled',),
+                        cinder: ('tenant_quota_get',
+                                 'tenant_absolute_limits',)})
+    def test_tenant_quota_usages_from_limits(self):
+        api.base.is_service_enabled(IsA(http.HttpRequest),
+                                  'volume').AndReturn(True)
+        api.base.is_service_enabled(IsA(http.HttpRequest),
+                                  'network').AndReturn(False)
+        api.nova.tenant_quota_get(IsA(http.HttpRequest), '1') \
+                .AndReturn(self.quotas.first())
+        api.nova.tenant_absolute_limits(IsA(http.HttpRequest)) \
+                .AndReturn({'totalInstancesUsed': 2,
+                            'totalCoresUsed': 2,
+                            'totalRAMUsed': 1024,
+                            'totalFloatingIpsUsed': 2})
+        cinder.tenant_quota_get(IsA(http.HttpRequest), '1') \
+            .AndReturn(self.cinder_quotas.first())
+        cinder.tenant_absolute_limits(IsA(http.HttpRequest)) \
+            .AndReturn({'totalVolumesUsed': 4,
+                        'totalGigabytesUsed': 120,
+                        'totalSnapshotsUsed': 3})
+
+        self.mox.ReplayAll()
+
+        # Neither the instances nor the volumes are listed.
+        quota_usages = quotas.tenant_quota_usages(self.request)
+        self.assertEqual(quota_usages.usages, self.get_usages())
+
+    @override_settings(OPENSTACK_API_CACHE={'enabled': True})
+    @test.create_stubs({api.nova: ('tenant_quota_get',
+                                   'tenant_absolute_limits',),
+                        api.base: ('is_service_enabled',)})
+    def test_tenant_quota_usages_cached(self):
+        django_cache.get_cache('default').clear()
+        limits = {'totalInstancesUsed': 2,
+                  'totalCoresUsed': 2,
+                  'totalRAMUsed': 1024,
+                  'totalFloatingIpsUsed': 2}
+        api.base.is_service_enabled(IsA(http.HttpRequest), 'volume') \
+            .MultipleTimes().AndReturn(False)
+        api.base.is_service_enabled(IsA(http.HttpRequest), 'network') \
+            .MultipleTimes().AndReturn(False)
+        api.nova.tenant_quota_get(IsA(http.HttpRequest), '1') \
+            .AndReturn(self.quotas.first())
+        api.nova.tenant_absolute_limits(IsA(http.HttpRequest)) \
+            .AndReturn(limits)
+        # Only made again once the usages are invalidated.
+        api.nova.tenant_quota_get(IsA(http.HttpRequest), '1') \
+            .AndReturn(self.quotas.first())
+        api.nova.tenant_absolute_limits(IsA(http.HttpRequest)) \
+            .AndReturn(dict(limits, totalInstancesUsed=3))
+
+        self.mox.ReplayAll()
+
+        quota_usages = quotas.tenant_quota_usages(self.request)
+        self.assertEqual(quota_usages['instances']['used'], 2)
+        memoized.clear_request_cache(self.request)
+        quota_usages = quotas.tenant_quota_usages(self.request)
+        self.assertEqual(quota_usages['instances']['used'], 2)
+
+        api.base.invalidate_quota_usages(self.request)
+        memoized.clear_request_cache(self.request)
+        quota_usages = quotas.tenant_quota_usages(self.request)
+        self.assertEqual(quota_usages['instances']['used'], 3)
+        django_cache.get_cache('default').clear()
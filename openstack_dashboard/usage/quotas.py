@@ -15,9 +15,11 @@ import itertools
 import logging
 
 from django.utils.translation import ugettext_lazy as _
+import six
 
 from horizon import exceptions
-from horizon.utils.memoized import memoized  # noqa
+from horizon.utils import concurrency
+from horizon.utils.memoized import memoized_per_request  # noqa
 
 from openstack_dashboard.api import base
 from openstack_dashboard.api import cinder
@@ -189,18 +191,45 @@ def get_disabled_quotas(request):
     return disabled_quotas
 
 
-@memoized
-def tenant_quota_usages(request):
-    # Get our quotas and construct our usage object.
-    disabled_quotas = get_disabled_quotas(request)
+# Quota: name of the counter of its usage in the absolute limits of nova and
+# cinder. The counters are only there with the "used limits" extensions.
+NOVA_USED_LIMITS = (('instances', 'totalInstancesUsed'),
+                    ('cores', 'totalCoresUsed'),
+                    ('ram', 'totalRAMUsed'),)
+
+NOVA_NETWORK_USED_LIMITS = (('floating_ips', 'totalFloatingIpsUsed'),)
+
+CINDER_USED_LIMITS = (('volumes', 'totalVolumesUsed'),
+                      ('gigabytes', 'totalGigabytesUsed'),
+                      ('snapshots', 'totalSnapshotsUsed'),)
+
+# Seconds the usages of a project are cached for, unless set in the ``ttls``
+# of ``OPENSTACK_API_CACHE``. The dashboard's own changes drop them at once.
+QUOTA_USAGES_TTL = 30
 
-    usages = QuotaUsage()
-    for quota in get_tenant_quota_data(request,
-                                       disabled_quotas=disabled_quotas):
-        usages.add_quota(quota)
 
-    # Get our usages.
-    floating_ips = network.tenant_floating_ip_list(request)
+def _run_tasks(tasks):
+    """Runs the named tasks concurrently and returns their results, raising
+    the error of the first one which failed.
+    """
+    concurrency.run_concurrently(tasks.values(), max_workers=len(tasks))
+    for task in tasks.values():
+        if task.exc_info:
+            six.reraise(*task.exc_info)
+    return dict((name, task.result) for name, task in tasks.items())
+
+
+def _get_limits(request, func, message):
+    try:
+        return func(request)
+    except Exception:
+        # Counting the resources one by one still works.
+        LOG.exception(message)
+        return {}
+
+
+def _get_instance_usage(request):
+    """Sums the instances, cores and RAM used by listing every instance."""
     flavors = dict([(f.id, f) for f in nova.flavor_list(request)])
     instances, has_more = nova.server_list(request)
     # Fetch deleted flavors if necessary.
@@ -214,26 +243,104 @@ def tenant_quota_usages(request):
                 flavors[missing] = {}
                 exceptions.handle(request, ignore=True)
 
-    usages.tally('instances', len(instances))
-    usages.tally('floating_ips', len(floating_ips))
+    # Sum our usage based on the flavors of the instances.
+    instance_flavors = [flavors[instance.flavor['id']]
+                        for instance in instances]
+    return {'instances': len(instances),
+            'cores': sum([getattr(flavor, 'vcpus', None) or 0
+                          for flavor in instance_flavors]),
+            'ram': sum([getattr(flavor, 'ram', None) or 0
+                        for flavor in instance_flavors])}
 
-    if 'volumes' not in disabled_quotas:
-        volumes = cinder.volume_list(request)
-        snapshots = cinder.volume_snapshot_list(request)
-        usages.tally('gigabytes', sum([int(v.size) for v in volumes]))
-        usages.tally('volumes', len(volumes))
-        usages.tally('snapshots', len(snapshots))
 
-    # Sum our usage based on the flavors of the instances.
-    for flavor in [flavors[instance.flavor['id']] for instance in instances]:
-        usages.tally('cores', getattr(flavor, 'vcpus', None))
-        usages.tally('ram', getattr(flavor, 'ram', None))
+def _get_volume_usage(request):
+    """Sums the volumes, gigabytes and snapshots used by listing them."""
+    volumes = cinder.volume_list(request)
+    snapshots = cinder.volume_snapshot_list(request)
+    return {'volumes': len(volumes),
+            'gigabytes': sum([int(v.size) for v in volumes]),
+            'snapshots': len(snapshots)}
+
+
+def _get_floating_ip_usage(request):
+    return {'floating_ips': len(network.tenant_floating_ip_list(request))}
+
+
+def _used_from_limits(limits, counters):
+    used = {}
+    for name, counter in counters:
+        if counter not in limits:
+            # Without one of the counters, count them all the slow way.
+            return None
+        used[name] = limits[counter]
+    return used
+
 
-    # Initialise the tally if no instances have been launched yet
-    if len(instances) == 0:
-        usages.tally('cores', 0)
-        usages.tally('ram', 0)
+@memoized_per_request
+@base.cached_api('compute', project_scoped=True,
+                 name=base.QUOTA_USAGES_CACHE, ttl=QUOTA_USAGES_TTL)
+def tenant_quota_usages(request):
+    """Returns the :class:`QuotaUsage` of the current project.
+
+    The usages come from the "used" counters in the absolute limits of nova
+    and cinder, so that the instances and volumes of the project don't have
+    to be listed; they are only listed when a service doesn't report the
+    counters. All the calls are made concurrently and the result is cached
+    per project (see ``OPENSTACK_API_CACHE``) until it expires or a resource
+    is created or deleted through the dashboard.
+    """
+    # Get our quotas and construct our usage object.
+    disabled_quotas = get_disabled_quotas(request)
+    with_volumes = 'volumes' not in disabled_quotas
+    # Floating IPs are neutron's when the nova-network quota is disabled.
+    with_neutron = 'floating_ips' in disabled_quotas
+
+    tasks = {
+        'quotas': concurrency.Task(
+            get_tenant_quota_data, args=(request,),
+            kwargs={'disabled_quotas': disabled_quotas}),
+        'compute_limits': concurrency.Task(
+            _get_limits, args=(request, nova.tenant_absolute_limits,
+                               "Unable to retrieve compute limits.")),
+    }
+    if with_volumes:
+        tasks['volume_limits'] = concurrency.Task(
+            _get_limits, args=(request, cinder.tenant_absolute_limits,
+                               "Unable to retrieve volume limits."))
+    if with_neutron:
+        tasks['floating_ips'] = concurrency.Task(_get_floating_ip_usage,
+                                                 args=(request,))
+    results = _run_tasks(tasks)
+
+    used = {}
+    counted = [(NOVA_USED_LIMITS, results['compute_limits'],
+                _get_instance_usage)]
+    if with_neutron:
+        used.update(results['floating_ips'])
+    else:
+        counted.append((NOVA_NETWORK_USED_LIMITS, results['compute_limits'],
+                        _get_floating_ip_usage))
+    if with_volumes:
+        counted.append((CINDER_USED_LIMITS, results['volume_limits'],
+                        _get_volume_usage))
+
+    fallbacks = {}
+    for counters, limits, count in counted:
+        from_limits = _used_from_limits(limits, counters)
+        if from_limits is None:
+            fallbacks[count.__name__] = concurrency.Task(count,
+                                                         args=(request,))
+        else:
+            used.update(from_limits)
+    if fallbacks:
+        for counts in _run_tasks(fallbacks).values():
+            used.update(counts)
 
+    usages = QuotaUsage()
+    for quota in results['quotas']:
+        usages.add_quota(quota)
+    for name, value in sorted(used.items()):
+        usages.tally(name, value)
     return usages
 
 
@@ -251,11 +358,16 @@ def tenant_limit_usages(request):
     if base.is_service_enabled(request, 'volume'):
         try:
             limits.update(cinder.tenant_absolute_limits(request))
-            volumes = cinder.volume_list(request)
-            total_size = sum([getattr(volume, 'size', 0) for volume
-                              in volumes])
-            limits['gigabytesUsed'] = total_size
-            limits['volumesUsed'] = len(volumes)
+            if ('totalGigabytesUsed' in limits
+                    and 'totalVolumesUsed' in limits):
+                limits['gigabytesUsed'] = limits['totalGigabytesUsed']
+                limits['volumesUsed'] = limits['totalVolumesUsed']
+            else:
+                volumes = cinder.volume_list(request)
+                total_size = sum([getattr(volume, 'size', 0) for volume
+                                  in volumes])
+                limits['gigabytesUsed'] = total_size
+                limits['volumesUsed'] = len(volumes)
         except Exception:
             msg = _("Unable to retrieve volume limit information.")
             exceptions.handle(request, msg)